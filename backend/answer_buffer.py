@@ -0,0 +1,188 @@
+import eventlet
+import redis
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from extensions import db
+from models import Score
+from log import get_logger
+
+log = get_logger("game")
+
+
+# 📌 État des rounds : joueurs ayant déjà répondu (par round) et points pas encore écrits.
+# Sans REDIS_URL, un stockage en mémoire (un seul processus) est utilisé.
+class MemoryAnswerStore:
+    def __init__(self):
+        self._answered = {}  # game_id -> {round: set(user_id) ayant répondu à ce round}
+        self._deltas = {}    # game_id -> {user_id: points à ajouter}
+
+    def mark_answered(self, game_id, round_number, user_id):
+        rounds = self._answered.setdefault(game_id, {})
+        answered = rounds.setdefault(round_number, set())
+        if user_id in answered:
+            return False
+        answered.add(user_id)
+        for old in [r for r in rounds if r < round_number - 1]:  # ✅ On garde le round précédent (réponses tardives)
+            del rounds[old]
+        return True
+
+    def add_points(self, game_id, user_id, points):
+        deltas = self._deltas.setdefault(game_id, {})
+        deltas[user_id] = deltas.get(user_id, 0) + points
+
+    def forget(self, game_id):
+        self._answered.pop(game_id, None)
+
+    def take(self, game_id=None):
+        if game_id is None:
+            pending, self._deltas = self._deltas, {}
+            return pending
+        return {game_id: self._deltas.pop(game_id)} if game_id in self._deltas else {}
+
+
+# ✅ Partagé entre les workers : une réponse est acceptée une seule fois, quel que soit le worker qui la reçoit
+class RedisAnswerStore:
+    ANSWERED = "answers:answered:{}:{}"  # (game_id, round)
+    ANSWERED_TTL = 3600                   # ✅ Les rounds passés expirent d'eux-mêmes
+    DELTAS = "answers:deltas:{}"
+    GAMES = "answers:games"  # parties ayant des points en attente
+
+    def __init__(self, client):
+        self.client = client
+
+    def mark_answered(self, game_id, round_number, user_id):
+        key = self.ANSWERED.format(game_id, round_number)
+        pipe = self.client.pipeline()
+        pipe.sadd(key, user_id)
+        pipe.expire(key, self.ANSWERED_TTL)
+        return pipe.execute()[0] == 1
+
+    def add_points(self, game_id, user_id, points):
+        pipe = self.client.pipeline()
+        pipe.hincrby(self.DELTAS.format(game_id), user_id, points)
+        pipe.sadd(self.GAMES, game_id)
+        pipe.execute()
+
+    def forget(self, game_id):
+        pass  # ✅ Clés par round, expirées par Redis
+
+    def take(self, game_id=None):
+        game_ids = [game_id] if game_id is not None else [int(gid) for gid in self.client.smembers(self.GAMES)]
+        pending = {}
+        for gid in game_ids:
+            pipe = self.client.pipeline()  # ✅ MULTI/EXEC : lecture et suppression atomiques (un seul worker écrit ces points)
+            pipe.hgetall(self.DELTAS.format(gid))
+            pipe.delete(self.DELTAS.format(gid))
+            pipe.srem(self.GAMES, gid)
+            deltas = pipe.execute()[0]
+            if deltas:
+                pending[gid] = {int(user_id): int(points) for user_id, points in deltas.items()}
+        return pending
+
+
+# 📌 Tampon d'écriture différée des réponses : une réponse par joueur et par round,
+# les points sont persistés en une seule écriture groupée dans `Score`.
+class AnswerBuffer:
+    def __init__(self):
+        self.store = MemoryAnswerStore()
+        self._flusher = None
+
+    def init_app(self, app, interval=30, client=None):
+        """ ✅ État partagé dans Redis si REDIS_URL est défini ; lance le vidage périodique (au plus un round perdu en cas de crash) """
+        url = app.config.get("REDIS_URL")
+        if client is None and url:
+            client = redis.Redis.from_url(url)
+        if client is not None:
+            self.store = RedisAnswerStore(client)
+        if self._flusher is None and interval > 0:
+            self._flusher = eventlet.spawn(self._run, app, interval)
+
+    def record(self, game_id, round_number, user_id, points):
+        """ ✅ Enregistre la réponse d'un joueur au round `round_number` ; False s'il y a déjà répondu """
+        if not self.store.mark_answered(game_id, round_number, user_id):
+            return False
+        if points:
+            self.store.add_points(game_id, user_id, points)
+        return True
+
+    def close_round(self, game_id):
+        """ ✅ Termine le round : les points sont écrits. Les réponses restent indexées par round :
+        tant que la question suivante n'est pas installée, l'ancienne ne peut pas être rejouée """
+        return self.flush(game_id)
+
+    def finish(self, game_id):
+        """ ✅ Fin de partie : points écrits, réponses oubliées """
+        self.store.forget(game_id)
+        return self.flush(game_id)
+
+    def flush(self, game_id=None):
+        """ ✅ Écrit les points en attente (d'une partie ou de toutes) en une seule transaction """
+        pending = self.store.take(game_id)
+        if not pending:
+            return 0
+
+        try:
+            self._persist(pending)
+        except Exception as e:
+            db.session.rollback()
+            log.warning("⚠️ Erreur lors de l'écriture des scores, nouvel essai au prochain vidage : %s", e)
+            for gid, deltas in pending.items():
+                for user_id, points in deltas.items():
+                    self.store.add_points(gid, user_id, points)
+            return 0
+
+        return sum(len(deltas) for deltas in pending.values())
+
+    def _persist(self, pending):
+        """ ✅ INSERT ... ON CONFLICT (user_id, game_id) : une seule requête pour tout le round """
+        rows = [
+            {"user_id": user_id, "game_id": game_id, "score": points}
+            for game_id, deltas in pending.items()
+            for user_id, points in deltas.items()
+        ]
+        dialect = db.engine.dialect.name
+
+        if dialect == "mysql":
+            stmt = mysql.insert(Score).values(rows)
+            stmt = stmt.on_duplicate_key_update(score=Score.score + stmt.inserted.score)
+        elif dialect in ("sqlite", "postgresql"):
+            stmt = (sqlite if dialect == "sqlite" else postgresql).insert(Score).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "game_id"],
+                set_={"score": Score.score + stmt.excluded.score},
+            )
+        else:
+            return self._persist_orm(pending)
+
+        db.session.execute(stmt)
+        db.session.commit()
+
+    def _persist_orm(self, pending):
+        existing = Score.query.filter(Score.game_id.in_(list(pending))).all()
+        rows = {(score.game_id, score.user_id): score for score in existing}
+
+        updates, inserts = [], []
+        for game_id, deltas in pending.items():
+            for user_id, points in deltas.items():
+                row = rows.get((game_id, user_id))
+                if row:
+                    updates.append({"id": row.id, "score": (row.score or 0) + points})
+                else:
+                    inserts.append({"user_id": user_id, "game_id": game_id, "score": points})
+
+        if updates:
+            db.session.bulk_update_mappings(Score, updates)
+        if inserts:
+            db.session.bulk_insert_mappings(Score, inserts)
+        db.session.commit()
+
+    def _run(self, app, interval):
+        while True:
+            eventlet.sleep(interval)
+            try:
+                with app.app_context():
+                    self.flush()
+            except Exception as e:
+                log.warning("⚠️ Échec du vidage périodique des scores, nouvel essai dans %ss : %s", interval, e)
+
+
+answer_buffer = AnswerBuffer()
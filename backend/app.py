@@ -1,63 +1,98 @@
 import os
 import eventlet
-eventlet.monkey_patch()  # ✅ Nécessaire pour le bon fonctionnement avec eventlet
+eventlet.monkey_patch()  # ✅ Nécessaire pour le bon fonctionnement avec eventlet (avant tout autre import)
 
 from flask import Flask, render_template
-from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from dotenv import load_dotenv  # ✅ Charger .env
 from config import Config  # ✅ Importer Config correctement
-from extensions import db, bcrypt, socketio
+from extensions import db, bcrypt, jwt, socketio, migrate
 from routes import auth
 from music_routes import music
 from socket_manager import init_socketio
+from log import init_logging, get_logger
+from database import init_database
 from room_routes import room_bp
-from game_routes import game_bp  # ✅ Importer les routes du jeu
+from game_routes import game_bp, question_index  # ✅ Importer les routes du jeu
+from answer_buffer import answer_buffer
+from scoreboard import scoreboards
+from leaderboard import leaderboard
+from leaderboard_routes import leaderboard_bp
+from round_scheduler import round_scheduler
+from metrics import metrics
+from session_registry import session_registry
+from preview_cache import preview_cache
+from models import Game
 
-# 📌 Charger les variables d'environnement
-load_dotenv()
+log = get_logger("app")
 
-# 📌 Initialisation de l'application Flask
-app = Flask(__name__)
-app.config.from_object(Config)  # ✅ Utiliser Config
 
-# ✅ Vérifier que la durée du token est bien définie
-print(f"🕒 Durée du token JWT : {app.config['JWT_ACCESS_TOKEN_EXPIRES']}")
+# 📌 Fabrique de l'application : rien n'est initialisé à l'import. Les clients lourds
+# (OpenAI, token Spotify) sont créés au premier appel ; le schéma est géré par
+# `flask db upgrade`. Un serveur pre-fork peut créer l'application une fois puis forker.
+def create_app(config_class=Config):
+    app = Flask(__name__)
+    app.config.from_object(config_class)  # ✅ Utiliser Config
 
-# ✅ Active CORS pour autoriser uniquement les requêtes du frontend (localhost:3000)
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
+    # ✅ Active CORS pour autoriser uniquement les requêtes du frontend (localhost:3000)
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
 
-# 📌 Initialisation des extensions
-db.init_app(app)
-bcrypt.init_app(app)
-jwt = JWTManager(app)  # ✅ Initialisation correcte du JWT
+    # 📌 Logs structurés, écrits par un thread dédié (niveaux par sous-système : LOG_LEVELS)
+    init_logging(app)
+    log.info("🗄️ Base de données : %s", config_class.database_label())
+    log.info("🕒 Durée du token JWT : %s", app.config["JWT_ACCESS_TOKEN_EXPIRES"])
 
-# 📌 Initialisation de SocketIO
-socketio = init_socketio(app)
+    # 📌 Initialisation des extensions
+    db.init_app(app)
+    init_database(app)  # ✅ Profil du moteur : WAL / busy_timeout (SQLite), pool et pre-ping (serveur)
+    migrate.init_app(app, db)  # ✅ Schéma géré par migrations : `flask db upgrade`
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+    answer_buffer.init_app(app, interval=app.config["ANSWER_FLUSH_INTERVAL"])  # ✅ Vidage périodique des scores (Redis si REDIS_URL)
+    scoreboards.init_app(app)  # ✅ Classements des parties en cours (Redis si REDIS_URL)
+    leaderboard.init_app(app)  # ✅ Index de rang (Redis si REDIS_URL)
+    round_scheduler.init_app(app)  # ✅ Échéances de tous les rounds dans un seul greenthread
+    preview_cache.init_app(app)  # ✅ Cache disque des extraits audio
+    metrics.init_app(app)  # ✅ Latences HTTP / SQL, exposées sur /metrics (format Prometheus)
 
-# 📌 Enregistrement des routes
-app.register_blueprint(auth, url_prefix="/api/auth")
-app.register_blueprint(music, url_prefix="/api")
-app.register_blueprint(room_bp, url_prefix="/api")
-app.register_blueprint(game_bp, url_prefix="/api/game")
+    # 📌 Jauges lues à chaque collecte de /metrics
+    metrics.gauge("socketio_connected_sids", "Connexions Socket.IO authentifiées (ce worker)", session_registry.connected)
+    metrics.gauge("active_rooms", "Rooms occupées par au moins un joueur (ce worker)", session_registry.active_rooms)
+    metrics.gauge("playing_games", "Parties en cours", lambda: Game.query.filter_by(status="playing").count())
+    metrics.gauge("pending_round_timers", "Fins de round en attente dans le planificateur", lambda: round_scheduler.count("round"))
+    metrics.gauge("scheduled_jobs", "Échéances en attente dans le planificateur (tous types)", round_scheduler.pending)
+    metrics.gauge("question_duplicate_ratio", "Part des questions tirées déjà posées dans la partie", question_index.hit_rate)
+    metrics.gauge("question_llm_calls_saved", "Doublons remplacés depuis le cache du thème (appels LLM évités)", question_index.calls_saved)
 
-# 📌 Page d'accueil simple (pour test)
-@app.route('/')
-def index():
-    return render_template('index.html')
+    # 📌 Initialisation de SocketIO
+    init_socketio(app)
+
+    # 📌 Enregistrement des routes
+    app.register_blueprint(auth, url_prefix="/api/auth")
+    app.register_blueprint(music, url_prefix="/api")
+    app.register_blueprint(room_bp, url_prefix="/api")
+    app.register_blueprint(game_bp, url_prefix="/api/game")
+    app.register_blueprint(leaderboard_bp, url_prefix="/api")
+
+    # 📌 Page d'accueil simple (pour test)
+    @app.route('/')
+    def index():
+        return render_template('index.html')
+
+    # 📌 Vérification des plans d'exécution des requêtes critiques : `flask check-query-plans`
+    @app.cli.command("check-query-plans")
+    def check_query_plans_command():
+        from query_plans import check_query_plans
+        if not check_query_plans():
+            raise SystemExit(1)
+
+    return app
 
-# 📌 Création des tables de la base de données
-with app.app_context():
-    try:
-        db.create_all()
-        print("✅ Base de données initialisée avec succès.")
-    except Exception as e:
-        print(f"⚠️ Erreur lors de l'initialisation de la base de données : {e}")
 
 # 📌 Lancement du serveur Flask avec WebSocket (SocketIO)
 if __name__ == '__main__':
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8080))
 
+    app = create_app()
     print(f"🚀 Serveur démarré sur http://{host}:{port}")
     socketio.run(app, host=host, port=port, debug=True, )
@@ -0,0 +1,173 @@
+"""Benchmark : débit d'écriture SQLite sous concurrence, par profil de moteur (DB_PROFILE).
+
+P processus workers partagent une même base SQLite. Dans chaque worker, des
+greenthreads "écrivains" rejouent le chemin d'une réponse (lecture du joueur,
+cession du hub comme pour un emit, incrément de son Score, mise à jour du joueur,
+commit) et des greenthreads "lecteurs" gardent des transactions de lecture
+ouvertes (comptage des scores de la partie, cession, seconde lecture). Mesures :
+commits/s, erreurs "database is locked", latence p50/p99 d'une écriture.
+
+- default  réglages SQLAlchemy / pysqlite d'origine (journal rollback, synchronous=FULL)
+- sqlite   WAL, synchronous=NORMAL, busy_timeout (SQLITE_BUSY_TIMEOUT)
+
+    python benchmarks/db_write_throughput.py --processes 4 --writers 8 --readers 2 --duration 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from harness import BACKEND_DIR, percentile
+
+PROFILES = ("default", "sqlite")
+MARKER = "result "
+
+
+def boot(profile):
+    os.environ["DB_PROFILE"] = profile
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    return create_app()
+
+
+def setup(profile, users):
+    """ 📌 Sous-processus : schéma, joueurs et partie partagés par tous les workers """
+    app = boot(profile)
+    from extensions import db
+    from models import Game, Room, Score, User
+
+    with app.app_context():
+        db.create_all()
+        room = Room(name="dbbench")
+        db.session.add(room)
+        db.session.flush()
+        game = Game(room_id=room.id, status="playing")
+        db.session.add(game)
+        db.session.bulk_insert_mappings(User, [
+            {"username": f"db{i}", "email": f"db{i}@example.com", "password_hash": "x"} for i in range(users)
+        ])
+        db.session.flush()
+        db.session.bulk_insert_mappings(Score, [
+            {"user_id": user_id, "game_id": game.id, "score": 0} for (user_id,) in db.session.query(User.id)
+        ])
+        db.session.commit()
+
+
+def work(profile, index, args):
+    """ 📌 Sous-processus worker : écrivains et lecteurs jusqu'à `start_at + duration` """
+    app = boot(profile)
+    import eventlet
+    from sqlalchemy.exc import OperationalError
+    from extensions import db
+    from models import Game, Score, User
+
+    with app.app_context():
+        game_id = Game.query.first().id
+    stats = {"commits": 0, "errors": 0, "latencies": []}
+    end = args.start_at + args.duration
+
+    def writer(user_id):
+        while time.time() < end:
+            start = time.perf_counter()
+            with app.app_context():
+                try:
+                    db.session.get(User, user_id)
+                    eventlet.sleep(0)  # ✅ Cession du hub entre lecture et écriture (emit, appel réseau...)
+                    Score.query.filter_by(user_id=user_id, game_id=game_id).update({"score": Score.score + 1})
+                    User.query.filter_by(id=user_id).update({"session_id": f"sid-{index}-{stats['commits']}"})
+                    db.session.commit()
+                    stats["commits"] += 1
+                    stats["latencies"].append((time.perf_counter() - start) * 1000)
+                except OperationalError:
+                    db.session.rollback()
+                    stats["errors"] += 1
+
+    def reader():
+        while time.time() < end:
+            with app.app_context():
+                try:
+                    Score.query.filter_by(game_id=game_id).count()
+                    eventlet.sleep(0.005)
+                    Score.query.filter_by(game_id=game_id, user_id=1).count()
+                    db.session.commit()
+                except OperationalError:
+                    db.session.rollback()
+
+    eventlet.sleep(max(0, args.start_at - time.time()))
+    pool = eventlet.GreenPool()
+    for i in range(args.writers):
+        pool.spawn(writer, 1 + (index * args.writers + i) % args.users)
+    for _ in range(args.readers):
+        pool.spawn(reader)
+    pool.waitall()
+    print(MARKER + json.dumps(stats), flush=True)
+
+
+def run_profile(profile, args):
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", LOG_LEVEL="WARNING")
+    env.setdefault("OPENAI_API_KEY", "bench")
+    env.pop("REDIS_URL", None)
+    script = os.path.abspath(__file__)
+    common = ["--profile", profile, "--users", str(args.users)]
+
+    subprocess.run([sys.executable, script, "--setup", *common], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    start_at = time.time() + args.warmup
+    workers = [
+        subprocess.Popen([sys.executable, script, "--worker", str(i), *common,
+                          "--writers", str(args.writers), "--readers", str(args.readers),
+                          "--duration", str(args.duration), "--start-at", str(start_at)],
+                         cwd=BACKEND_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for i in range(args.processes)
+    ]
+
+    commits, errors, latencies = 0, 0, []
+    for worker in workers:
+        output, _ = worker.communicate()
+        for line in output.splitlines():
+            if line.startswith(MARKER):
+                stats = json.loads(line[len(MARKER):])
+                commits += stats["commits"]
+                errors += stats["errors"]
+                latencies += stats["latencies"]
+    return {
+        "profile": profile,
+        "commits_per_s": commits / args.duration,
+        "errors": errors,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--setup", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--profile", help=argparse.SUPPRESS)
+    parser.add_argument("--processes", type=int, default=4, help="processus workers (P)")
+    parser.add_argument("--writers", type=int, default=8, help="greenthreads écrivains par worker")
+    parser.add_argument("--readers", type=int, default=2, help="greenthreads lecteurs par worker")
+    parser.add_argument("--users", type=int, default=100, help="joueurs en base")
+    parser.add_argument("--duration", type=float, default=10, help="secondes de mesure par profil")
+    parser.add_argument("--warmup", type=float, default=5, help="délai laissé aux workers pour démarrer (s)")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="profils à comparer")
+    args = parser.parse_args()
+
+    if args.setup:
+        return setup(args.profile, args.users)
+    if args.worker is not None:
+        return work(args.profile, args.worker, args)
+
+    results = [run_profile(profile, args) for profile in args.profiles.split(",")]
+    print(f"\n{args.processes} workers × ({args.writers} écrivains + {args.readers} lecteurs), {args.duration:.0f} s par profil\n")
+    print(f"{'profil':<10}{'commits/s':>12}{'erreurs':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['profile']:<10}{r['commits_per_s']:>12.1f}{r['errors']:>10}{r['p50']:>10.1f}{r['p99']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
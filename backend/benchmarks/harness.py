@@ -0,0 +1,100 @@
+"""Outils communs aux benchmarks : serveur lancé dans un sous-processus, percentiles, mesures CPU/RSS."""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def boot_app():
+    """ 📌 Côté sous-processus : application complète sur la base temporaire créée par `start_server` """
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    from extensions import db, socketio
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app, socketio
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, extra_args=(), env=None, stdout=subprocess.DEVNULL):
+    """ ✅ Relance `script --serve <port>` avec une base SQLite vierge ; renvoie (processus, URL) """
+    port = free_port()
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    server_env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", **(env or {}))
+    server_env.setdefault("OPENAI_API_KEY", "bench")
+    server_env.pop("REDIS_URL", None)
+
+    cmd = [sys.executable, os.path.abspath(script), "--serve", str(port), *extra_args]
+    server = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=server_env, stdout=stdout, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_for(base + "/")
+    except RuntimeError:
+        server.terminate()
+        raise
+    return server, base
+
+
+def wait_for(url, timeout=30):
+    import requests
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"Serveur injoignable : {url}")
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+class ProcessSampler:
+    """ 📌 Échantillonne le CPU (%) et la mémoire résidente (Mo) d'un processus en arrière-plan """
+
+    def __init__(self, pid, interval=0.5):
+        import psutil
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.cpu, self.rss = [], []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.process.cpu_percent()  # ✅ Le premier appel sert de référence
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return {
+            "cpu_avg": sum(self.cpu) / len(self.cpu) if self.cpu else 0.0,
+            "cpu_max": max(self.cpu, default=0.0),
+            "rss_max_mb": max(self.rss, default=0.0),
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.cpu.append(self.process.cpu_percent())
+                self.rss.append(self.process.memory_info().rss / 1024 / 1024)
+            except Exception:
+                return  # processus terminé
@@ -0,0 +1,122 @@
+"""Benchmark : débit des requêtes HTTP avec des logs verbeux ou non.
+
+Le serveur écrit ses logs sur un pipe lu à débit limité (`--sink-kbps`), pour
+simuler une sortie lente (journald, docker logs...). Scénarios :
+
+- quiet         LOG_LEVEL=WARNING
+- verbose       LOG_LEVEL=DEBUG, sans limite de débit par site d'appel
+- verbose+limit LOG_LEVEL=DEBUG, limites par défaut (LOG_RATE_LIMIT)
+- verbose+sync  LOG_LEVEL=DEBUG, écriture synchrone sur stdout (équivalent des anciens print)
+
+    python benchmarks/logging_throughput.py --duration 10 --concurrency 10 --sink-kbps 64
+"""
+import argparse
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from harness import boot_app, percentile, start_server
+
+SCENARIOS = {
+    "quiet": ({"LOG_LEVEL": "WARNING"}, []),
+    "verbose": ({"LOG_LEVEL": "DEBUG", "LOG_RATE_LIMIT": "0"}, []),
+    "verbose+limit": ({"LOG_LEVEL": "DEBUG"}, []),
+    "verbose+sync": ({"LOG_LEVEL": "DEBUG", "LOG_RATE_LIMIT": "0"}, ["--sync"]),
+}
+
+
+def serve(port, sync):
+    """ 📌 Sous-processus serveur ; `--sync` remplace le handler non bloquant par une écriture directe """
+    app, socketio = boot_app()
+    if sync:
+        import logging
+        import sys
+        from log import ROOT, JsonFormatter
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter())
+        root = logging.getLogger(ROOT)
+        root.handlers = [stream]
+    socketio.run(app, host="127.0.0.1", port=port, log_output=False)
+
+
+def drain(pipe, kbps):
+    """ ✅ Lit la sortie du serveur à `kbps` Ko/s au plus (0 = sans limite) """
+    chunk = 4096
+    while pipe.read(chunk):
+        if kbps:
+            time.sleep(chunk / (kbps * 1024))
+
+
+def run_scenario(name, args):
+    import requests
+
+    env, extra = SCENARIOS[name]
+    server, base = start_server(__file__, extra, {"BCRYPT_LOG_ROUNDS": "4", **env}, stdout=subprocess.PIPE)
+    threading.Thread(target=drain, args=(server.stdout, args.sink_kbps), daemon=True).start()
+    try:
+        http = requests.Session()
+        user = http.post(f"{base}/api/auth/register", json={
+            "username": "logbench", "email": "logbench@example.com", "password": "logbench",
+        }, timeout=30).json()
+        room_id = http.post(f"{base}/api/rooms", json={"name": "logbench"}, timeout=30).json()["room_id"]
+        headers = {"Authorization": f"Bearer {user['token']}"}
+        membership = {"user_id": user["id"], "room_id": room_id}
+
+        latencies, lock = [], threading.Lock()
+        end = time.perf_counter() + args.duration
+
+        def worker(_):
+            session = requests.Session()
+            calls = [
+                lambda: session.get(f"{base}/api/auth/profile", headers=headers, timeout=30),
+                lambda: session.post(f"{base}/api/rooms/join", json=membership, timeout=30),
+                lambda: session.post(f"{base}/api/rooms/leave", json=membership, timeout=30),
+                lambda: session.get(f"{base}/api/rooms", timeout=30),
+            ]
+            i = 0
+            while time.perf_counter() < end:
+                start = time.perf_counter()
+                calls[i % len(calls)]()
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                i += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(worker, range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "scenario": name,
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--sync", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--duration", type=float, default=10, help="secondes par scénario")
+    parser.add_argument("--concurrency", type=int, default=10, help="clients simultanés")
+    parser.add_argument("--sink-kbps", type=float, default=64, help="débit de lecture des logs (Ko/s, 0 = illimité)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="scénarios à exécuter")
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.sync)
+
+    results = [run_scenario(name, args) for name in args.scenarios.split(",")]
+    print(f"\n{args.concurrency} clients, {args.duration:.0f} s par scénario, sortie des logs à {args.sink_kbps:.0f} Ko/s\n")
+    print(f"{'scénario':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['scenario']:<16}{r['throughput']:>10.1f}{r['p50']:>10.1f}{r['p99']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
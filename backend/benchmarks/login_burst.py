@@ -0,0 +1,124 @@
+"""Benchmark : débit de connexion et latence Socket.IO pendant une rafale de logins.
+
+Lance le serveur dans un sous-processus (base SQLite temporaire), inscrit des
+utilisateurs, puis envoie une rafale de POST /api/auth/login pendant qu'un
+client Socket.IO mesure le temps aller-retour d'un événement `bench_ping`.
+
+    python benchmarks/login_burst.py --logins 200 --concurrency 20 --rounds 12
+
+Le mode `--compare` relance le même scénario avec bcrypt exécuté directement
+sur le hub eventlet (comportement précédent) pour comparer les deux.
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from harness import boot_app, percentile, start_server
+
+PASSWORD = "bench-password"
+
+
+def serve(port, inline):
+    """ 📌 Sous-processus serveur : application complète + handler d'écho pour mesurer la latence """
+    app, socketio = boot_app()
+    import models
+
+    if inline:
+        models.tpool.execute = lambda func, *args: func(*args)  # ⚠️ bcrypt sur le hub
+
+    @socketio.on("bench_ping")
+    def bench_ping(data):
+        return data
+
+    socketio.run(app, host="127.0.0.1", port=port, log_output=False)
+
+
+def run_scenario(args, inline):
+    import requests
+    import socketio
+
+    server, base = start_server(__file__, ["--inline"] if inline else [], {"BCRYPT_LOG_ROUNDS": str(args.rounds)})
+    try:
+        def register(i):
+            requests.post(f"{base}/api/auth/register", json={
+                "username": f"bench{i}", "email": f"bench{i}@example.com", "password": PASSWORD,
+            }, timeout=60)
+
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(register, range(args.users)))
+
+        # ✅ Client Socket.IO : un ping toutes les `interval` secondes pendant la rafale
+        client = socketio.Client()
+        client.connect(base, transports=["websocket"])
+        latencies, stop = [], threading.Event()
+
+        def pinger():
+            while not stop.is_set():
+                start = time.perf_counter()
+                client.call("bench_ping", start, timeout=30)
+                latencies.append((time.perf_counter() - start) * 1000)
+                time.sleep(args.interval)
+
+        thread = threading.Thread(target=pinger)
+        thread.start()
+
+        def login(i):
+            response = requests.post(f"{base}/api/auth/login", json={
+                "email": f"bench{i % args.users}@example.com", "password": PASSWORD,
+            }, timeout=60)
+            return response.status_code == 200
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            ok = sum(pool.map(login, range(args.logins)))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        thread.join()
+        client.disconnect()
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "mode": "inline (hub)" if inline else "tpool",
+        "logins": ok,
+        "elapsed": elapsed,
+        "throughput": ok / elapsed,
+        "pings": len(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=float("nan")),
+        "mean": statistics.mean(latencies) if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--inline", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--users", type=int, default=20, help="utilisateurs inscrits avant la rafale")
+    parser.add_argument("--logins", type=int, default=200, help="nombre de logins dans la rafale")
+    parser.add_argument("--concurrency", type=int, default=20, help="logins simultanés")
+    parser.add_argument("--rounds", type=int, default=12, help="coût bcrypt (BCRYPT_LOG_ROUNDS)")
+    parser.add_argument("--interval", type=float, default=0.02, help="secondes entre deux pings Socket.IO")
+    parser.add_argument("--compare", action="store_true", help="comparer avec bcrypt exécuté sur le hub")
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.inline)
+
+    results = [run_scenario(args, inline=False)]
+    if args.compare:
+        results.append(run_scenario(args, inline=True))
+
+    print(f"\nbcrypt coût {args.rounds} | {args.logins} logins, {args.concurrency} simultanés\n")
+    print(f"{'mode':<14}{'logins/s':>10}{'pings':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for r in results:
+        print(f"{r['mode']:<14}{r['throughput']:>10.1f}{r['pings']:>8}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}{r['max']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
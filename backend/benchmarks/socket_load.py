@@ -0,0 +1,259 @@
+"""Test de charge Socket.IO : N rooms × M joueurs sur des parties complètes.
+
+Lance le serveur réel dans un sous-processus (base SQLite temporaire, générateur
+de questions remplacé par un stub instantané), puis pour chaque joueur :
+inscription, connexion Socket.IO authentifiée, `join_room`, `start_game` +
+POST /api/game/start (un joueur par room), réponses aux questions via
+/api/game/submit_answer, puis `leave_room` et déconnexion.
+
+Mesures : latence de join (jusqu'au `join_confirmation`), de diffusion des
+questions (émission serveur -> réception) et d'acquittement des réponses,
+p50/p95/p99, plus CPU et RSS du serveur.
+
+    python benchmarks/socket_load.py --rooms 10 --players 5 --rounds 3 --output run.json
+    python benchmarks/socket_load.py --rooms 10 --players 5 --rounds 3 --baseline run.json
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from harness import ProcessSampler, boot_app, percentile, start_server
+
+PASSWORD = "load-password"
+TOPIC, COUNTRY = "Geography", "France"  # thème sans sous-thème
+METRICS = ("join", "question", "answer")
+
+
+def serve(port, round_duration):
+    """ 📌 Sous-processus serveur : générateur stubbé, horodatage des questions émises """
+    app, socketio = boot_app()
+    import game_routes
+    from question_service import question_service
+    from questions import Question
+
+    counter = itertools.count(1)
+    question_service.generate = lambda topic, subtopic, country, coalesce=True: Question(
+        stem=f"Load test question {next(counter)} about {topic} in {country}?",
+        choices=("Paris", "Lyon", "Marseille", "Nice"),
+        answer="A",
+    )
+    game_routes.ROUND_DURATION = round_duration
+
+    emit = socketio.emit
+
+    def stamped_emit(event, *args, **kwargs):
+        if event == "new_question" and args:
+            args = ({**args[0], "sent_at": time.time()},) + args[1:]
+        return emit(event, *args, **kwargs)
+
+    socketio.emit = stamped_emit
+    socketio.run(app, host="127.0.0.1", port=port, log_output=False)
+
+
+class Player:
+    def __init__(self, base, index, args, results):
+        import requests
+        import socketio
+
+        self.base = base
+        self.args = args
+        self.results = results
+        self.http = requests.Session()
+        self.username = f"load{index}"
+        self.questions = 0
+        self.joined = threading.Event()
+        self.room_id = None
+        self._join_started = None
+
+        response = self.http.post(f"{base}/api/auth/register", json={
+            "username": self.username, "email": f"{self.username}@example.com", "password": PASSWORD,
+        }, timeout=60)
+        response.raise_for_status()
+        self.token = response.json()["token"]
+
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on("join_confirmation", self.on_join_confirmation)
+        self.sio.on("new_question", self.on_new_question)
+        self.sio.on("error", lambda data: results.error(data))
+
+    def connect(self):
+        self.sio.connect(self.base, auth={"token": self.token}, transports=["websocket"])
+
+    def join(self, room_id):
+        self.room_id = room_id
+        self._join_started = time.perf_counter()
+        self.sio.emit("join_room", {"room_id": room_id})
+
+    def on_join_confirmation(self, data):
+        if data.get("username") == self.username and not self.joined.is_set():
+            self.results.add("join", time.perf_counter() - self._join_started)
+            self.joined.set()
+
+    def on_new_question(self, data):
+        if "sent_at" in data:
+            self.results.add("question", time.time() - data["sent_at"])
+        self.questions += 1
+        threading.Thread(target=self.answer, daemon=True).start()
+
+    def answer(self):
+        time.sleep(random.uniform(0, self.args.think))
+        choice = "A" if random.random() < self.args.accuracy else random.choice("BCD")
+        start = time.perf_counter()
+        response = self.http.post(f"{self.base}/api/game/submit_answer", json={
+            "room_id": self.room_id, "username": self.username, "answer": choice,
+        }, timeout=60)
+        if response.status_code == 200:
+            self.results.add("answer", time.perf_counter() - start)
+        else:
+            self.results.error(response.text)
+
+    def leave(self):
+        self.sio.emit("leave_room", {"room_id": self.room_id})
+        self.sio.disconnect()
+
+
+class Results:
+    def __init__(self):
+        self.samples = {metric: [] for metric in METRICS}
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, metric, seconds):
+        with self._lock:
+            self.samples[metric].append(seconds * 1000)
+
+    def error(self, detail):
+        with self._lock:
+            self.errors += 1
+
+    def summary(self):
+        return {
+            metric: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for metric, values in self.samples.items()
+        }
+
+
+def run(args):
+    server, base = start_server(__file__, ["--round-duration", str(args.round_duration)], {"BCRYPT_LOG_ROUNDS": "4"})
+    results = Results()
+    import requests
+
+    try:
+        total = args.rooms * args.players
+        with ThreadPoolExecutor(16) as pool:
+            players = list(pool.map(lambda i: Player(base, i, args, results), range(total)))
+            room_ids = [
+                requests.post(f"{base}/api/rooms", json={"name": f"load-{i}-{time.time_ns()}"}, timeout=60).json()["room_id"]
+                for i in range(args.rooms)
+            ]
+            list(pool.map(Player.connect, players))
+
+        sampler = ProcessSampler(server.pid).start()
+        started = time.perf_counter()
+
+        rooms = [players[i * args.players:(i + 1) * args.players] for i in range(args.rooms)]
+        for room_id, members in zip(room_ids, rooms):
+            for player in members:
+                player.join(room_id)
+        for player in players:
+            player.joined.wait(30)
+
+        for room_id, members in zip(room_ids, rooms):
+            host = members[0]
+            host.sio.emit("start_game", {"room_id": room_id})
+            response = host.http.post(f"{base}/api/game/start", json={
+                "room_id": room_id, "topic": TOPIC, "country": COUNTRY,
+            }, timeout=60)
+            if response.status_code != 200:
+                results.error(response.text)
+
+        deadline = time.monotonic() + args.rounds * (args.round_duration + 5) + 10
+        while time.monotonic() < deadline and any(p.questions < args.rounds for p in players):
+            time.sleep(0.2)
+        time.sleep(args.think + 0.5)  # dernières réponses
+
+        for room_id in room_ids:
+            requests.post(f"{base}/api/game/end", json={"room_id": room_id}, timeout=60)
+        for player in players:
+            player.leave()
+
+        elapsed = time.perf_counter() - started
+        resources = sampler.stop()
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "rooms": args.rooms,
+        "players": args.players,
+        "rounds": args.rounds,
+        "elapsed": elapsed,
+        "errors": results.errors,
+        "latency_ms": results.summary(),
+        "server": resources,
+    }
+
+
+def report(run_result, baseline=None):
+    print(f"\n{run_result['rooms']} rooms × {run_result['players']} joueurs, {run_result['rounds']} rounds "
+          f"({run_result['elapsed']:.1f} s, {run_result['errors']} erreurs)\n")
+    print(f"{'mesure':<10}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for metric in METRICS:
+        stats = run_result["latency_ms"][metric]
+        line = f"{metric:<10}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}"
+        if baseline:
+            before = baseline["latency_ms"][metric]
+            line += "   (p95 " + delta(stats["p95"], before["p95"]) + ", p99 " + delta(stats["p99"], before["p99"]) + ")"
+        print(line)
+
+    server = run_result["server"]
+    line = f"\nserveur : CPU moyen {server['cpu_avg']:.0f} %, max {server['cpu_max']:.0f} %, RSS max {server['rss_max_mb']:.0f} Mo"
+    if baseline:
+        line += f" (RSS {delta(server['rss_max_mb'], baseline['server']['rss_max_mb'])})"
+    print(line)
+
+
+def delta(now, before):
+    if not before:
+        return "n/a"
+    return f"{(now - before) / before * 100:+.0f} %"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--rooms", type=int, default=10, help="nombre de rooms (N)")
+    parser.add_argument("--players", type=int, default=5, help="joueurs par room (M)")
+    parser.add_argument("--rounds", type=int, default=3, help="questions par partie")
+    parser.add_argument("--round-duration", type=float, default=3, help="durée d'un round côté serveur (s)")
+    parser.add_argument("--think", type=float, default=1.0, help="délai de réponse maximal d'un joueur (s)")
+    parser.add_argument("--accuracy", type=float, default=0.5, help="probabilité de bonne réponse")
+    parser.add_argument("--output", help="fichier JSON où enregistrer les résultats")
+    parser.add_argument("--baseline", help="résultats JSON d'une exécution précédente à comparer")
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.round_duration)
+
+    result = run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report(result, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
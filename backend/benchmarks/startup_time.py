@@ -0,0 +1,185 @@
+"""Benchmark : temps de démarrage du serveur jusqu'à la première requête servie.
+
+Deux modes :
+
+- single   un processus `create_app()` + `socketio.run`, chronométré du lancement
+           du sous-processus jusqu'à la première réponse 200 sur `/`
+- prefork  un maître appelle `create_app()` une seule fois, ouvre le socket
+           d'écoute puis forke W workers qui servent tous le même socket ; on
+           mesure la première réponse et le moment où les W workers ont répondu
+           (en-tête X-Worker-Pid)
+
+Avec `--breakdown`, le serveur détaille aussi le temps d'import de `app` et celui de `create_app()`.
+
+    python benchmarks/startup_time.py --repeat 5 --workers 4 --breakdown
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from harness import BACKEND_DIR, free_port, percentile
+
+MARKER = "startup "
+
+
+def serve(port, workers):
+    """ 📌 Sous-processus serveur ; la durée des étapes est écrite sur stderr """
+    started = time.perf_counter()
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    imported = time.perf_counter()
+    app = create_app()
+    created = time.perf_counter()
+    sys.stderr.write(MARKER + json.dumps({"import": imported - started, "create_app": created - imported}) + "\n")
+    sys.stderr.flush()
+
+    @app.after_request
+    def worker_pid(response):
+        response.headers["X-Worker-Pid"] = str(os.getpid())
+        return response
+
+    if not workers:
+        from extensions import socketio
+        return socketio.run(app, host="127.0.0.1", port=port, log_output=False)
+    prefork(app, port, workers)
+
+
+def prefork(app, port, workers):
+    """ ✅ Application créée une fois dans le maître, socket partagé entre les workers forkés """
+    import signal
+    import eventlet
+    import eventlet.wsgi
+    from extensions import db
+
+    sock = eventlet.listen(("127.0.0.1", port))
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            with app.app_context():
+                db.engine.dispose(close=False)  # ⚠️ Ne jamais partager les connexions du maître
+            eventlet.wsgi.server(sock, app, log_output=False)
+            os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for child in children:
+            os.kill(child, signal.SIGTERM)
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    for child in children:
+        os.waitpid(child, 0)
+
+
+def get_pid(port, timeout=1):
+    """ ✅ Une requête sur une nouvelle connexion ; renvoie le pid du worker ou None """
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        connection.request("GET", "/", headers={"Connection": "close"})
+        response = connection.getresponse()
+        response.read()
+        return response.getheader("X-Worker-Pid") if response.status == 200 else None
+    except OSError:
+        return None
+    finally:
+        connection.close()
+
+
+def measure(workers, deadline=60):
+    port = free_port()
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}")
+    env.setdefault("OPENAI_API_KEY", "bench")
+    env.pop("REDIS_URL", None)
+
+    cmd = [sys.executable, os.path.abspath(__file__), "--serve", str(port), "--workers", str(workers)]
+    spawned = time.perf_counter()
+    server = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    breakdown = {}
+
+    def read_stderr():
+        for line in server.stderr:
+            if line.startswith(MARKER):
+                breakdown.update(json.loads(line[len(MARKER):]))
+
+    threading.Thread(target=read_stderr, daemon=True).start()
+
+    try:
+        end = spawned + deadline
+        first, seen = None, set()
+        while time.perf_counter() < end and first is None:
+            pid = get_pid(port)
+            if pid:
+                first = time.perf_counter() - spawned
+                seen.add(pid)
+            else:
+                time.sleep(0.005)
+        if first is None:
+            raise RuntimeError("Le serveur n'a pas répondu")
+
+        # 📌 Requêtes concurrentes jusqu'à avoir vu répondre chaque worker
+        lock = threading.Lock()
+
+        def poll():
+            while time.perf_counter() < end and len(seen) < max(workers, 1):
+                pid = get_pid(port)
+                if pid:
+                    with lock:
+                        seen.add(pid)
+
+        pollers = [threading.Thread(target=poll) for _ in range(max(workers, 1) * 2)]
+        for poller in pollers:
+            poller.start()
+        for poller in pollers:
+            poller.join()
+        all_workers = time.perf_counter() - spawned if len(seen) >= max(workers, 1) else float("nan")
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {"first": first, "all_workers": all_workers, "workers_seen": len(seen), **breakdown}
+
+
+def summarize(name, runs, breakdown):
+    def row(label, key):
+        values = [run[key] * 1000 for run in runs if key in run]
+        if values:
+            print(f"  {label:<24}{percentile(values, 50):>10.0f}{min(values):>10.0f}{max(values):>10.0f}")
+
+    print(f"\n{name} ({len(runs)} lancements)")
+    print(f"  {'ms':<24}{'médiane':>10}{'min':>10}{'max':>10}")
+    row("première réponse", "first")
+    if name.startswith("prefork"):
+        row("tous les workers", "all_workers")
+    if breakdown:
+        row("import app", "import")
+        row("create_app()", "create_app")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--repeat", type=int, default=5, help="lancements par mode")
+    parser.add_argument("--workers", type=int, default=4, help="workers du mode prefork (0 = mode single uniquement)")
+    parser.add_argument("--breakdown", action="store_true", help="afficher le détail import / create_app")
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.workers)
+
+    single = [measure(0) for _ in range(args.repeat)]
+    summarize("single", single, args.breakdown)
+    if args.workers:
+        forked = [measure(args.workers) for _ in range(args.repeat)]
+        summarize(f"prefork × {args.workers}", forked, args.breakdown)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,34 @@ from datetime import timedelta
 # 📌 Charger les variables d'environnement
 load_dotenv()
 
+
+def _db_profile(url):
+    """ 📌 Profil du moteur pour une URL : DB_PROFILE, ou "auto" = "sqlite" / "server" selon le schéma """
+    profile = os.getenv("DB_PROFILE", "auto").lower()
+    if profile != "auto":
+        return profile
+    return "sqlite" if url.startswith("sqlite") else "server"
+
+
+def _engine_options(url):
+    """ ✅ Options create_engine du profil (SQLALCHEMY_ENGINE_OPTIONS ou entrée de SQLALCHEMY_BINDS) """
+    profile = _db_profile(url)
+    if profile == "sqlite":
+        # Attente d'un verrou en secondes côté pilote ; WAL et synchronous sont posés à la connexion (database.py)
+        return {"connect_args": {"timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")) / 1000}}
+    if profile == "server":
+        # ⚠️ Une connexion par greenthread qui touche la base : le pool doit couvrir la concurrence eventlet.
+        # Le pilote doit être en pur Python (PyMySQL, pg8000) ou "green" pour ne pas bloquer le hub.
+        return {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),  # sous le wait_timeout du serveur
+            "pool_pre_ping": True,  # ✅ Connexions coupées (redémarrage, pare-feu) détectées avant usage
+        }
+    return {}  # "default" : réglages SQLAlchemy d'origine
+
+
 class Config:
     """Configuration principale pour l'application Flask"""
 
@@ -18,24 +46,103 @@ class Config:
         JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=int(jwt_expiration)) if jwt_expiration.isdigit() else False
     except ValueError:
         JWT_ACCESS_TOKEN_EXPIRES = False  # Fallback if misconfigured
-    print(f"🕒 Durée du token JWT : {JWT_ACCESS_TOKEN_EXPIRES}")
 
     # 📌 Configuration de la base de données
     DATABASE_URL = os.getenv('DATABASE_URL')
 
     if not DATABASE_URL:
         BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-        DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'database.db')}"
-        print(f"⚠️ Aucune base distante définie, basculement sur SQLite: {DATABASE_URL}")
-    else:
-        print(f"✅ Base de données utilisée: {DATABASE_URL}")
+        DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'database.db')}"  # ⚠️ Aucune base distante définie
 
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # 🗄️ Profil du moteur (DB_PROFILE) : "sqlite" (WAL, synchronous=NORMAL, SQLITE_BUSY_TIMEOUT en ms),
+    # "server" (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, pre-ping),
+    # "default" (aucun réglage) ; "auto" choisit selon l'URL
+    DB_PROFILE = _db_profile(DATABASE_URL)
+    SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(DATABASE_URL)
+
+    # 📖 Réplica en lecture seule : les SELECT des vues marquées @replica_reads y sont envoyés (bind "replica")
+    DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+    SQLALCHEMY_BINDS = {"replica": {"url": DATABASE_REPLICA_URL, **_engine_options(DATABASE_REPLICA_URL)}} if DATABASE_REPLICA_URL else {}
+
+    # 🔐 Coût bcrypt (2^n itérations) ; les hashs existants sont recalculés à la connexion
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+
+    # 🪪 Cache des identités joueurs (id / pseudo) : taille max et durée de vie (secondes)
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "300"))
+
+    # 📝 Logs : niveau global, niveaux par sous-système (auth, rooms, sockets, game, music, ex: "sockets=DEBUG,rooms=WARNING"),
+    # format (json / text), taille de la file d'écriture et débit max par site d'appel (0 = illimité)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "20"))
+    LOG_RATE_BURST = int(os.getenv("LOG_RATE_BURST", "50"))
+
+    # 🔀 Mode multi-workers : file de messages Socket.IO et présence partagée (ex: redis://localhost:6379/0)
+    REDIS_URL = os.getenv("REDIS_URL")
+
+    # 👥 Écriture par lots de la room des joueurs connectés (secondes)
+    PRESENCE_FLUSH_INTERVAL = int(os.getenv("PRESENCE_FLUSH_INTERVAL", "2"))
+
+    # 🤖 Génération des questions (OpenAI ou endpoint compatible, ex: faux serveur local)
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))   # appels simultanés max
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "15"))                # secondes par tentative
+    LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "30"))              # secondes au total (file + essais)
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))  # échecs avant ouverture
+    LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))       # secondes avant nouvel essai
+
+    # 🎵 Spotify (les URL peuvent pointer vers un faux serveur local)
+    SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
+    SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+    SPOTIFY_ACCOUNTS_URL = os.getenv("SPOTIFY_ACCOUNTS_URL", "https://accounts.spotify.com")
+    SPOTIFY_API_URL = os.getenv("SPOTIFY_API_URL", "https://api.spotify.com")
+    SPOTIFY_TIMEOUT = float(os.getenv("SPOTIFY_TIMEOUT", "10"))
+    SPOTIFY_POOL_SIZE = int(os.getenv("SPOTIFY_POOL_SIZE", "10"))        # connexions keep-alive
+    SPOTIFY_TRACK_BUFFER = int(os.getenv("SPOTIFY_TRACK_BUFFER", "20"))  # morceaux prêts par genre
+
+    # 🎧 Cache local des extraits audio
+    PREVIEW_CACHE_DIR = os.getenv("PREVIEW_CACHE_DIR", os.path.join(os.path.abspath(os.path.dirname(__file__)), "preview_cache"))
+    PREVIEW_CACHE_MAX_MB = int(os.getenv("PREVIEW_CACHE_MAX_MB", "200"))
+    PREVIEW_PREFETCH_NEXT = os.getenv("PREVIEW_PREFETCH_NEXT", "true").lower() == "true"  # extrait du round suivant
+
+    # 🧠 Réserve de questions pré-générées (par thème)
+    QUESTION_POOL_SIZE = int(os.getenv("QUESTION_POOL_SIZE", "3"))
+    QUESTION_POOL_WORKERS = int(os.getenv("QUESTION_POOL_WORKERS", "4"))
+
+    # 🔁 Questions déjà posées dans une partie : seuil de similarité (MinHash, 0-1), questions gardées par thème
+    # pour remplacer un doublon sans appel au LLM, nouveaux tirages max avant de reposer une question
+    QUESTION_DEDUP_THRESHOLD = float(os.getenv("QUESTION_DEDUP_THRESHOLD", "0.7"))
+    QUESTION_CACHE_SIZE = int(os.getenv("QUESTION_CACHE_SIZE", "200"))
+    QUESTION_DEDUP_ATTEMPTS = int(os.getenv("QUESTION_DEDUP_ATTEMPTS", "3"))
+
+    # 🚪 Nombre maximum de joueurs par room (filtre "places libres" du lobby)
+    ROOM_MAX_PLAYERS = int(os.getenv("ROOM_MAX_PLAYERS", "10"))
+
+    # 📡 Flux du lobby : diffs regroupés et émis une fois par tick (secondes)
+    LOBBY_TICK = float(os.getenv("LOBBY_TICK", "0.25"))
+
+    # 📝 Écriture différée des scores (secondes entre deux vidages du tampon)
+    ANSWER_FLUSH_INTERVAL = int(os.getenv("ANSWER_FLUSH_INTERVAL", "30"))
+
     # 🌍 Activer CORS (nécessaire pour le front React)
     CORS_HEADERS = "Content-Type"
 
+    @classmethod
+    def database_label(cls):
+        """ ✅ URL de la base sans le mot de passe (pour les logs de démarrage) """
+        from sqlalchemy.engine import make_url
+        return make_url(cls.SQLALCHEMY_DATABASE_URI).render_as_string(hide_password=True)
+
     @staticmethod
     def init_app(app):
         """Permet d'ajouter des configurations supplémentaires à l'initialisation."""
@@ -0,0 +1,25 @@
+from sqlalchemy import event
+from extensions import db
+from log import get_logger
+
+log = get_logger("db")
+
+
+def _sqlite_pragmas(busy_timeout):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")  # ✅ Les lecteurs ne bloquent plus l'écrivain (et inversement)
+        cursor.execute("PRAGMA synchronous=NORMAL")  # ✅ fsync au checkpoint seulement, sûr en mode WAL
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+        cursor.close()
+    return on_connect
+
+
+def init_database(app):
+    """ ✅ Réglages par connexion du profil "sqlite" sur chaque moteur SQLite (principal et réplica) """
+    busy_timeout = app.config.get("SQLITE_BUSY_TIMEOUT", 5000)
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if engine.dialect.name == "sqlite" and app.config.get("DB_PROFILE") == "sqlite":
+                event.listen(engine, "connect", _sqlite_pragmas(busy_timeout))
+            log.info("🗄️ Moteur %s : profil %s, %s", key or "principal", app.config.get("DB_PROFILE"), type(engine.pool).__name__)
@@ -1,12 +1,56 @@
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_socketio import SocketIO
+from flask_migrate import Migrate
 
 
 
 
-db = SQLAlchemy()
+# 📌 Seules les vues marquées `@replica_reads` (tolérantes au retard de réplication) envoient
+# leurs SELECT sur le réplica (bind "replica", DATABASE_REPLICA_URL). Les écritures restent sur
+# la base principale, et après la première écriture la session n'y lit plus (read-your-writes).
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or not getattr(clause, "is_select", False):
+                self.info["wrote"] = True
+            elif not self.info.get("wrote") and has_request_context() and g.get("replica_reads"):
+                replica = self._db.engines.get("replica")
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_reads(view):
+    """ ✅ Vue dont les lectures peuvent avoir quelques secondes de retard (ex: classements) """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_reads = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """ ✅ Lectures sur la base principale dans ce bloc (ex: chargement d'un index qui survit à la requête) """
+    if not has_request_context():
+        yield
+        return
+    previous = g.get("replica_reads", False)
+    g.replica_reads = False
+    try:
+        yield
+    finally:
+        g.replica_reads = previous
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
+migrate = Migrate(render_as_batch=True)  # ✅ Mode batch : ALTER compatibles SQLite
 jwt = JWTManager()
 socketio = SocketIO(cors_allowed_origins="*", async_mode="eventlet")  # Ajout de async_mode
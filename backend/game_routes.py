@@ -1,16 +1,27 @@
+import json
 from flask import Blueprint, request, jsonify
-from flask_socketio import emit
+from flask_jwt_extended import jwt_required
 from extensions import db, socketio
-from models import Game, Score, User, Room
-import openai
-import eventlet
-import os
-
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from models import Game, Room
+from config import Config
+from question_pool import QuestionPool
+from question_dedup import QuestionIndex
+from question_service import question_service
+from questions import Question, parse_choice
+from answer_buffer import answer_buffer
+from scoreboard import scoreboards
+from lobby_cache import lobby_cache
+from lobby_feed import lobby_feed
+from leaderboard import leaderboard
+from round_scheduler import round_scheduler
+from identity_cache import identity_cache
 
 game_bp = Blueprint("game", __name__)
 
+POINTS_PER_ANSWER = 10
+WINNING_SCORE = 100
+ROUND_DURATION = 30  # seconds
+
 # Define available topics, subtopics, and European countries
 topics = {
     "Science": ["Physics", "Biology", "Chemistry", "Astronomy"],
@@ -49,25 +60,33 @@ def get_subtopics():
 def get_european_countries():
     return jsonify({"countries": EUROPEAN_COUNTRIES})
 
-# Function to generate a quiz question
+# Parsed question of the current round, keyed by game id: (stored record, round number, Question).
+# Rounds are driven by the worker that started the game, answers may reach any worker:
+# the record in `Game` is the source of truth and a stale cached entry is re-parsed.
+current_questions = {}
+
+# Function to generate a quiz question (coalesced, bounded, with deadline and retries)
 def generate_question(topic, subtopic, country):
-    prompt = f"Create a multiple-choice quiz question about {topic} in {country}. "
-    if subtopic:
-        prompt += f"Specifically, focus on {subtopic}. "
-    prompt += "Provide 4 answer choices labeled A, B, C, and D. Clearly indicate the correct answer at the end."
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a quiz generator that creates country-specific questions."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"⚠️ Error generating question: {e}")
-        return None
+    return question_service.generate(topic, subtopic, country)
+
+# Refills must produce distinct questions, so they are not coalesced
+def prefetch_question(topic, subtopic, country):
+    return question_service.generate(topic, subtopic, country, coalesce=False)
+
+# Pool of pre-generated questions so rounds never wait on the LLM
+question_pool = QuestionPool(
+    prefetch_question,
+    size=Config.QUESTION_POOL_SIZE,
+    workers=Config.QUESTION_POOL_WORKERS,
+    fallback=generate_question,
+)
+
+# Questions already asked per game (exact and near-duplicates), with a per-theme cache of replacements
+question_index = QuestionIndex(
+    threshold=Config.QUESTION_DEDUP_THRESHOLD,
+    cache_size=Config.QUESTION_CACHE_SIZE,
+    attempts=Config.QUESTION_DEDUP_ATTEMPTS,
+)
 
 # Route to generate a quiz question
 @game_bp.route("/generate_question", methods=["POST"])
@@ -86,7 +105,7 @@ def generate_question_route():
 
     question = generate_question(topic, subtopic, country)
     if question:
-        return jsonify({"question": question})
+        return jsonify({**question.public_dict(), "answer": question.answer})
     else:
         return jsonify({"error": "Failed to generate a question"}), 500
 
@@ -115,45 +134,97 @@ def start_game():
         return jsonify({"error": "A game is already in progress"}), 400
 
     new_game = Game(room_id=room_id, status="playing")
+    new_game.question_type = topic  # Topic of the quiz, used by the per-topic leaderboards
+    room.status = "playing"
     db.session.add(new_game)
     db.session.commit()
+    lobby_cache.invalidate()
+    lobby_feed.game_started(room_id, new_game.id)
 
-    eventlet.spawn(start_round, new_game.id, room_id, topic, subtopic, country)
+    question_pool.warm(topic, subtopic, country)
+    round_scheduler.schedule(round_key(new_game.id), 0, start_round, new_game.id, room_id, topic, subtopic, country)
 
     return jsonify({"message": "Game started", "game_id": new_game.id})
 
+# Scheduler key of a game's next round deadline
+def round_key(game_id):
+    return ("round", game_id)
+
+# Round number stored with the current question (answers are de-duplicated per round)
+def round_number(record):
+    return json.loads(record).get("round", 0) if record else 0
+
 # Function to start a round
 def start_round(game_id, room_id, topic, subtopic, country):
     game = Game.query.get(game_id)
-    if not game:
+    if not game or game.status != "playing":
         return
 
-    question = generate_question(topic, subtopic, country)
+    # Checked against this game's previous questions before it is broadcast
+    question = question_index.pick(
+        game.id, (topic, subtopic or "", country), lambda: question_pool.take(topic, subtopic, country)
+    )
     if not question:
-        emit("error", {"error": "Failed to generate a question"}, room=room_id)
+        socketio.emit("error", {"error": "Failed to generate a question"}, room=room_id)
+        return
+
+    # Conditional update: the game may have been ended while the question was generated
+    number = round_number(game.current_question) + 1
+    record = question.to_json(round_number=number)
+    installed = Game.query.filter_by(id=game.id, status="playing").update(
+        {"current_question": record, "correct_answer": question.answer}
+    )
+    db.session.commit()
+    if not installed:
         return
+    current_questions[game.id] = (record, number, question)
 
-    socketio.emit("new_question", {"question": question}, room=room_id)
-    eventlet.spawn_after(30, end_round, game.id, room_id, topic, subtopic, country)
+    socketio.emit("new_question", question.public_dict(), room=room_id)
+    round_scheduler.schedule(round_key(game.id), ROUND_DURATION, end_round, game.id, room_id, topic, subtopic, country)
 
 # Function to end a round and start a new one
 def end_round(game_id, room_id, topic, subtopic, country):
     game = Game.query.get(game_id)
     if not game or game.status != "playing":
         return
-    
+
+    answer_buffer.close_round(game.id)
+    changes = scoreboards.get(game.id).pop_changes()
+    if changes:
+        socketio.emit("update_scores", {"scores": changes}, room=room_id)
+
     winner = check_winner(game.id)
     if winner:
-        socketio.emit("game_over", {"winner": winner.username, "score": winner.score}, room=room_id)
+        finish_game(game, room_id)
+        socketio.emit("game_over", {"winner": winner["username"], "score": winner["score"]}, room=room_id)
         return
 
     start_round(game.id, room_id, topic, subtopic, country)
 
+# Function to finish a game: persist the last answers, then add its scores to the leaderboards
+def finish_game(game, room_id):
+    round_scheduler.cancel(round_key(game.id))
+    answer_buffer.finish(game.id)
+
+    # Conditional update so only one caller (winner round or /end) finalizes the game
+    finished = Game.query.filter_by(id=game.id, status="playing").update({"status": "finished"})
+    Room.query.filter_by(id=room_id).update({"status": "waiting"})
+    db.session.commit()
+    lobby_cache.invalidate()
+    lobby_feed.game_ended(room_id)
+    current_questions.pop(game.id, None)
+    question_index.forget(game.id)
+    scoreboards.discard(game.id)
+
+    if finished:
+        room = Room.query.get(room_id)
+        leaderboard.record_game(game.id, genre=room.genre if room else None, topic=game.question_type)
+
 # Function to check if a player has won
 def check_winner(game_id):
-    scores = Score.query.filter_by(game_id=game_id).order_by(Score.score.desc()).all()
-    if scores and scores[0].score >= 100:
-        return User.query.get(scores[0].user_id)
+    leader = scoreboards.get(game_id).leader()
+    if leader and leader["score"] >= WINNING_SCORE:
+        return leader
     return None
 
 # Route to submit an answer (HTTP Alternative to WebSockets)
@@ -164,7 +235,10 @@ def submit_answer():
     username = data.get("username")
     answer = data.get("answer")
 
-    user = User.query.filter_by(username=username).first()
+    if parse_choice(answer) is None:
+        return jsonify({"error": "Answer must be one of A, B, C or D"}), 400
+
+    user = identity_cache.get_by_username(username)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -172,16 +246,20 @@ def submit_answer():
     if not game:
         return jsonify({"error": "No active game"}), 400
 
-    correct_answer = game.current_question.split("\n")[-1]
-    correct = answer.lower() in correct_answer.lower()
+    if not game.current_question:
+        return jsonify({"error": "No active question"}), 400
+    record, number, question = current_questions.get(game.id, (None, None, None))
+    if record != game.current_question:
+        number = round_number(game.current_question)
+        question = Question.from_record(game.current_question, game.correct_answer)
+        current_questions[game.id] = (game.current_question, number, question)
+
+    correct = question.is_correct(answer)
 
+    if not answer_buffer.record(game.id, number, user.id, POINTS_PER_ANSWER if correct else 0):
+        return jsonify({"error": "Answer already submitted for this round"}), 400
     if correct:
-        score = Score.query.filter_by(user_id=user.id, game_id=game.id).first()
-        if not score:
-            score = Score(user_id=user.id, game_id=game.id, score=0)
-            db.session.add(score)
-        score.score += 10
-        db.session.commit()
+        scoreboards.get(game.id).add(user.id, user.username, POINTS_PER_ANSWER)
 
     return jsonify({"message": "Answer received", "correct": correct})
 
@@ -195,11 +273,22 @@ def end_game():
     if not game:
         return jsonify({"error": "No active game"}), 404
 
-    game.status = "finished"
-    db.session.commit()
+    finish_game(game, room_id)
 
     return jsonify({"message": "Game ended successfully."})
 
+# Route to inspect the round scheduler (pending deadlines and scheduling lag)
+@game_bp.route("/scheduler", methods=["GET"])
+@jwt_required()
+def get_scheduler_stats():
+    return jsonify(round_scheduler.stats())
+
+# Route to inspect question de-duplication (duplicates caught, LLM calls saved by the theme cache)
+@game_bp.route("/dedup", methods=["GET"])
+@jwt_required()
+def get_dedup_stats():
+    return jsonify(question_index.stats())
+
 # Register the blueprint
 def init_game_routes(app):
     app.register_blueprint(game_bp, url_prefix="/api/game")
\ No newline at end of file
@@ -0,0 +1,117 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import event
+from config import Config
+from extensions import db
+from models import User
+
+
+@dataclass(frozen=True)
+class UserIdentity:
+    id: int
+    username: str
+    email: str
+    profile_picture: str = None
+
+
+# 📌 Cache des identités joueurs (id, pseudo, email, avatar), indexé par id et par pseudo.
+# LRU borné + TTL ; vidé pour un joueur dès qu'il est créé, modifié ou supprimé
+# (événements SQLAlchemy). Les autres workers convergent au plus tard après le TTL.
+# On stocke des instantanés immuables, jamais des objets ORM (liés à une session).
+class IdentityCache:
+    COLUMNS = (User.id, User.username, User.email, User.profile_picture)
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._by_id = OrderedDict()  # id -> (expiration, UserIdentity)
+        self._by_username = {}       # pseudo -> id
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        """ ✅ Identité du joueur `user_id`, ou None s'il n'existe pas """
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None  # ✅ Identifiant absent ou non numérique (ex: JSON d'un client REST) : introuvable
+        identity = self._lookup(user_id)
+        if identity is None:
+            identity = self._load(User.id == user_id)
+        return identity
+
+    def get_by_username(self, username):
+        user_id = self._by_username.get(username)
+        identity = self._lookup(user_id) if user_id is not None else None
+        if identity is None:
+            identity = self._load(User.username == username)
+        return identity
+
+    def get_many(self, user_ids):
+        """ ✅ {id: identité} ; les absents du cache sont chargés en une seule requête """
+        found, missing = {}, []
+        for user_id in user_ids:
+            identity = self._lookup(user_id)
+            if identity is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = identity
+        if missing:
+            for row in db.session.query(*self.COLUMNS).filter(User.id.in_(missing)):
+                found[row.id] = self._put(UserIdentity(*row))
+        return found
+
+    def invalidate(self, user_id=None, username=None):
+        if username is not None and user_id is None:
+            user_id = self._by_username.get(username)
+        entry = self._by_id.pop(user_id, None)
+        if entry is not None:
+            self._by_username.pop(entry[1].username, None)
+        if username is not None:
+            self._by_username.pop(username, None)
+
+    def clear(self):
+        self._by_id.clear()
+        self._by_username.clear()
+
+    def stats(self):
+        return {"entries": len(self._by_id), "hits": self.hits, "misses": self.misses}
+
+    def _lookup(self, user_id):
+        entry = self._by_id.get(user_id)
+        if entry is None:
+            return None
+        expires_at, identity = entry
+        if time.monotonic() >= expires_at:
+            self.invalidate(user_id)
+            return None
+        self._by_id.move_to_end(user_id)
+        self.hits += 1
+        return identity
+
+    def _load(self, criterion):
+        self.misses += 1
+        row = db.session.query(*self.COLUMNS).filter(criterion).first()
+        return self._put(UserIdentity(*row)) if row else None
+
+    def _put(self, identity):
+        self.invalidate(identity.id)
+        self._by_id[identity.id] = (time.monotonic() + self.ttl, identity)
+        self._by_username[identity.username] = identity.id
+        while len(self._by_id) > self.max_entries:
+            _, (_, evicted) = self._by_id.popitem(last=False)
+            self._by_username.pop(evicted.username, None)
+        return identity
+
+
+identity_cache = IdentityCache(Config.IDENTITY_CACHE_SIZE, Config.IDENTITY_CACHE_TTL)
+
+
+# ✅ Invalidation explicite à chaque création / modification / suppression d'un joueur
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    identity_cache.invalidate(target.id)
+    identity_cache.invalidate(username=target.username)
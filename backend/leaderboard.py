@@ -0,0 +1,242 @@
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+import eventlet
+import redis
+from eventlet.semaphore import Semaphore
+from sortedcontainers import SortedList
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from extensions import db, primary_reads
+from models import LeaderboardEntry, Score
+
+PERIODS = ("all", "week", "month")
+LOAD_PAGE_SIZE = 1000
+
+
+def period_key(period, now=None):
+    """ ✅ Clé de la période courante : "all", "week:2025-W14" ou "month:2025-04" """
+    now = now or datetime.utcnow()
+    if period == "week":
+        year, week, _ = now.isocalendar()
+        return f"week:{year}-W{week:02d}"
+    if period == "month":
+        return f"month:{now:%Y-%m}"
+    return "all"
+
+
+def entries_page(key, after=0, limit=LOAD_PAGE_SIZE):
+    """ ✅ Page d'un classement par user_id croissant (pagination par clé, sans OFFSET) """
+    board, period = key
+    return (
+        select(LeaderboardEntry.user_id, LeaderboardEntry.total_score)
+        .where(LeaderboardEntry.board == board, LeaderboardEntry.period == period, LeaderboardEntry.user_id > after)
+        .order_by(LeaderboardEntry.user_id)
+        .limit(limit)
+    )
+
+
+def boards_for(genre=None, topic=None):
+    boards = ["all"]
+    if genre:
+        boards.append(f"genre:{genre}")
+    if topic:
+        boards.append(f"topic:{topic}")
+    return boards
+
+
+# 📌 Index de rang en mémoire d'un classement : rang et top N en O(log n)
+class MemoryRankIndex:
+    def __init__(self, max_boards=64):
+        self.max_boards = max_boards
+        self._boards = OrderedDict()  # (board, period) -> (SortedList[(-score, user_id)], {user_id: score})
+        self._locks = {}              # (board, period) -> Semaphore
+
+    def lock(self, key):
+        return self._locks.setdefault(key, Semaphore())
+
+    def loaded(self, key):
+        return key in self._boards
+
+    def load(self, key, rows):
+        ranking, scores = SortedList(), {}
+        for user_id, score in rows:
+            ranking.add((-score, user_id))
+            scores[user_id] = score
+        self._boards[key] = (ranking, scores)
+        while len(self._boards) > self.max_boards:
+            self._boards.popitem(last=False)
+
+    def incr(self, key, user_id, points):
+        ranking, scores = self._boards[key]
+        old = scores.get(user_id)
+        if old is not None:
+            ranking.remove((-old, user_id))
+        scores[user_id] = (old or 0) + points
+        ranking.add((-scores[user_id], user_id))
+
+    def top(self, key, n):
+        self._boards.move_to_end(key)
+        return [(user_id, -score) for score, user_id in self._boards[key][0][:n]]
+
+    def rank(self, key, user_id):
+        self._boards.move_to_end(key)
+        ranking, scores = self._boards[key]
+        if user_id not in scores:
+            return None, None
+        return ranking.index((-scores[user_id], user_id)) + 1, scores[user_id]
+
+
+# 📌 Même index dans des sorted sets Redis (partagé entre les workers)
+class RedisRankIndex:
+    KEY = "leaderboard:{}:{}"
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, key):
+        return self.KEY.format(*key)
+
+    @contextmanager
+    def lock(self, key, timeout=120, wait=60):
+        """ ✅ Verrou partagé entre les workers (chargement de l'index / enregistrement d'une partie) """
+        name, token = self._key(key) + ":lock", uuid.uuid4().hex
+        give_up = time.monotonic() + wait
+        while not self.client.set(name, token, nx=True, ex=timeout):
+            if time.monotonic() > give_up:
+                raise TimeoutError(f"Verrou du classement {key} indisponible")
+            eventlet.sleep(0.05)
+        try:
+            yield
+        finally:
+            if self.client.get(name) == token.encode():
+                self.client.delete(name)
+
+    def loaded(self, key):
+        return self.client.exists(self._key(key) + ":loaded") == 1
+
+    def load(self, key, rows):
+        """ ✅ Envoyé par lots de LOAD_PAGE_SIZE : jamais tout le classement en mémoire """
+        self.client.delete(self._key(key))
+        batch = {}
+        for user_id, score in rows:
+            batch[user_id] = score
+            if len(batch) >= LOAD_PAGE_SIZE:
+                self.client.zadd(self._key(key), batch)
+                batch = {}
+        if batch:
+            self.client.zadd(self._key(key), batch)
+        self.client.set(self._key(key) + ":loaded", 1)
+
+    def incr(self, key, user_id, points):
+        self.client.zincrby(self._key(key), points, user_id)
+
+    def top(self, key, n):
+        return [(int(user_id), int(score)) for user_id, score in self.client.zrevrange(self._key(key), 0, n - 1, withscores=True)]
+
+    def rank(self, key, user_id):
+        pipe = self.client.pipeline()
+        pipe.zrevrank(self._key(key), user_id)
+        pipe.zscore(self._key(key), user_id)
+        rank, score = pipe.execute()
+        if rank is None:
+            return None, None
+        return rank + 1, int(score)
+
+
+# 📌 Classements globaux : table d'agrégats `LeaderboardEntry` (persistance) + index de rang.
+# Le chargement d'un index et l'enregistrement d'une partie prennent le verrou du classement :
+# une partie est soit dans les lignes chargées, soit ajoutée à l'index déjà chargé, jamais perdue.
+class Leaderboard:
+    def __init__(self):
+        self.index = MemoryRankIndex()
+
+    def init_app(self, app, client=None):
+        """ ✅ Index partagé dans Redis si REDIS_URL est défini """
+        url = app.config.get("REDIS_URL")
+        if client is None and url:
+            client = redis.Redis.from_url(url)
+        if client is not None:
+            self.index = RedisRankIndex(client)
+
+    def record_game(self, game_id, genre=None, topic=None, now=None):
+        """ ✅ Ajoute les scores d'une partie terminée à tous les classements concernés (une seule fois par partie) """
+        scores = db.session.query(Score.user_id, Score.score).filter(Score.game_id == game_id).all()
+        if not scores:
+            return 0
+
+        keys = [(board, period_key(period, now)) for board in boards_for(genre, topic) for period in PERIODS]
+        rows = [
+            {"board": board, "period": period, "user_id": user_id, "total_score": score or 0, "games_played": 1}
+            for board, period in keys
+            for user_id, score in scores
+        ]
+        with ExitStack() as locks:
+            for key in sorted(keys):  # ✅ Ordre fixe : pas d'interblocage entre deux enregistrements
+                locks.enter_context(self.index.lock(key))
+            self._upsert(rows)
+            db.session.commit()
+
+            for key in keys:
+                if self.index.loaded(key):
+                    for user_id, score in scores:
+                        self.index.incr(key, user_id, score or 0)
+        return len(rows)
+
+    def top(self, board, period, n):
+        key = self._ensure(board, period)
+        return self.index.top(key, n)
+
+    def rank(self, board, period, user_id):
+        """ ✅ (rang, score) du joueur, ou (None, None) s'il n'est pas classé """
+        key = self._ensure(board, period)
+        return self.index.rank(key, user_id)
+
+    def _ensure(self, board, period):
+        key = (board, period_key(period))
+        if not self.index.loaded(key):
+            with self.index.lock(key):
+                if not self.index.loaded(key):  # ✅ Chargé par un autre worker pendant l'attente du verrou
+                    with primary_reads():  # ⚠️ L'index est ensuite tenu à jour par record_game : jamais chargé depuis le réplica
+                        self.index.load(key, self._entries(key))
+        return key
+
+    @staticmethod
+    def _entries(key):
+        after = 0
+        while True:
+            page = db.session.execute(entries_page(key, after)).all()
+            yield from page
+            if len(page) < LOAD_PAGE_SIZE:
+                return
+            after = page[-1][0]
+
+    @staticmethod
+    def _upsert(rows):
+        table = LeaderboardEntry.__table__
+        now = datetime.utcnow()
+        dialect = db.engine.dialect.name
+
+        if dialect == "mysql":
+            stmt = mysql.insert(table).values(rows)
+            stmt = stmt.on_duplicate_key_update(
+                total_score=table.c.total_score + stmt.inserted.total_score,
+                games_played=table.c.games_played + 1,
+                updated_at=now,
+            )
+        else:
+            stmt = (sqlite if dialect == "sqlite" else postgresql).insert(table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["board", "period", "user_id"],
+                set_={
+                    "total_score": table.c.total_score + stmt.excluded.total_score,
+                    "games_played": table.c.games_played + 1,
+                    "updated_at": now,
+                },
+            )
+        db.session.execute(stmt)
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,55 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from extensions import replica_reads
+from leaderboard import leaderboard, PERIODS
+from identity_cache import identity_cache
+
+leaderboard_bp = Blueprint("leaderboard", __name__)
+
+MAX_TOP = 100
+
+
+def board_params():
+    """ ✅ Classement demandé : ?genre=<genre> ou ?topic=<topic> (sinon global) et ?period=all|week|month """
+    period = request.args.get("period", "all")
+    if period not in PERIODS:
+        return None, None
+    if request.args.get("genre"):
+        return f"genre:{request.args['genre']}", period
+    if request.args.get("topic"):
+        return f"topic:{request.args['topic']}", period
+    return "all", period
+
+
+# 📌 Top N d'un classement
+@leaderboard_bp.route("/leaderboard", methods=["GET"])
+@replica_reads
+def get_leaderboard():
+    board, period = board_params()
+    if board is None:
+        return jsonify({"error": "Période invalide"}), 400
+
+    limit = min(max(request.args.get("limit", 10, type=int), 1), MAX_TOP)
+    top = leaderboard.top(board, period, limit)
+
+    users = identity_cache.get_many([user_id for user_id, _ in top])
+    return jsonify({
+        "board": board,
+        "period": period,
+        "entries": [
+            {"rank": position, "user_id": user_id, "username": users[user_id].username if user_id in users else None, "score": score}
+            for position, (user_id, score) in enumerate(top, start=1)
+        ]
+    })
+
+
+# 📌 Rang du joueur connecté dans un classement
+@leaderboard_bp.route("/leaderboard/me", methods=["GET"])
+@jwt_required()
+def get_my_rank():
+    board, period = board_params()
+    if board is None:
+        return jsonify({"error": "Période invalide"}), 400
+
+    rank, score = leaderboard.rank(board, period, int(get_jwt_identity()))
+    return jsonify({"board": board, "period": period, "rank": rank, "score": score or 0})
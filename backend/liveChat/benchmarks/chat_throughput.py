@@ -0,0 +1,157 @@
+"""Messages/sec ceiling of a single liveChat room.
+
+Starts the chat server in a subprocess, joins N Socket.IO clients to one room
+and has all of them send at increasing rates. For each offered rate it reports
+the delivered rate (per member), delivery latency and socket events received per
+member per second. The ceiling is the highest offered rate still delivered at
+>= 95% with p99 latency under 1 s.
+
+    python benchmarks/chat_throughput.py --clients 20 --rates 50,100,200,400,800
+    python benchmarks/chat_throughput.py --tick 0      # unbatched, for comparison
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+CHAT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve(port):
+    sys.path.insert(0, CHAT_DIR)
+    import main
+    main.socketio.run(main.app, host="127.0.0.1", port=port, log_output=False)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+class Member:
+    def __init__(self, base, name, code=None):
+        import requests
+        import socketio
+
+        self.http = requests.Session()
+        form = {"name": name, "join": "1", "code": code} if code else {"name": name, "create": "1"}
+        page = self.http.post(base + "/", data=form).text
+        self.code = code or re.search(r"Chat Room: (\w+)", page).group(1)
+
+        self.latencies, self.events, self.received = [], 0, 0
+        self.client = socketio.Client()
+        self.client.on("messages", self.on_messages)
+        cookie = "; ".join(f"{k}={v}" for k, v in self.http.cookies.items())
+        self.client.connect(base, headers={"Cookie": cookie}, transports=["websocket"])
+
+    def on_messages(self, batch):
+        now = time.time()
+        self.events += 1
+        for message in batch:
+            try:
+                sent = float(message["message"])
+            except (TypeError, ValueError):
+                continue  # join / leave notices
+            self.received += 1
+            self.latencies.append(now - sent)
+
+    def reset(self):
+        self.latencies, self.events, self.received = [], 0, 0
+
+
+def run_step(members, rate, duration):
+    for member in members:
+        member.reset()
+    interval = len(members) / rate  # each member sends rate / len(members) messages per second
+    sent = [0]
+
+    def sender(member):
+        next_at = time.perf_counter()
+        end = next_at + duration
+        while next_at < end:
+            member.client.emit("message", {"data": repr(time.time())})
+            sent[0] += 1
+            next_at += interval
+            time.sleep(max(0, next_at - time.perf_counter()))
+
+    threads = [threading.Thread(target=sender, args=(m,)) for m in members]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    time.sleep(1)  # drain
+
+    latencies = [lat for m in members for lat in m.latencies]
+    delivered = sum(m.received for m in members) / len(members)
+    return {
+        "offered": rate,
+        "sent": sent[0],
+        "delivered": delivered / duration,
+        "ratio": delivered / sent[0] if sent[0] else 0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "events": sum(m.events for m in members) / len(members) / duration,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--clients", type=int, default=20, help="members in the room (all of them send)")
+    parser.add_argument("--rates", default="50,100,200,400,800", help="offered messages/sec for the whole room")
+    parser.add_argument("--duration", type=float, default=3, help="seconds per step")
+    parser.add_argument("--tick", type=float, default=0.05, help="server batch tick (CHAT_BATCH_TICK), 0 = unbatched")
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve)
+
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        CHAT_HISTORY_DIR=tempfile.mkdtemp(),
+        CHAT_BATCH_TICK=str(args.tick),
+        CHAT_RATE_LIMIT="1000000",
+        CHAT_RATE_BURST="1000000",
+    )
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", str(port)],
+                              cwd=CHAT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(2)
+        first = Member(base, "bench0")
+        members = [first] + [Member(base, f"bench{i}", first.code) for i in range(1, args.clients)]
+        time.sleep(0.5)
+
+        results = [run_step(members, int(rate), args.duration) for rate in args.rates.split(",")]
+        for member in members:
+            member.client.disconnect()
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\n{args.clients} members, tick {args.tick * 1000:.0f} ms\n")
+    print(f"{'offered/s':>10}{'delivered/s':>13}{'ratio':>8}{'p50 ms':>10}{'p99 ms':>10}{'events/s':>10}")
+    ceiling = 0
+    for r in results:
+        print(f"{r['offered']:>10}{r['delivered']:>13.1f}{r['ratio']:>8.2f}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['events']:>10.1f}")
+        if r["ratio"] >= 0.95 and r["p99"] < 1000:
+            ceiling = max(ceiling, r["offered"])
+    print(f"\nCeiling: {ceiling} messages/sec per room")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from collections import deque
+
+
+class RoomLog:
+    """History of one room: the last `size` messages in memory, every message on disk.
+
+    Messages get sequential ids starting at 1, one JSON line per message in the
+    log, so an id maps to a line. A sparse index (byte offset of every
+    `index_every`-th message) lets older pages be read without scanning the file.
+    """
+
+    def __init__(self, path, size, index_every=256):
+        self.path = path
+        self.index_every = index_every
+        self.recent = deque(maxlen=size)
+        self.last_id = 0
+        self._offsets = []  # offset of messages 1, 1 + index_every, 1 + 2 * index_every...
+        self._load()
+        self._file = open(path, "ab")
+
+    def append(self, name, message):
+        entry = {"id": self.last_id + 1, "name": name, "message": message, "ts": time.time()}
+        if (entry["id"] - 1) % self.index_every == 0:
+            self._offsets.append(self._file.tell())
+        self._file.write(json.dumps(entry).encode() + b"\n")
+        self._file.flush()
+        self.last_id = entry["id"]
+        self.recent.append(entry)
+        return entry
+
+    def page(self, before=None, limit=50):
+        """Up to `limit` messages with id < `before` (newest page if None), oldest first."""
+        end = self.last_id + 1 if before is None else min(before, self.last_id + 1)
+        start = max(1, end - limit)
+        if start >= end:
+            return []
+        if self.recent and start >= self.recent[0]["id"]:
+            first = self.recent[0]["id"]
+            return list(self.recent)[start - first:end - first]
+        return self._read(start, end)
+
+    def close(self):
+        self._file.close()
+
+    def _read(self, start, end):
+        slot = (start - 1) // self.index_every
+        current = slot * self.index_every + 1
+        messages = []
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[slot])
+            for line in f:
+                if current >= end:
+                    break
+                if current >= start:
+                    messages.append(json.loads(line))
+                current += 1
+        return messages
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial write from a crash, ignored
+                self.last_id += 1
+                if (self.last_id - 1) % self.index_every == 0:
+                    self._offsets.append(offset)
+                offset += len(line)
+                self.recent.append(line)
+            valid = offset
+        self.recent = deque((json.loads(line) for line in self.recent), maxlen=self.recent.maxlen)
+        if valid < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid)
+
+
+class ChatHistory:
+    """Per-room logs under `directory`, opened on first use and closed when a room empties."""
+
+    def __init__(self, directory, size=200):
+        self.directory = directory
+        self.size = size
+        self._logs = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def exists(self, room):
+        return room in self._logs or (self._valid(room) and os.path.exists(self._path(room)))
+
+    def get(self, room):
+        log = self._logs.get(room)
+        if log is None:
+            log = self._logs[room] = RoomLog(self._path(room), self.size)
+        return log
+
+    def release(self, room):
+        log = self._logs.pop(room, None)
+        if log is not None:
+            log.close()
+
+    @staticmethod
+    def _valid(room):
+        return bool(room) and room.isalnum()
+
+    def _path(self, room):
+        if not self._valid(room):
+            raise ValueError(f"Invalid room code: {room!r}")
+        return os.path.join(self.directory, f"{room}.jsonl")
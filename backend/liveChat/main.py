@@ -1,13 +1,26 @@
-from flask import Flask, render_template, request, session, redirect, url_for
-from flask_socketio import join_room, leave_room, send, SocketIO
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify
+from flask_socketio import join_room, leave_room, emit, SocketIO
+import os
 import random
 from string import ascii_uppercase
+from history import ChatHistory
+from outbox import RoomBatcher, TokenBucket
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "BLINDTEST"
 socketio = SocketIO(app)
 
+HISTORY_DIR = os.getenv("CHAT_HISTORY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "history"))
+HISTORY_SIZE = int(os.getenv("CHAT_HISTORY_SIZE", "200"))  # messages kept in memory per room
+PAGE_SIZE = 50
+BATCH_TICK = float(os.getenv("CHAT_BATCH_TICK", "0.05"))  # seconds, 0 sends every message immediately
+RATE_LIMIT = float(os.getenv("CHAT_RATE_LIMIT", "5"))     # messages per second per sender
+RATE_BURST = int(os.getenv("CHAT_RATE_BURST", "10"))
+
 rooms = {}
+history = ChatHistory(HISTORY_DIR, size=HISTORY_SIZE)
+batcher = RoomBatcher(socketio, tick=BATCH_TICK)
+buckets = {}  # sid -> TokenBucket
 
 
 def generate_unique_code(length):
@@ -16,7 +29,7 @@ def generate_unique_code(length):
         for _ in range(length):
             code += random.choice(ascii_uppercase)
 
-        if code not in rooms:
+        if code not in rooms and not history.exists(code):
             break
 
     return code
@@ -40,9 +53,11 @@ def home():
         room = code
         if create != False:
             room = generate_unique_code(4)
-            rooms[room] = {"members": 0, "messages": []}
+            rooms[room] = {"members": 0}
         elif code not in rooms:
-            return render_template("home.html", error="Room does not exist.", code=code, name=name)
+            if not history.exists(code):
+                return render_template("home.html", error="Room does not exist.", code=code, name=name)
+            rooms[room] = {"members": 0}  # reopened from its log
 
         session["room"] = room
         session["name"] = name
@@ -57,7 +72,20 @@ def room():
     if room is None or session.get("name") is None or room not in rooms:
         return redirect(url_for("home"))
 
-    return render_template("room.html", code=room, messages=rooms[room]["messages"])
+    return render_template("room.html", code=room, messages=history.get(room).page(limit=PAGE_SIZE))
+
+
+@app.route("/history")
+def room_history():
+    room = session.get("room")
+    if room is None or room not in rooms:
+        return jsonify({"error": "Not in a room"}), 403
+
+    before = request.args.get("before", type=int)
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), 200)
+    messages = history.get(room).page(before=before, limit=limit)
+    next_cursor = messages[0]["id"] if messages and messages[0]["id"] > 1 else None
+    return jsonify({"messages": messages, "next_cursor": next_cursor})
 
 
 @socketio.on("message")
@@ -66,13 +94,13 @@ def message(data):
     if room not in rooms:
         return
 
-    content = {
-        "name": session.get("name"),
-        "message": data["data"]
-    }
-    send(content, to=room)
-    rooms[room]["messages"].append(content)
-    print(f"{session.get('name')} said: {data['data']}")
+    bucket = buckets.setdefault(request.sid, TokenBucket(RATE_LIMIT, RATE_BURST))
+    if not bucket.allow():
+        emit("rate_limited", {"message": "You are sending messages too fast."})
+        return
+
+    content = history.get(room).append(session.get("name"), data["data"])
+    batcher.push(room, content)
 
 
 @socketio.on("connect")
@@ -86,7 +114,7 @@ def connect(auth):
         return
 
     join_room(room)
-    send({"name": name, "message": "has entered the room"}, to=room)
+    batcher.push(room, {"name": name, "message": "has entered the room"})
     rooms[room]["members"] += 1
     print(f"{name} joined room {room}")
 
@@ -96,13 +124,15 @@ def disconnect():
     room = session.get("room")
     name = session.get("name")
     leave_room(room)
+    buckets.pop(request.sid, None)
 
     if room in rooms:
         rooms[room]["members"] -= 1
         if rooms[room]["members"] <= 0:
             del rooms[room]
+            history.release(room)
 
-    send({"name": name, "message": "has left the room"}, to=room)
+    batcher.push(room, {"name": name, "message": "has left the room"})
     print(f"{name} has left the room {room}")
 
 
@@ -0,0 +1,65 @@
+import logging
+import time
+
+log = logging.getLogger("liveChat")
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def allow(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class RoomBatcher:
+    """Coalesces a room's outgoing messages and emits them as one `messages` event per tick.
+
+    A busy room then costs one socket write per member per tick instead of one
+    per member per message. With `tick=0` messages are emitted immediately.
+    """
+
+    def __init__(self, socketio, tick=0.05, event="messages"):
+        self.socketio = socketio
+        self.tick = tick
+        self.event = event
+        self._pending = {}  # room -> messages waiting for the next tick
+        self._task = None
+
+    def push(self, room, message):
+        if self.tick <= 0:
+            self.socketio.emit(self.event, [message], to=room)
+            return
+        self._pending.setdefault(room, []).append(message)
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+
+    def flush(self):
+        pending, self._pending = self._pending, {}
+        for room, messages in pending.items():
+            self.socketio.emit(self.event, messages, to=room)
+        return len(pending)
+
+    def _run(self):
+        """Emit once per tick while messages keep coming; stop at the first empty tick."""
+        while True:
+            self.socketio.sleep(self.tick)
+            try:
+                if self.flush():
+                    continue
+            except Exception as e:
+                log.warning("Chat batch flush failed: %s", e)
+                continue
+            self._task = None  # restarted by the next push()
+            return
@@ -0,0 +1,95 @@
+import hashlib
+import uuid
+import redis
+from collections import OrderedDict
+from functools import wraps
+from flask import request, current_app
+
+
+# 📌 Cache versionné des réponses du lobby (liste des rooms et détail d'une room).
+# Toute écriture sur les rooms/parties appelle `invalidate()`, qui change la version :
+# l'ETag d'une clé ne dépend que de la version, un 304 ne touche donc jamais la BDD.
+class LobbyCache:
+    VERSION_KEY = "lobby:version"
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._version = 0
+        self._redis = None
+        self._boot = uuid.uuid4().hex  # ✅ Évite qu'un ETag survive à un redémarrage
+        self._entries = OrderedDict()  # clé -> (version, body, mimetype)
+
+    def init_app(self, app, client=None):
+        """ ✅ En mode multi-workers, la version est partagée via Redis """
+        url = app.config.get("REDIS_URL")
+        if client is None and url:
+            client = redis.Redis.from_url(url)
+        if client is not None:
+            self._redis = client
+            self._boot = "shared"  # ✅ Même ETag quel que soit le worker qui répond
+
+    @property
+    def version(self):
+        if self._redis is not None:
+            return int(self._redis.get(self.VERSION_KEY) or 0)
+        return self._version
+
+    def invalidate(self):
+        """ ✅ À appeler après chaque création/modification/suppression de room ou de partie """
+        if self._redis is not None:
+            self._redis.incr(self.VERSION_KEY)
+        else:
+            self._version += 1
+        self._entries.clear()
+
+    def etag(self, key, version=None):
+        version = self.version if version is None else version
+        return hashlib.sha1(f"{self._boot}:{version}:{key}".encode()).hexdigest()
+
+    def get(self, key, version=None):
+        version = self.version if version is None else version
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def put(self, key, version, body, mimetype):
+        if version != self.version:
+            return  # ⚠️ Invalidé pendant la construction, réponse déjà périmée
+        self._entries[key] = (version, body, mimetype)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+lobby_cache = LobbyCache()
+
+
+def lobby_cached(key_func):
+    """ ✅ Sert la vue depuis le cache du lobby, avec ETag et réponse 304 """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = key_func(*args, **kwargs)
+            version = lobby_cache.version  # ✅ Une seule lecture de la version par requête
+            etag = lobby_cache.etag(key, version)
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                cached = lobby_cache.get(key, version)
+                if cached is None:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    lobby_cache.put(key, version, response.get_data(), response.mimetype)
+                else:
+                    body, mimetype = cached
+                    response = current_app.response_class(body, mimetype=mimetype)
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
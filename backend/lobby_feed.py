@@ -0,0 +1,123 @@
+import eventlet
+from sqlalchemy import func, select, update
+from extensions import db, socketio
+from models import Room, User
+from lobby_cache import lobby_cache
+from log import get_logger
+
+log = get_logger("rooms")
+
+LOBBY_ROOM = "lobby"  # ✅ Room Socket.IO des clients qui affichent le lobby (les ids de room sont des entiers)
+
+
+# 📌 Occupation des rooms et flux du lobby.
+# `move_players` est le seul chemin d'écriture de `User.room_id` (REST et registre Socket.IO) :
+# dans la même transaction, `Room.active_users` des rooms touchées est recalculé à partir
+# des joueurs, sans dérive possible. Chaque changement devient un diff poussé à la room
+# "lobby" sous forme d'un seul événement `lobby_update` par tick :
+#   {"added": [room...], "removed": [id...], "changed": {id: {"player_count": n, "status": ..., "game_id": ...}}}
+# Les valeurs sont absolues : un client applique les diffs reçus avant ou après son GET /api/rooms.
+class LobbyFeed:
+    def __init__(self):
+        self.tick = 0.25
+        self.max_players = 10
+        self._added = {}    # room_id -> room complète
+        self._removed = set()
+        self._changed = {}  # room_id -> champs modifiés
+        self._task = None
+
+    def init_app(self, app):
+        self.tick = app.config.get("LOBBY_TICK", 0.25)
+        self.max_players = app.config["ROOM_MAX_PLAYERS"]
+
+    def move_players(self, moves):
+        """ ✅ Déplace des joueurs ({user_id: room_id ou None}) et met à jour les compteurs ; renvoie {room_id: joueurs} """
+        if not moves:
+            return {}
+        previous = db.session.execute(select(User.room_id).where(User.id.in_(moves))).scalars().all()
+        db.session.bulk_update_mappings(User, [{"id": user_id, "room_id": room_id} for user_id, room_id in moves.items()])
+
+        rooms = {int(room_id) for room_id in [*previous, *moves.values()] if room_id is not None}
+        counts = {}
+        if rooms:
+            player_count = select(func.count(User.id)).where(User.room_id == Room.id).scalar_subquery()
+            db.session.execute(
+                update(Room).where(Room.id.in_(rooms)).values(active_users=player_count),
+                execution_options={"synchronize_session": False},
+            )
+            counts = dict(db.session.execute(select(Room.id, Room.active_users).where(Room.id.in_(rooms))).all())
+        db.session.commit()
+        lobby_cache.invalidate()
+
+        for room_id, count in counts.items():
+            self._change(room_id, player_count=count)
+        return counts
+
+    def room_added(self, room):
+        self._removed.discard(room.id)
+        self._added[room.id] = {
+            "id": room.id,
+            "name": room.name,
+            "genre": room.genre,
+            "status": room.status or "waiting",
+            "player_count": room.active_users or 0,
+            "max_players": self.max_players,
+            "game_id": None,
+        }
+        self._wake()
+
+    def room_removed(self, room_id):
+        room_id = int(room_id)
+        if self._added.pop(room_id, None) is None:  # ✅ Créée puis supprimée dans le même tick : rien à envoyer
+            self._removed.add(room_id)
+        self._changed.pop(room_id, None)
+        self._wake()
+
+    def game_started(self, room_id, game_id):
+        self._change(room_id, status="playing", game_id=game_id)
+
+    def game_ended(self, room_id):
+        self._change(room_id, status="waiting", game_id=None)
+
+    def flush(self):
+        """ ✅ Émet les changements accumulés depuis le dernier tick (un seul événement) """
+        added, removed, changed = self._added, self._removed, self._changed
+        self._added, self._removed, self._changed = {}, set(), {}
+        for room_id, fields in list(changed.items()):
+            if room_id in added:
+                added[room_id].update(changed.pop(room_id))
+        if not (added or removed or changed):
+            return False
+        socketio.emit("lobby_update", {
+            "added": list(added.values()),
+            "removed": sorted(removed),
+            "changed": changed,
+        }, room=LOBBY_ROOM)
+        return True
+
+    def _change(self, room_id, **fields):
+        room_id = int(room_id)
+        if room_id in self._removed:
+            return
+        self._changed.setdefault(room_id, {}).update(fields)
+        self._wake()
+
+    def _wake(self):
+        if self._task is None:
+            self._task = eventlet.spawn(self._run)
+
+    def _run(self):
+        """ ✅ Un envoi par tick tant qu'il y a des changements ; s'arrête au premier tick sans rien à envoyer """
+        while True:
+            eventlet.sleep(self.tick)
+            try:
+                if self.flush():
+                    continue
+            except Exception as e:
+                log.warning("⚠️ Échec de l'envoi du diff du lobby : %s", e)
+                continue
+            self._task = None  # ✅ Relancé par `_wake` au prochain changement
+            return
+
+
+lobby_feed = LobbyFeed()
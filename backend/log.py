@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import random
+import sys
+import time
+from eventlet import patcher
+
+# ⚠️ Vrais thread et file système : une écriture lente sur stdout ne doit bloquer
+# que le thread d'écriture, jamais le hub eventlet.
+_threading = patcher.original("threading")
+_queue = patcher.original("queue")
+
+ROOT = "blindtest"
+
+# Attributs standards d'un LogRecord : tout le reste vient de `extra=` et devient un champ structuré
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample"}
+
+
+def get_logger(subsystem):
+    """ ✅ Logger d'un sous-système (niveau réglable via LOG_LEVELS, ex: "sockets=DEBUG") """
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+# 📌 Une ligne JSON par événement : horodatage, niveau, sous-système, message et champs `extra`
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RESERVED})
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# 📌 Échantillonnage et limitation de débit par site d'appel (fichier:ligne).
+# `extra={"sample": 0.1}` ne garde qu'un enregistrement sur dix ; au-delà de `rate`
+# par seconde (rafales de `burst`), un site est mis en sourdine et le nombre de
+# lignes supprimées est ajouté à la suivante. Les erreurs passent toujours.
+class CallSiteLimiter(logging.Filter):
+    def __init__(self, rate=20, burst=50):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._sites = {}  # (fichier, ligne) -> [jetons, dernière mise à jour, supprimés]
+
+    def filter(self, record):
+        sample = getattr(record, "sample", None)
+        if sample is not None and random.random() >= sample:
+            return False
+        if self.rate <= 0 or record.levelno >= logging.ERROR:
+            return True
+
+        now = time.monotonic()
+        site = self._sites.get((record.pathname, record.lineno))
+        if site is None:
+            site = self._sites[(record.pathname, record.lineno)] = [self.burst, now, 0]
+        site[0] = min(self.burst, site[0] + (now - site[1]) * self.rate)
+        site[1] = now
+        if site[0] < 1:
+            site[2] += 1
+            return False
+        site[0] -= 1
+        if site[2]:
+            record.suppressed, site[2] = site[2], 0
+        return True
+
+
+# 📌 Handler non bloquant : l'appelant dépose l'enregistrement dans une file bornée,
+# un thread natif le formate et l'écrit. File pleine : l'enregistrement est compté puis ignoré.
+# Le thread démarre au premier log du processus : après un fork (workers pré-forkés),
+# chaque enfant recrée sa propre file et son propre thread.
+class BackgroundHandler(logging.Handler):
+    def __init__(self, target, maxsize=10000):
+        super().__init__()
+        self.target = target
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._pid = None
+        self._queue = None
+
+    def _ensure_started(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._queue = _queue.Queue(self.maxsize)
+            _threading.Thread(target=self._run, args=(self._queue,), name="log-sink", daemon=True).start()
+
+    def emit(self, record):
+        self._ensure_started()
+        record.msg, record.args = record.getMessage(), None  # ✅ Figé maintenant, écrit plus tard
+        record.exc_text = self.target.formatter.formatException(record.exc_info) if record.exc_info else None
+        record.exc_info = None
+        try:
+            self._queue.put_nowait(record)
+        except _queue.Full:
+            self.dropped += 1
+
+    def _run(self, queue):
+        while True:
+            record = queue.get()
+            try:
+                self.target.handle(record)
+            except Exception:
+                pass
+
+
+def init_logging(app):
+    """ ✅ Niveaux par sous-système, sortie JSON (ou texte) sur stdout via le handler non bloquant """
+    config = app.config
+    stream = logging.StreamHandler(sys.stdout)
+    if config.get("LOG_FORMAT", "json") == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+
+    handler = BackgroundHandler(stream, maxsize=config.get("LOG_QUEUE_SIZE", 10000))
+    handler.addFilter(CallSiteLimiter(config.get("LOG_RATE_LIMIT", 20), config.get("LOG_RATE_BURST", 50)))
+
+    root = logging.getLogger(ROOT)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(config.get("LOG_LEVEL", "INFO").upper())
+    root.propagate = False
+
+    for item in filter(None, (part.strip() for part in config.get("LOG_LEVELS", "").split(","))):
+        subsystem, _, level = item.partition("=")
+        get_logger(subsystem.strip()).setLevel(level.strip().upper())
+    return handler
@@ -0,0 +1,216 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from log import get_logger
+
+log = get_logger("metrics")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _verb(statement):
+    return statement.lstrip().split(None, 1)[0].upper() if statement and statement.strip() else "OTHER"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# 📌 Compteur (valeur croissante) par combinaison de labels
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+# 📌 Histogramme cumulatif (buckets fixes) par combinaison de labels
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels -> [compte par bucket..., somme, total]
+
+    def observe(self, value, *labels):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            entry[index] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for labels, entry in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                yield f"{self.name}_bucket", _labels(names, labels + (_number(bound),)), cumulative
+            yield f"{self.name}_bucket", _labels(names, labels + ("+Inf",)), entry[-1]
+            yield f"{self.name}_sum", _labels(self.labelnames, labels), entry[-2]
+            yield f"{self.name}_count", _labels(self.labelnames, labels), entry[-1]
+
+
+# 📌 Jauge calculée à chaque lecture de /metrics (ex: connexions ouvertes)
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help, func):
+        self.name, self.help, self.func = name, help, func
+
+    def samples(self):
+        try:
+            yield self.name, "", self.func()
+        except Exception as e:
+            log.warning("⚠️ Jauge %s indisponible : %s", self.name, e)
+
+
+# 📌 Métriques du processus exposées au format texte Prometheus sur /metrics.
+# Chaque worker expose ses propres valeurs : Prometheus les agrège par instance.
+class Metrics:
+    def __init__(self):
+        self._metrics = []
+        self.http_latency = self.histogram(
+            "http_request_duration_seconds", "Latence des routes Flask", ("method", "route", "status"))
+        self.socket_latency = self.histogram(
+            "socketio_event_duration_seconds", "Latence des handlers Socket.IO", ("event",))
+        self.socket_errors = self.counter(
+            "socketio_event_errors_total", "Exceptions levées par les handlers Socket.IO", ("event",))
+        self.sql_latency = self.histogram(
+            "sql_statement_duration_seconds", "Durée des requêtes SQL", ("statement",))
+        self.sql_errors = self.counter(
+            "sql_statement_errors_total", "Requêtes SQL en échec", ("statement",))
+        self.sql_per_request = self.histogram(
+            "sql_statements_per_request", "Nombre de requêtes SQL par requête HTTP", ("route",),
+            buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+        self.external_latency = self.histogram(
+            "external_call_duration_seconds", "Latence des appels OpenAI / Spotify", ("service", "operation"))
+        self.external_errors = self.counter(
+            "external_call_errors_total", "Appels OpenAI / Spotify en échec", ("service", "operation"))
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, func):
+        return self._register(Gauge(name, help, func))
+
+    def init_app(self, app):
+        """ ✅ Instrumente les routes et les requêtes SQL, puis expose GET /metrics """
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if not event.contains(Engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            event.listen(Engine, "handle_error", self._handle_error)
+        app.add_url_rule("/metrics", "metrics", self.view)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def view(self):
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+    def socket_event(self, name):
+        """ ✅ Décorateur : latence et erreurs d'un handler Socket.IO """
+        def decorator(handler):
+            @wraps(handler)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return handler(*args, **kwargs)
+                except Exception:
+                    self.socket_errors.inc(name)
+                    raise
+                finally:
+                    self.socket_latency.observe(time.perf_counter() - start, name)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def external_call(self, service, operation):
+        """ ✅ Latence d'un appel externe ; toute exception est comptée comme une erreur """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.external_errors.inc(service, operation)
+            raise
+        finally:
+            self.external_latency.observe(time.perf_counter() - start, service, operation)
+
+    def _register(self, metric):
+        # ✅ Une seule métrique par nom, même si l'application est recréée (create_app)
+        self._metrics = [existing for existing in self._metrics if existing.name != metric.name]
+        self._metrics.append(metric)
+        return metric
+
+    @staticmethod
+    def _before_request():
+        g.metrics_start = time.perf_counter()
+        g.sql_statements = 0
+
+    def _after_request(self, response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"  # ✅ Gabarit, pas l'URL (cardinalité bornée)
+            self.http_latency.observe(time.perf_counter() - start, request.method, route, response.status_code)
+            self.sql_per_request.observe(g.pop("sql_statements", 0), route)
+        return response
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_start", []).append((cursor, time.perf_counter()))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        _, start = conn.info["metrics_start"].pop()
+        self.sql_latency.observe(time.perf_counter() - start, _verb(statement))
+        if g and "sql_statements" in g:
+            g.sql_statements += 1
+
+    def _handle_error(self, context):
+        """ ✅ Requête en échec : after_cursor_execute n'est pas appelé, on retire son départ de la pile """
+        starts = context.connection.info.get("metrics_start") if context.connection is not None else None
+        cursor = context.execution_context.cursor if context.execution_context is not None else None
+        if starts and cursor is not None and starts[-1][0] is cursor:
+            starts.pop()
+            self.sql_errors.inc(_verb(context.statement))
+
+
+metrics = Metrics()
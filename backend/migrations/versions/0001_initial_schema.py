@@ -0,0 +1,77 @@
+"""Initial schema (tables previously created by db.create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 17:45:00
+
+Existing databases created by db.create_all() should be stamped instead of
+upgraded: `flask db stamp 0001 && flask db upgrade`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'room',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('genre', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('active_users', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_table(
+        'user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('profile_picture', sa.String(length=255), nullable=True),
+        sa.Column('room_id', sa.Integer(), nullable=True),
+        sa.Column('session_id', sa.String(length=100), nullable=True),
+        sa.ForeignKeyConstraint(['room_id'], ['room.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username'),
+    )
+    op.create_table(
+        'game',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('current_song', sa.String(length=200), nullable=True),
+        sa.Column('question_type', sa.String(length=50), nullable=True),
+        sa.Column('time_left', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['room_id'], ['room.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'score',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['game.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    op.drop_table('score')
+    op.drop_table('game')
+    op.drop_table('user')
+    op.drop_table('room')
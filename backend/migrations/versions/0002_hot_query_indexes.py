@@ -0,0 +1,52 @@
+"""Indexes and constraints for the hot queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 17:50:00
+
+- game(room_id, status): playing game of a room (rooms, game routes)
+- score(game_id, score): ranking of a game
+- score(user_id, game_id) unique: one row per player and game, bulk upsert
+- user(room_id): player counts of the lobby
+
+user.username is already covered by its unique index. user.session_id is no
+longer queried since socket sessions live in the in-memory registry.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the most recent row of any duplicated (user_id, game_id) pair
+    op.execute(
+        "DELETE FROM score WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MAX(id) AS id FROM score GROUP BY user_id, game_id) AS keep)"
+    )
+
+    with op.batch_alter_table('score', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_score_user_id_game_id', ['user_id', 'game_id'])
+        batch_op.create_index('ix_score_game_id_score', ['game_id', 'score'], unique=False)
+
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.create_index('ix_game_room_id_status', ['room_id', 'status'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_room_id', ['room_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_room_id')
+
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.drop_index('ix_game_room_id_status')
+
+    with op.batch_alter_table('score', schema=None) as batch_op:
+        batch_op.drop_index('ix_score_game_id_score')
+        batch_op.drop_constraint('uq_score_user_id_game_id', type_='unique')
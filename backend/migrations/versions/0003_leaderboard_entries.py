@@ -0,0 +1,43 @@
+"""Leaderboard aggregate table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 18:40:00
+
+One row per (board, period, user), incremented when a game is finished, so
+leaderboards never aggregate the score table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'leaderboard_entry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('board', sa.String(length=120), nullable=False),
+        sa.Column('period', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_score', sa.Integer(), nullable=False),
+        sa.Column('games_played', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('board', 'period', 'user_id', name='uq_leaderboard_board_period_user'),
+    )
+    with op.batch_alter_table('leaderboard_entry', schema=None) as batch_op:
+        batch_op.create_index('ix_leaderboard_board_period_score', ['board', 'period', 'total_score'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('leaderboard_entry', schema=None) as batch_op:
+        batch_op.drop_index('ix_leaderboard_board_period_score')
+
+    op.drop_table('leaderboard_entry')
@@ -0,0 +1,29 @@
+"""Backfill room.active_users
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 21:10:00
+
+The room counter is now maintained by lobby_feed.move_players and read by the
+lobby instead of counting players; existing rooms start from the real count.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    room = sa.table('room', sa.column('id'), sa.column('active_users'))
+    user = sa.table('user', sa.column('id'), sa.column('room_id'))
+    player_count = sa.select(sa.func.count(user.c.id)).where(user.c.room_id == room.c.id).scalar_subquery()
+    op.execute(room.update().values(active_users=player_count))
+
+
+def downgrade():
+    pass
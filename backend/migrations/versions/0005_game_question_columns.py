@@ -0,0 +1,38 @@
+"""Current question of a game
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 10:00:00
+
+game.current_question / game.correct_answer hold the parsed question of the
+round. Databases built by an earlier 0001 (which already created them) are
+left untouched.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def _game_columns():
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns('game')}
+
+
+def upgrade():
+    existing = _game_columns()
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        if 'current_question' not in existing:
+            batch_op.add_column(sa.Column('current_question', sa.Text(), nullable=True))
+        if 'correct_answer' not in existing:
+            batch_op.add_column(sa.Column('correct_answer', sa.String(length=1), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.drop_column('correct_answer')
+        batch_op.drop_column('current_question')
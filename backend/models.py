@@ -1,4 +1,6 @@
 from datetime import datetime
+from eventlet import tpool
+from flask import current_app
 from extensions import db, bcrypt
 
 # 📌 Modèle User : Stocke les joueurs inscrits
@@ -12,19 +14,32 @@ class User(db.Model):
     room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=True)  # ✅ Relation avec une Room
     session_id = db.Column(db.String(100), nullable=True)  # ✅ ID de session SocketIO
 
+    __table_args__ = (
+        db.Index("ix_user_room_id", "room_id"),  # ✅ Nombre de joueurs par room (lobby)
+    )
+
     def __init__(self, username, email, password, profile_picture="default.jpg"):
         self.username = username
         self.email = email
         self.set_password(password)  # ✅ Hashage du mot de passe
         self.profile_picture = profile_picture
 
+    # ⚠️ bcrypt est volontairement lent : exécuté dans le pool de threads natifs d'eventlet
+    # (tpool) pour ne bloquer que le greenthread appelant, pas tout le hub (sockets, timers).
     def set_password(self, password):
-        """ ✅ Hash le mot de passe avant de le stocker """
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        """ ✅ Hash le mot de passe avant de le stocker (coût BCRYPT_LOG_ROUNDS) """
+        self.password_hash = tpool.execute(bcrypt.generate_password_hash, password).decode('utf-8')
 
     def check_password(self, password):
         """ ✅ Vérifie si le mot de passe correspond au hash stocké """
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return tpool.execute(bcrypt.check_password_hash, self.password_hash, password)
+
+    def needs_rehash(self):
+        """ ✅ Vrai si le hash a été calculé avec un autre coût que celui configuré ("$2b$<coût>$...") """
+        try:
+            return int(self.password_hash.split('$')[2]) != current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        except (IndexError, ValueError):
+            return True
 
     def __repr__(self):
         return f"<User {self.username} ({self.email})>"
@@ -44,20 +59,7 @@ class Room(db.Model):
     def __init__(self, name, genre=None):
         self.name = name
         self.genre = genre
-
-    def add_user(self, user):
-        """ ✅ Ajoute un joueur dans la Room """
-        if user.room_id is None:
-            user.room_id = self.id
-            self.active_users += 1
-            db.session.commit()
-
-    def remove_user(self, user):
-        """ ✅ Retire un joueur de la Room """
-        if user.room_id == self.id:
-            user.room_id = None
-            self.active_users = max(0, self.active_users - 1)  # ✅ Empêche un nombre négatif
-            db.session.commit()
+        self.active_users = 0  # ✅ Tenu à jour par lobby_feed.move_players uniquement
 
     def __repr__(self):
         return f"<Room {self.name} - {self.genre} - {self.active_users} joueurs>"
@@ -69,10 +71,16 @@ class Game(db.Model):
     room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False)
     current_song = db.Column(db.String(200), nullable=True)
     question_type = db.Column(db.String(50), nullable=True)
+    current_question = db.Column(db.Text, nullable=True)  # ✅ Question du round (JSON : énoncé + choix)
+    correct_answer = db.Column(db.String(1), nullable=True)  # ✅ Lettre de la bonne réponse
     time_left = db.Column(db.Integer, default=30)
     status = db.Column(db.String(20), default="waiting")
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_game_room_id_status", "room_id", "status"),  # ✅ Partie en cours d'une room
+    )
+
     def __init__(self, room_id, status="waiting"):
         self.room_id = room_id
         self.status = status  # ✅ Ajout d'un statut initial
@@ -92,6 +100,11 @@ class Score(db.Model):
     user = db.relationship("User", backref=db.backref("scores", cascade="all, delete-orphan"))
     game = db.relationship("Game", backref=db.backref("scores", cascade="all, delete-orphan"))
 
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "game_id", name="uq_score_user_id_game_id"),  # ✅ Un score par joueur et par partie (upsert)
+        db.Index("ix_score_game_id_score", "game_id", "score"),  # ✅ Classement d'une partie
+    )
+
     def __init__(self, user_id, game_id, score=0):
         self.user_id = user_id
         self.game_id = game_id
@@ -99,3 +112,23 @@ class Score(db.Model):
 
     def __repr__(self):
         return f"<Score {self.score} - User {self.user_id} - Game {self.game_id}>"
+
+
+# 📌 Modèle LeaderboardEntry : total des scores d'un joueur par classement et par période,
+# mis à jour de façon incrémentale à la fin de chaque partie
+class LeaderboardEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    board = db.Column(db.String(120), nullable=False)   # "all", "genre:<genre>", "topic:<topic>"
+    period = db.Column(db.String(20), nullable=False)   # "all", "week:2025-W14", "month:2025-04"
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    total_score = db.Column(db.Integer, default=0, nullable=False)
+    games_played = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("board", "period", "user_id", name="uq_leaderboard_board_period_user"),  # ✅ Upsert incrémental
+        db.Index("ix_leaderboard_board_period_score", "board", "period", "total_score"),  # ✅ Top N
+    )
+
+    def __repr__(self):
+        return f"<LeaderboardEntry {self.board}/{self.period} - User {self.user_id}: {self.total_score}>"
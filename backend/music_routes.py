@@ -1,16 +1,39 @@
-from flask import Blueprint, jsonify
-from spotify_service import get_random_track  # Assure-toi que ce fichier existe et fonctionne
+from flask import Blueprint, jsonify, send_file, url_for
+from config import Config
+from preview_cache import preview_cache
+from spotify_service import get_random_track, track_buffer  # Assure-toi que ce fichier existe et fonctionne
 
 music = Blueprint("music", __name__)
 
+PREVIEW_MAX_AGE = 365 * 24 * 3600  # ✅ Un extrait ne change jamais pour une clé donnée
+
 @music.route("/get_song", methods=["GET"])
 def get_song():
     track = get_random_track("pop")  # Exemple : récupérer une musique aléatoire de genre pop
     if track:
+        # ✅ Téléchargé une seule fois côté serveur, puis servi localement à toute la room
+        key = preview_cache.prefetch(track["preview_url"])
+        if Config.PREVIEW_PREFETCH_NEXT:
+            next_track = track_buffer.peek("pop")
+            if next_track:
+                preview_cache.prefetch(next_track["preview_url"])  # ⏩ Extrait du round suivant
+
         return jsonify({
             "title": track["title"],
             "artist": track["artist"],
             "album": track["album"],
-            "preview_url": track["preview_url"]  # Lien vers un extrait de la musique
+            "preview_url": track["preview_url"],  # Lien vers un extrait de la musique
+            "audio_url": url_for("music.get_preview", key=key)  # Même extrait, servi par le backend
         })
     return jsonify({"error": "Aucune musique trouvée"}), 404
+
+# 📌 Extrait audio depuis le cache local (requêtes Range, envoi via file_wrapper, cache navigateur long)
+@music.route("/preview/<string:key>", methods=["GET"])
+def get_preview(key):
+    path = preview_cache.path(key)
+    if not path:
+        return jsonify({"error": "Extrait introuvable"}), 404
+
+    response = send_file(path, mimetype="audio/mpeg", conditional=True, max_age=PREVIEW_MAX_AGE)
+    response.headers["Cache-Control"] = f"public, max-age={PREVIEW_MAX_AGE}, immutable"
+    return response
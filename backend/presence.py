@@ -0,0 +1,80 @@
+import redis
+
+
+# 📌 Présence des joueurs dans les rooms, partagée entre les workers.
+# Sans REDIS_URL, un stockage en mémoire (un seul processus) est utilisé.
+class MemoryPresenceBackend:
+    def __init__(self):
+        self._rooms = {}  # room_id -> set(username)
+
+    def add(self, room_id, username):
+        self._rooms.setdefault(room_id, set()).add(username)
+
+    def remove(self, room_id, username):
+        members = self._rooms.get(room_id)
+        if members is None or username not in members:
+            return None
+        members.discard(username)
+        if not members:
+            del self._rooms[room_id]
+        return len(members)
+
+    def members(self, room_id):
+        return set(self._rooms.get(room_id, ()))
+
+    def is_empty(self, room_id):
+        return not self._rooms.get(room_id)
+
+
+class RedisPresenceBackend:
+    KEY = "presence:room:{}"
+
+    def __init__(self, client):
+        self.client = client
+
+    def add(self, room_id, username):
+        self.client.sadd(self.KEY.format(room_id), username)
+
+    def remove(self, room_id, username):
+        key = self.KEY.format(room_id)
+        pipe = self.client.pipeline()  # ✅ MULTI/EXEC : retrait et comptage atomiques
+        pipe.srem(key, username)
+        pipe.scard(key)
+        removed, remaining = pipe.execute()
+        return remaining if removed else None
+
+    def members(self, room_id):
+        return {m.decode() if isinstance(m, bytes) else m for m in self.client.smembers(self.KEY.format(room_id))}
+
+    def is_empty(self, room_id):
+        return self.client.scard(self.KEY.format(room_id)) == 0
+
+
+class Presence:
+    def __init__(self):
+        self.backend = MemoryPresenceBackend()
+
+    def init_app(self, app, client=None):
+        """ ✅ Utilise Redis si REDIS_URL est défini (ou un client compatible fourni) """
+        url = app.config.get("REDIS_URL")
+        if client is None and url:
+            client = redis.Redis.from_url(url)
+        if client is not None:
+            self.backend = RedisPresenceBackend(client)
+
+    # Les room_id arrivent en int (REST) ou en str (Socket.IO) : une seule clé par room
+    def add(self, room_id, username):
+        self.backend.add(str(room_id), username)
+
+    def remove(self, room_id, username):
+        """ ✅ Retire un joueur ; renvoie le nombre de joueurs restants (None s'il n'y était pas) """
+        return self.backend.remove(str(room_id), username)
+
+    def members(self, room_id):
+        return self.backend.members(str(room_id))
+
+    def is_empty(self, room_id):
+        return self.backend.is_empty(str(room_id))
+
+
+presence = Presence()
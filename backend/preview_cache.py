@@ -0,0 +1,148 @@
+import hashlib
+import os
+from collections import OrderedDict
+import eventlet
+from eventlet.event import Event
+from spotify_service import session
+from metrics import metrics
+from log import get_logger
+
+log = get_logger("music")
+
+
+# 📌 Cache disque (LRU, taille bornée) des extraits audio : chaque extrait n'est
+# téléchargé qu'une fois depuis le CDN, puis servi localement à tous les joueurs.
+# ⚠️ L'URL d'origine est écrite à côté de l'extrait ({clé}.url) : tous les workers
+# partageant le dossier peuvent servir une clé enregistrée par un autre.
+class PreviewCache:
+    def __init__(self, directory=None, max_bytes=0, timeout=10):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._files = OrderedDict()    # clé -> taille, du moins au plus récemment utilisé
+        self._downloads = {}           # clé -> Event des téléchargements en cours
+        self._size = 0
+        if directory:
+            self._open()
+
+    def init_app(self, app):
+        """ ✅ Dossier et taille max depuis la configuration ; les fichiers existants sont repris """
+        self.directory = app.config["PREVIEW_CACHE_DIR"]
+        self.max_bytes = app.config["PREVIEW_CACHE_MAX_MB"] * 1024 * 1024
+        self.timeout = app.config["SPOTIFY_TIMEOUT"]
+        self._open()
+
+    def _open(self):
+        self._files.clear()
+        self._size = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def register(self, url):
+        """ ✅ Associe une URL d'extrait à sa clé locale (utilisée par l'endpoint), visible de tous les workers """
+        key = self.key_for(url)
+        target = self._url_file(key)
+        if not os.path.exists(target):
+            partial = f"{target}.{os.getpid()}.part"
+            with open(partial, "w", encoding="utf-8") as f:
+                f.write(url)
+            os.replace(partial, target)
+        return key
+
+    def _url(self, key):
+        try:
+            with open(self._url_file(key), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def prefetch(self, url):
+        """ ✅ Télécharge l'extrait en arrière-plan (ex: round suivant) """
+        key = self.register(url)
+        if key not in self._files and key not in self._downloads:
+            eventlet.spawn_n(self.path, key)
+        return key
+
+    def path(self, key):
+        """ ✅ Chemin local de l'extrait (téléchargé si besoin), ou None si inconnu / en échec """
+        if key in self._files:
+            if os.path.exists(self._file(key)):
+                self._files.move_to_end(key)
+                return self._file(key)
+            self._size -= self._files.pop(key)  # ⚠️ Évincé par un autre worker
+
+        if os.path.exists(self._file(key)):
+            return self._adopt(key)  # ✅ Déjà téléchargé par un autre worker
+
+        pending = self._downloads.get(key)
+        if pending is not None:
+            return pending.wait()  # ✅ Un seul téléchargement même si toute la room demande l'extrait
+
+        url = self._url(key)
+        if url is None:
+            return None
+
+        pending = self._downloads[key] = Event()
+        result = None
+        try:
+            result = self._download(key, url)
+        except Exception as e:
+            log.warning("⚠️ Erreur lors du téléchargement de l'extrait %s : %s", url, e)
+        finally:
+            del self._downloads[key]
+            pending.send(result)
+        return result
+
+    def _file(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _url_file(self, key):
+        return os.path.join(self.directory, f"{key}.url")
+
+    def _download(self, key, url):
+        target = self._file(key)
+        partial = f"{target}.part"
+        with metrics.external_call("spotify", "preview_download"), session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            with open(partial, "wb") as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+        os.replace(partial, target)
+        return self._adopt(key)
+
+    def _adopt(self, key):
+        target = self._file(key)
+        size = os.path.getsize(target)
+        self._files[key] = size
+        self._size += size
+        self._evict()
+        return target
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._files) > 1:
+            key, size = self._files.popitem(last=False)
+            self._size -= size
+            for path in (self._file(key), self._url_file(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _scan(self):
+        """ ✅ Reprend les fichiers déjà présents (du plus ancien au plus récent accès) """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".mp3"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_atime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self._size += size
+        self._evict()
+
+
+preview_cache = PreviewCache()
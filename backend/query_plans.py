@@ -0,0 +1,54 @@
+from sqlalchemy import func, select, text
+from extensions import db
+from leaderboard import entries_page
+from models import Game, Score, User
+
+
+# 📌 Requêtes critiques de l'application et index attendu pour chacune.
+# `flask check-query-plans` échoue si l'une d'elles repasse en scan complet.
+def hot_queries():
+    return [
+        ("Partie en cours d'une room", "game", "ix_game_room_id_status",
+         select(Game).where(Game.room_id == 1, Game.status == "playing")),
+        ("Parties en cours (lobby)", "game", "ix_game_room_id_status",
+         select(Game.room_id, func.max(Game.id)).where(Game.status == "playing").group_by(Game.room_id)),
+        ("Classement d'une partie", "score", "ix_score_game_id_score",
+         select(Score).where(Score.game_id == 1).order_by(Score.score.desc())),
+        ("Score d'un joueur dans une partie (upsert)", "score", None,
+         select(Score).where(Score.user_id == 1, Score.game_id == 1)),
+        ("Joueurs par room (lobby)", "user", "ix_user_room_id",
+         select(User.room_id, func.count(User.id)).where(User.room_id.isnot(None)).group_by(User.room_id)),
+        ("Joueur par username", "user", None,
+         select(User).where(User.username == "player")),
+        ("Chargement d'un classement (page)", "leaderboard_entry", None,
+         entries_page(("all", "all"), after=100)),
+    ]
+
+
+def explain(statement):
+    """ ✅ Plan d'exécution SQLite d'une requête (liste des lignes `detail`) """
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def uses_index(plan, table, index_name=None):
+    """ ✅ Vrai si aucune ligne du plan ne parcourt `table` sans index (et avec `index_name` si donné) """
+    lines = [line for line in plan if f" {table}" in f" {line}".replace('"', "")]
+    if not lines or any("USING" not in line for line in lines):
+        return False
+    return index_name is None or any(index_name in line for line in lines)
+
+
+def check_query_plans():
+    """ ✅ Affiche le plan de chaque requête critique ; renvoie False en cas de régression """
+    if db.engine.dialect.name != "sqlite":
+        print(f"⚠️ Vérification des plans disponible uniquement sur SQLite (base : {db.engine.dialect.name})")
+        return True
+
+    ok = True
+    for label, table, index_name, statement in hot_queries():
+        plan = explain(statement)
+        valid = uses_index(plan, table, index_name)
+        ok = ok and valid
+        print(f"{'✅' if valid else '❌'} {label} : {' | '.join(plan)}")
+    return ok
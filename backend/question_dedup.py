@@ -0,0 +1,170 @@
+import hashlib
+import random
+import re
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from log import get_logger
+
+log = get_logger("game")
+
+# Function words carry no topic: without them "What is the capital of Spain?" and
+# "... of France?" no longer look alike, while rephrasings of one question still do.
+STOPWORDS = frozenset("""
+a an the of in on at to for from by with about as into and or but not no is are was were be been being
+do does did has have had which what who whom whose when where why how this that these those it its
+there their they following one name known called city country
+""".split())
+
+NUM_HASHES = 64
+BANDS = 16                      # LSH: 16 bands of 4 rows
+ROWS = NUM_HASHES // BANDS
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)    # fixed seeds: signatures are comparable across restarts
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+
+
+# Exact key plus MinHash signature of a question
+@dataclass(frozen=True)
+class Fingerprint:
+    exact: str
+    signature: tuple
+
+    @classmethod
+    def of(cls, question):
+        stem = normalize(question.stem)
+        choices = sorted(normalize(choice) for choice in question.choices)
+        exact = hashlib.sha1("|".join([stem, *choices]).encode()).hexdigest()  # same question, shuffled choices
+
+        # Shingles: content words of the stem (order-free, rephrasings reorder them) and of the right answer
+        answer = question.choices["ABCD".index(question.answer)]
+        tokens = {word for word in stem.split() if word not in STOPWORDS} | {f"={w}" for w in normalize(answer).split()}
+        if not tokens:
+            tokens = {stem}
+        hashes = [_hash(token) for token in tokens]
+        signature = tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+        return cls(exact, signature)
+
+    def similarity(self, other):
+        """Estimated Jaccard similarity of the two shingle sets."""
+        return sum(x == y for x, y in zip(self.signature, other.signature)) / NUM_HASHES
+
+    def bands(self):
+        return [(i, self.signature[i * ROWS:(i + 1) * ROWS]) for i in range(BANDS)]
+
+
+# Fingerprints of one game: exact set plus LSH buckets for near-duplicates
+class _SignatureSet:
+    def __init__(self):
+        self.exact = set()
+        self.buckets = {}  # (band, rows) -> [Fingerprint]
+
+    def add(self, fingerprint):
+        self.exact.add(fingerprint.exact)
+        for band in fingerprint.bands():
+            self.buckets.setdefault(band, []).append(fingerprint)
+
+    def match(self, fingerprint, threshold):
+        """Return "exact", "near" or None."""
+        if fingerprint.exact in self.exact:
+            return "exact"
+        for band in fingerprint.bands():
+            for candidate in self.buckets.get(band, ()):
+                if fingerprint.similarity(candidate) >= threshold:
+                    return "near"
+        return None
+
+
+class QuestionIndex:
+    """Keeps repeated questions out of a game.
+
+    Every question a game is about to broadcast is checked against the
+    fingerprints of the questions that game already asked (exact hash, then
+    MinHash near-duplicates above `threshold`). A repeat is replaced by a
+    question of the same theme that another game already used and this one has
+    not seen (no LLM call), or else by drawing a new question (`attempts` at most).
+    """
+
+    def __init__(self, threshold=0.7, cache_size=200, attempts=3):
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self.attempts = attempts
+        self._games = {}   # game_id -> _SignatureSet
+        self._themes = {}  # theme -> OrderedDict(exact -> (Fingerprint, Question)), least recent first
+        self._counts = {"checked": 0, "exact": 0, "near": 0, "from_cache": 0, "redrawn": 0, "served_repeat": 0}
+
+    def pick(self, game_id, theme, draw):
+        """Return a question `game_id` has not seen, starting from `draw()`; None if `draw` fails."""
+        question = draw()
+        seen = self._games.setdefault(game_id, _SignatureSet())
+        for attempt in range(self.attempts + 1):
+            if question is None:
+                return None
+            fingerprint = Fingerprint.of(question)
+            self._counts["checked"] += 1
+            match = seen.match(fingerprint, self.threshold)
+            if match is None:
+                break
+            self._counts[match] += 1
+
+            cached = self._unseen_from_cache(seen, theme)
+            if cached is not None:
+                self._counts["from_cache"] += 1
+                fingerprint, question = cached
+                break
+            if attempt == self.attempts:
+                self._counts["served_repeat"] += 1
+                log.warning("⚠️ No fresh question for game %s after %d draws, repeating one", game_id, attempt + 1)
+                break
+            self._counts["redrawn"] += 1
+            question = draw()
+
+        seen.add(fingerprint)
+        self._remember(theme, fingerprint, question)
+        return question
+
+    def forget(self, game_id):
+        """Drop a finished game's fingerprints (its questions stay in the theme cache)."""
+        self._games.pop(game_id, None)
+
+    def hit_rate(self):
+        checked = self._counts["checked"]
+        return (self._counts["exact"] + self._counts["near"]) / checked if checked else 0.0
+
+    def calls_saved(self):
+        """Duplicates replaced from the theme cache, i.e. LLM calls not made."""
+        return self._counts["from_cache"]
+
+    def stats(self):
+        return {
+            **self._counts,
+            "hit_rate": round(self.hit_rate(), 4),
+            "calls_saved": self.calls_saved(),
+            "games": len(self._games),
+            "themes": len(self._themes),
+            "cached_questions": sum(len(cache) for cache in self._themes.values()),
+        }
+
+    def _unseen_from_cache(self, seen, theme):
+        for fingerprint, question in reversed(self._themes.get(theme, {}).values()):
+            if seen.match(fingerprint, self.threshold) is None:
+                return fingerprint, question
+        return None
+
+    def _remember(self, theme, fingerprint, question):
+        cache = self._themes.setdefault(theme, OrderedDict())
+        cache[fingerprint.exact] = (fingerprint, question)
+        cache.move_to_end(fingerprint.exact)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
@@ -0,0 +1,81 @@
+from collections import deque
+import eventlet
+from log import get_logger
+
+log = get_logger("game")
+
+
+# 📌 Réserve de questions pré-générées, indexée par (topic, subtopic, country)
+class QuestionPool:
+    """Garde `size` questions prêtes par thème et les regénère en arrière-plan.
+
+    `generator(topic, subtopic, country)` est la fonction de génération
+    (l'appel OpenAI en production, un stub local dans les tests). Elle doit
+    renvoyer une question ou `None` en cas d'échec. `fallback`, si fourni,
+    sert quand la réserve est vide (ex: génération mutualisée entre rooms).
+    """
+
+    def __init__(self, generator, size=3, workers=4, fallback=None):
+        self.generator = generator
+        self.fallback = fallback or generator
+        self.size = size
+        self._queues = {}    # clé -> deque de questions prêtes
+        self._pending = {}   # clé -> nombre de générations en cours ou en attente
+        self._backlog = deque()  # clés à remplir quand un worker se libère
+        self._workers = eventlet.GreenPool(workers)
+
+    @staticmethod
+    def _key(topic, subtopic, country):
+        return (topic, subtopic or "", country)
+
+    def warm(self, topic, subtopic, country):
+        """ ✅ Lance le remplissage d'un thème sans attendre le résultat """
+        self._refill(self._key(topic, subtopic, country))
+
+    def take(self, topic, subtopic, country):
+        """ ✅ Renvoie la prochaine question prête en O(1) et relance le remplissage """
+        key = self._key(topic, subtopic, country)
+        queue = self._queues.get(key)
+        question = queue.popleft() if queue else None
+        self._refill(key)
+
+        if question is None:
+            # ⚠️ Réserve vide (thème froid) : génération directe pour ce round
+            question = self.fallback(*key)
+        return question
+
+    def ready(self, topic, subtopic, country):
+        """ ✅ Nombre de questions prêtes pour un thème """
+        return len(self._queues.get(self._key(topic, subtopic, country), ()))
+
+    def _refill(self, key):
+        queue = self._queues.setdefault(key, deque())
+        missing = self.size - len(queue) - self._pending.get(key, 0)
+        for _ in range(missing):
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self._backlog.append(key)
+        self._dispatch()
+
+    def _dispatch(self):
+        # ⚠️ GreenPool.spawn_n bloque quand tous les workers sont occupés : on ne lance
+        # que sur les places libres, le reste attend dans `_backlog` (take() ne bloque jamais)
+        while self._backlog and self._workers.free() > 0:
+            self._workers.spawn_n(self._drain, self._backlog.popleft())
+
+    def _drain(self, key):
+        # Un worker enchaîne les remplissages en attente avant de rendre sa place
+        while key is not None:
+            self._fill_one(key)
+            key = self._backlog.popleft() if self._backlog else None
+
+    def _fill_one(self, key):
+        try:
+            question = self.generator(*key)
+        except Exception as e:
+            log.warning("⚠️ Erreur lors du pré-chargement d'une question %s : %s", key, e)
+            question = None
+        finally:
+            self._pending[key] -= 1
+
+        if question:
+            self._queues[key].append(question)
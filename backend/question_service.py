@@ -0,0 +1,188 @@
+import random
+import time
+import eventlet
+from eventlet.event import Event
+from greenlet import GreenletExit
+from config import Config
+from metrics import metrics
+from log import get_logger
+from questions import parse_question
+
+log = get_logger("game")
+
+SYSTEM_PROMPT = "You are a quiz generator that creates country-specific questions."
+
+
+def build_prompt(topic, subtopic, country):
+    prompt = f"Create a multiple-choice quiz question about {topic} in {country}. "
+    if subtopic:
+        prompt += f"Specifically, focus on {subtopic}. "
+    prompt += (
+        "Provide 4 answer choices labeled A), B), C) and D), one per line. "
+        "End with a last line of the form 'Correct answer: <letter>'."
+    )
+    return prompt
+
+
+class CircuitOpenError(Exception):
+    """Raised when the upstream has failed too often and calls are short-circuited."""
+
+
+# Circuit breaker: opens after `threshold` consecutive failures, lets one trial call
+# through after `reset_after` seconds (half-open), closes again on success.
+class CircuitBreaker:
+    def __init__(self, threshold=5, reset_after=30):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self._trial_in_flight:
+            return False
+        self._trial_in_flight = True  # half-open: only this caller probes the upstream
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._trial_in_flight = False
+        self.failures += 1
+        if self.failures >= self.threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+# Question generation service: bounded concurrency, per-call deadline, retries with
+# jittered backoff, circuit breaker and coalescing of identical concurrent requests.
+class QuestionService:
+    def __init__(self, client=None, api_key=None, base_url=None, model="gpt-3.5-turbo",
+                 max_concurrency=8, timeout=15, deadline=30, max_retries=2,
+                 backoff_base=0.5, breaker=None):
+        self._client = client
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker or CircuitBreaker()
+        self._workers = eventlet.GreenPool(max_concurrency)
+        self._inflight = {}  # (topic, subtopic, country) -> Event
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            api_key=config.OPENAI_API_KEY,
+            base_url=config.OPENAI_BASE_URL,
+            model=config.OPENAI_MODEL,
+            max_concurrency=config.LLM_MAX_CONCURRENCY,
+            timeout=config.LLM_TIMEOUT,
+            deadline=config.LLM_DEADLINE,
+            max_retries=config.LLM_MAX_RETRIES,
+            breaker=CircuitBreaker(config.LLM_BREAKER_THRESHOLD, config.LLM_BREAKER_RESET),
+        )
+
+    @property
+    def client(self):
+        # Created (and the SDK imported) on first use; max_retries=0 because retries are handled here
+        if self._client is None:
+            import openai
+            self._client = openai.OpenAI(
+                api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=0
+            )
+        return self._client
+
+    def generate(self, topic, subtopic, country, coalesce=True):
+        """Return a parsed Question, or None if generation failed or the deadline expired.
+
+        With `coalesce`, callers asking for the same theme at the same time share
+        a single upstream call. The question pool passes coalesce=False so that
+        its refills produce distinct questions.
+        """
+        key = (topic, subtopic or "", country)
+        if not coalesce:
+            return self._run(key)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return pending.wait()
+
+        pending = self._inflight[key] = Event()
+        question = None
+        try:
+            question = self._run(key)
+        finally:
+            del self._inflight[key]
+            pending.send(question)
+        return question
+
+    def _run(self, key):
+        worker = None
+        try:
+            with eventlet.Timeout(self.deadline):
+                worker = self._workers.spawn(self._call_with_retry, key)
+                return worker.wait()
+        except eventlet.Timeout:
+            if worker is not None:
+                worker.kill()  # Frees its pool slot instead of letting the call run on unobserved
+            log.warning("⚠️ Question generation deadline exceeded for %s", key)
+        except CircuitOpenError:
+            log.warning("⚠️ Question generation skipped, circuit open for %s", key)
+        except Exception as e:
+            log.warning("⚠️ Error generating question: %s", e)
+        return None
+
+    def _call_with_retry(self, key):
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError()
+            try:
+                question = self._call(*key)
+            except GreenletExit:
+                self.breaker.record_failure()  # Killed at the deadline: a failed call (and trial, if half-open)
+                raise
+            except ValueError as e:
+                # Malformed output: the upstream is healthy, just ask again
+                log.info("⚠️ Malformed question rejected: %s", e)
+                self.breaker.record_success()
+            except Exception:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+            else:
+                self.breaker.record_success()
+                return question
+
+            # Full jitter backoff: random delay in [0, base * 2^attempt]
+            eventlet.sleep(random.uniform(0, self.backoff_base * 2 ** attempt))
+        return None
+
+    def _call(self, topic, subtopic, country):
+        with metrics.external_call("openai", "chat_completion"):
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": build_prompt(topic, subtopic, country)},
+                ],
+            )
+        return parse_question(response.choices[0].message.content)
+
+
+question_service = QuestionService.from_config(Config)
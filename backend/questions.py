@@ -0,0 +1,93 @@
+import json
+import re
+from dataclasses import dataclass
+
+LETTERS = ("A", "B", "C", "D")
+
+# "A) Paris", "(B) Rome", "C. Berlin", "D - Madrid", "A: Lisbon"
+CHOICE_RE = re.compile(r"^\(?([A-D])\s*[\).:\-]\s*(.+)$", re.IGNORECASE)
+# "Correct answer: B", "Answer: (C) Berlin", "**Correct Answer:** D", "The correct answer is B."
+# The letter must end the line or be followed by ")", ".", ":" or "-": "Answer: A quick..." is not a key
+ANSWER_RE = re.compile(
+    r"^\W*(?:the\s+)?(?:correct\s+)?answer(?:\s*[:\-]|\s+is(?:\s*[:\-])?)[\s*]*\(?([A-D])(?:\)?[.:]?\s*|\s*[\).:\-]\s*.+)$",
+    re.IGNORECASE,
+)
+# Player submission: a bare letter, optionally "(B)", "B." or "B)"
+SUBMISSION_RE = re.compile(r"^\(?([A-D])(?:\)|\.)?$", re.IGNORECASE)
+STEM_PREFIX_RE = re.compile(r"^\W*question\s*\d*\s*[:.\-][\s*]*", re.IGNORECASE)
+
+
+# Structured multiple-choice question, parsed once when it is generated
+@dataclass(frozen=True)
+class Question:
+    stem: str
+    choices: tuple  # (text_A, text_B, text_C, text_D)
+    answer: str     # correct letter, "A" to "D"
+
+    def is_correct(self, submitted):
+        """Constant-time check: compare the submitted letter to the answer key (anything else is wrong)."""
+        return parse_choice(submitted) == self.answer
+
+    def public_dict(self):
+        """Payload sent to players (never includes the answer)."""
+        return {"question": self.stem, "choices": dict(zip(LETTERS, self.choices))}
+
+    def to_json(self, round_number=None):
+        data = {"stem": self.stem, "choices": list(self.choices)}
+        if round_number is not None:
+            data["round"] = round_number
+        return json.dumps(data)
+
+    @classmethod
+    def from_record(cls, question_json, answer):
+        data = json.loads(question_json)
+        return cls(stem=data["stem"], choices=tuple(data["choices"]), answer=answer)
+
+
+def parse_choice(submitted):
+    """Letter of a player's submission ("B", "(B)", "B.", "B)"), or None if it is not one."""
+    if not isinstance(submitted, str):
+        return None
+    match = SUBMISSION_RE.match(submitted.strip())
+    return match.group(1).upper() if match else None
+
+
+def parse_question(text):
+    """Parse raw LLM output into a Question, raising ValueError if it is malformed."""
+    if not text:
+        raise ValueError("Empty question text")
+
+    stem_lines = []
+    choices = {}
+    answer = None
+
+    for line in text.splitlines():
+        line = line.strip().strip("*").strip()
+        if not line:
+            continue
+
+        answer_match = ANSWER_RE.match(line)
+        if answer_match:
+            answer = answer_match.group(1).upper()
+            continue
+
+        choice_match = CHOICE_RE.match(line)
+        if choice_match and answer is None:
+            letter = choice_match.group(1).upper()
+            if letter in choices:
+                raise ValueError(f"Duplicate choice {letter}")
+            choices[letter] = choice_match.group(2).strip()
+            continue
+
+        if not choices:
+            stem_lines.append(STEM_PREFIX_RE.sub("", line))
+
+    stem = " ".join(stem_lines).strip()
+    if not stem:
+        raise ValueError("Missing question stem")
+    if sorted(choices) != list(LETTERS):
+        raise ValueError(f"Expected choices A-D, got {sorted(choices)}")
+    if answer is None:
+        raise ValueError("Missing correct answer")
+
+    return Question(stem=stem, choices=tuple(choices[letter] for letter in LETTERS), answer=answer)
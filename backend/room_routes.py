@@ -1,31 +1,83 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy import func
 from extensions import db
-from models import Room, User, Game  # ✅ Ajout de Game
+from models import Room, Game  # ✅ Ajout de Game
+from lobby_cache import lobby_cache, lobby_cached
+from lobby_feed import lobby_feed
+from identity_cache import identity_cache
+from log import get_logger
+
+log = get_logger("rooms")
 
 room_bp = Blueprint("room", __name__)
 
-# 📌 Récupérer toutes les rooms disponibles avec l'ID de la game en cours
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# 📌 Récupérer les rooms (paginées par curseur) avec le nombre de joueurs et l'ID de la game en cours
+# Paramètres : ?cursor=<dernier id reçu>&limit=<n>&genre=<genre>&status=<status>&has_free_slots=true
+# Sans `cursor` ni `limit`, toutes les rooms sont renvoyées (clients qui ne suivent pas `next_cursor`)
 @room_bp.route("/rooms", methods=["GET"])
+@lobby_cached(lambda: "rooms?" + "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True))))
 def get_rooms():
-    rooms = Room.query.all()
-    room_list = []
-
-    for room in rooms:
-        game = Game.query.filter_by(room_id=room.id, status="playing").first()
-        room_list.append({
-            "id": room.id,
-            "name": room.name,
-            "genre": room.genre,
-            "status": room.status,
-            "players": [user.id for user in room.users],
-            "game_id": game.id if game else None  # ✅ Ajout de l'ID de la partie en cours
-        })
-
-    print("🔍 API GET /rooms appelée - Nombre de rooms :", len(room_list))
-    return jsonify({"rooms": room_list})
+    paginated = "cursor" in request.args or "limit" in request.args
+    try:
+        cursor = int(request.args["cursor"]) if "cursor" in request.args else None
+        limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE) if paginated else None
+    except ValueError:
+        return jsonify({"error": "Paramètres de pagination invalides"}), 400
+
+    max_players = current_app.config["ROOM_MAX_PLAYERS"]
+
+    # ✅ Une seule requête : rooms + partie en cours (nombre de joueurs tenu à jour par lobby_feed)
+    playing_games = (
+        db.session.query(Game.room_id, func.max(Game.id).label("game_id"))
+        .filter(Game.status == "playing")
+        .group_by(Game.room_id)
+        .subquery()
+    )
+    player_count = func.coalesce(Room.active_users, 0)
+
+    query = (
+        db.session.query(Room, player_count, playing_games.c.game_id)
+        .outerjoin(playing_games, playing_games.c.room_id == Room.id)
+    )
+
+    if cursor is not None:
+        query = query.filter(Room.id > cursor)
+    if request.args.get("genre"):
+        query = query.filter(Room.genre == request.args["genre"])
+    if request.args.get("status"):
+        query = query.filter(Room.status == request.args["status"])
+    if request.args.get("has_free_slots", "").lower() in ("1", "true", "yes"):
+        query = query.filter(player_count < max_players)
+
+    if limit is None:
+        rows, has_more = query.order_by(Room.id).all(), False
+    else:
+        rows = query.order_by(Room.id).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+    room_list = [{
+        "id": room.id,
+        "name": room.name,
+        "genre": room.genre,
+        "status": room.status,
+        "player_count": count,
+        "max_players": max_players,
+        "game_id": game_id  # ✅ Ajout de l'ID de la partie en cours
+    } for room, count, game_id in rows]
+
+    log.debug("🔍 GET /rooms", extra={"count": len(room_list), "sample": 0.1})
+    return jsonify({
+        "rooms": room_list,
+        "next_cursor": room_list[-1]["id"] if has_more else None
+    })
 
 # 📌 Récupérer une room spécifique
 @room_bp.route("/rooms/<int:room_id>", methods=["GET"])
+@lobby_cached(lambda room_id: f"room:{room_id}")
 def get_room(room_id):
     room = Room.query.get(room_id)
     if not room:
@@ -58,8 +110,10 @@ def create_room():
     new_room = Room(name=room_name, genre=data.get("genre", "Mix"))
     db.session.add(new_room)
     db.session.commit()
+    lobby_cache.invalidate()
+    lobby_feed.room_added(new_room)
 
-    print(f"✅ Room créée : {new_room.name}")  # ✅ Debug console
+    log.info("✅ Room créée : %s", new_room.name, extra={"room_id": new_room.id})
     return jsonify({"message": "Room créée avec succès", "room_id": new_room.id})
 
 # 📌 Un joueur rejoint une Room et est ajouté à la BDD
@@ -69,7 +123,7 @@ def join_room():
     user_id = data.get("user_id")
     room_id = data.get("room_id")
 
-    user = User.query.get(user_id)
+    user = identity_cache.get(user_id)
     room = Room.query.get(room_id)
 
     if not user:
@@ -77,11 +131,10 @@ def join_room():
     if not room:
         return jsonify({"error": "Room introuvable"}), 404
 
-    user.room_id = room.id  # ✅ Ajoute l'utilisateur à la room
-    db.session.commit()
+    counts = lobby_feed.move_players({user.id: room.id})  # ✅ Ajoute l'utilisateur à la room et met à jour les compteurs
 
-    print(f"✅ {user.username} a rejoint la room {room.name}")  # Debug console
-    return jsonify({"message": f"{user.username} a rejoint {room.name}", "players": room.active_users})
+    log.info("✅ %s a rejoint la room %s", user.username, room.name, extra={"user_id": user.id, "room_id": room.id})
+    return jsonify({"message": f"{user.username} a rejoint {room.name}", "players": counts.get(room.id, 0)})
 
 # 📌 Un joueur quitte une Room et est retiré de la BDD
 @room_bp.route("/rooms/leave", methods=["POST"])
@@ -90,14 +143,14 @@ def leave_room():
     user_id = data.get("user_id")
     room_id = data.get("room_id")
 
-    user = User.query.get(user_id)
+    user = identity_cache.get(user_id)
     room = Room.query.get(room_id)
 
     if not user or not room:
         return jsonify({"error": "Utilisateur ou room introuvable"}), 404
 
-    user.room_id = None  # ✅ Retire l'utilisateur de la room
-    db.session.commit()
+    counts = lobby_feed.move_players({user.id: None})  # ✅ Retire l'utilisateur de la room
+    players = counts.get(room.id, room.active_users or 0)
 
-    print(f"❌ {user.username} a quitté la room {room.name}")  # Debug console
-    return jsonify({"message": f"{user.username} a quitté {room.name}", "players": room.active_users})
+    log.info("❌ %s a quitté la room %s", user.username, room.name, extra={"user_id": user.id, "room_id": room.id})
+    return jsonify({"message": f"{user.username} a quitté {room.name}", "players": players})
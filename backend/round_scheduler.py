@@ -0,0 +1,118 @@
+import heapq
+import itertools
+import time
+from collections import deque
+import eventlet
+from log import get_logger
+
+log = get_logger("game")
+
+
+# 📌 Planificateur central des échéances (fins de round, relances, suppressions de room).
+# Un seul greenthread parcourt un tas d'échéances au lieu d'un timer endormi par room ;
+# chaque tâche a une clé, ce qui permet de l'annuler ou de la replanifier.
+class RoundScheduler:
+    def __init__(self, tick=0.1, batch_size=500, workers=100):
+        self.tick = tick
+        self.batch_size = batch_size
+        self._heap = []        # (échéance, seq, clé)
+        self._jobs = {}        # clé -> (seq, échéance, fonction, args)
+        self._seq = itertools.count()
+        self._ready = deque()  # (clé, fonction, args) échues, en attente d'un worker libre
+        self._workers = eventlet.GreenPool(workers)
+        self._app = None
+        self._loop = None
+        self.executed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def init_app(self, app):
+        """ ✅ Les tâches s'exécutent dans le contexte applicatif (accès BDD) """
+        self._app = app
+        if self._loop is None:
+            self._loop = eventlet.spawn(self._run)
+
+    def schedule(self, key, delay, func, *args):
+        """ ✅ Planifie `func(*args)` dans `delay` secondes ; remplace la tâche existante de même clé """
+        seq = next(self._seq)
+        deadline = time.monotonic() + delay
+        self._jobs[key] = (seq, deadline, func, args)
+        heapq.heappush(self._heap, (deadline, seq, key))
+
+    def cancel(self, key):
+        """ ✅ Annule la tâche (suppression paresseuse : l'entrée du tas est ignorée) """
+        return self._jobs.pop(key, None) is not None
+
+    def pending(self, key=None):
+        return key in self._jobs if key is not None else len(self._jobs)
+
+    def count(self, kind):
+        """ ✅ Tâches en attente d'un type (premier élément de la clé, ex: "round") """
+        return sum(1 for key in self._jobs if key[0] == kind)
+
+    def stats(self):
+        """ ✅ Tâches en attente et retard de planification (secondes) """
+        return {
+            "pending": len(self._jobs),
+            "ready": len(self._ready),
+            "executed": self.executed,
+            "last_lag": round(self.last_lag, 4),
+            "max_lag": round(self.max_lag, 4),
+        }
+
+    def _due(self, now):
+        batch = []
+        while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+            deadline, seq, key = heapq.heappop(self._heap)
+            job = self._jobs.get(key)
+            if job is None or job[0] != seq:
+                continue  # ✅ Annulée ou replanifiée
+            del self._jobs[key]
+            batch.append((key, job))
+        return batch
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            batch = self._due(now)
+            for key, (_, deadline, func, args) in batch:
+                self.last_lag = now - deadline
+                self.max_lag = max(self.max_lag, self.last_lag)
+                self._ready.append((key, func, args))
+            self._dispatch()
+
+            if len(batch) == self.batch_size:
+                eventlet.sleep(0)  # ⏩ Encore des échéances dépassées : lot suivant sans attendre
+                continue
+
+            delay = self.tick
+            if self._heap:
+                delay = min(delay, max(self._heap[0][0] - time.monotonic(), 0))
+            eventlet.sleep(delay)
+
+    def _dispatch(self):
+        # ⚠️ GreenPool.spawn_n bloque quand tous les workers sont occupés : la boucle ne lance
+        # que sur les places libres, le reste attend dans `_ready` (les échéances restent à l'heure)
+        while self._ready and self._workers.free() > 0:
+            self._workers.spawn_n(self._drain, *self._ready.popleft())
+
+    def _drain(self, key, func, args):
+        # Un worker enchaîne les tâches échues en attente avant de rendre sa place
+        while key is not None:
+            self._execute(key, func, args)
+            key, func, args = self._ready.popleft() if self._ready else (None, None, None)
+
+    def _execute(self, key, func, args):
+        try:
+            if self._app is None:
+                func(*args)
+            else:
+                with self._app.app_context():
+                    func(*args)
+        except Exception as e:
+            log.exception("⚠️ Erreur dans la tâche planifiée %s : %s", key, e)
+        finally:
+            self.executed += 1
+
+
+round_scheduler = RoundScheduler()
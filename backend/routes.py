@@ -2,6 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from datetime import timedelta
 from models import db, User
+from identity_cache import identity_cache
+from log import get_logger
+
+log = get_logger("auth")
 
 auth = Blueprint('auth', __name__)
 
@@ -23,7 +27,7 @@ def register():
     db.session.add(new_user)
     db.session.commit()
 
-    print(f"✅ Utilisateur inscrit : {username} ({email})")
+    log.info("✅ Utilisateur inscrit : %s", username, extra={"user_id": new_user.id})
 
     access_token = create_access_token(identity=str(new_user.id), expires_delta=timedelta(hours=1))
 
@@ -47,6 +51,11 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({"error": "Identifiants invalides"}), 401
 
+    # 🔁 Coût bcrypt modifié depuis l'inscription : nouveau hash avec le mot de passe en clair reçu
+    if user.needs_rehash():
+        user.set_password(password)
+        db.session.commit()
+
     access_token = create_access_token(identity=str(user.id), expires_delta=timedelta(hours=1))
     refresh_token = create_refresh_token(identity=str(user.id), expires_delta=timedelta(days=30))
 
@@ -63,18 +72,14 @@ def login():
 @jwt_required()
 def profile():
     try:
-        print(f"🔍 Requête reçue sur /profile | Headers : {request.headers}")
-
         current_user_id = get_jwt_identity()
-        print(f"🔑 JWT Identity récupérée : {current_user_id} | Type : {type(current_user_id)}")
-
-        user = User.query.get(int(current_user_id))  # ✅ Conversion en entier
+        user = identity_cache.get(int(current_user_id))  # ✅ Conversion en entier, sans requête si déjà en cache
 
         if not user:
-            print(f"⚠️ Tentative d'accès à un profil inexistant : ID {current_user_id}")
+            log.warning("⚠️ Tentative d'accès à un profil inexistant", extra={"user_id": current_user_id})
             return jsonify({"error": "Utilisateur non trouvé"}), 404
 
-        print(f"✅ Profil chargé avec succès pour l'ID {current_user_id}")
+        log.debug("✅ Profil chargé", extra={"user_id": current_user_id, "sample": 0.1})
 
         return jsonify({
             "username": user.username,
@@ -82,7 +87,7 @@ def profile():
         }), 200
 
     except Exception as e:
-        print(f"❌ Erreur dans la récupération du profil : {e}")
+        log.warning("❌ Erreur dans la récupération du profil : %s", e)
         return jsonify({"error": "Token invalide ou expiré"}), 401
 
 
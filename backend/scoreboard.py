@@ -0,0 +1,145 @@
+import redis
+from sortedcontainers import SortedList
+from extensions import db
+from models import Score, User
+
+
+# 📌 Classement d'une partie, maintenu en mémoire au fil des réponses
+class GameScoreboard:
+    def __init__(self):
+        self._ranking = SortedList()  # (-score, user_id) : meilleur score en premier
+        self._scores = {}             # user_id -> score
+        self._names = {}              # user_id -> username
+        self._changed = set()         # user_id modifiés depuis la dernière diffusion
+
+    def add(self, user_id, username, points):
+        """ ✅ Ajoute des points à un joueur en O(log n) """
+        old = self._scores.get(user_id)
+        if old is not None:
+            self._ranking.remove((-old, user_id))
+        score = (old or 0) + points
+
+        self._scores[user_id] = score
+        self._names[user_id] = username
+        self._ranking.add((-score, user_id))
+        self._changed.add(user_id)
+        return self._entry(user_id)
+
+    def top(self, k):
+        """ ✅ Les k meilleurs joueurs """
+        return [self._entry(user_id) for _, user_id in self._ranking[:k]]
+
+    def leader(self):
+        """ ✅ Joueur en tête, ou None si personne n'a marqué """
+        return self._entry(self._ranking[0][1]) if self._ranking else None
+
+    def pop_changes(self):
+        """ ✅ Entrées modifiées depuis le dernier appel (pour `update_scores`) """
+        changed, self._changed = self._changed, set()
+        return [self._entry(user_id) for user_id in changed]
+
+    def _entry(self, user_id):
+        return {"user_id": user_id, "username": self._names[user_id], "score": self._scores[user_id]}
+
+
+# 📌 Classement d'une partie partagé entre les workers (même interface que GameScoreboard) :
+# les réponses reçues par n'importe quel worker comptent dans le classement de la partie
+class RedisGameScoreboard:
+    SCORES = "scoreboard:{}:scores"    # zset user_id -> score
+    NAMES = "scoreboard:{}:names"      # hash user_id -> username
+    CHANGED = "scoreboard:{}:changed"  # set user_id modifiés depuis la dernière diffusion
+    LOADED = "scoreboard:{}:loaded"    # posé par le worker qui recharge le classement depuis `Score`
+
+    def __init__(self, client, game_id):
+        self.client = client
+        self.scores = self.SCORES.format(game_id)
+        self.names = self.NAMES.format(game_id)
+        self.changed = self.CHANGED.format(game_id)
+
+    def add(self, user_id, username, points):
+        pipe = self.client.pipeline()
+        pipe.zincrby(self.scores, points, user_id)
+        pipe.hset(self.names, user_id, username)
+        pipe.sadd(self.changed, user_id)
+        score = pipe.execute()[0]
+        return {"user_id": user_id, "username": username, "score": int(score)}
+
+    def top(self, k):
+        return self._entries(self.client.zrevrange(self.scores, 0, k - 1, withscores=True))
+
+    def leader(self):
+        top = self.top(1)
+        return top[0] if top else None
+
+    def pop_changes(self):
+        pipe = self.client.pipeline()  # ✅ MULTI/EXEC : chaque changement n'est diffusé qu'une fois
+        pipe.smembers(self.changed)
+        pipe.delete(self.changed)
+        changed = pipe.execute()[0]
+        if not changed:
+            return []
+        pipe = self.client.pipeline()
+        for user_id in changed:
+            pipe.zscore(self.scores, user_id)
+        return self._entries([(user_id, score) for user_id, score in zip(changed, pipe.execute()) if score is not None])
+
+    def _entries(self, rows):
+        if not rows:
+            return []
+        names = self.client.hmget(self.names, [user_id for user_id, _ in rows])
+        return [
+            {"user_id": int(user_id), "username": name.decode() if isinstance(name, bytes) else name, "score": int(score)}
+            for (user_id, score), name in zip(rows, names)
+        ]
+
+
+# 📌 Classements de toutes les parties en cours.
+# Sans REDIS_URL, les classements sont en mémoire (un seul processus).
+class Scoreboards:
+    def __init__(self):
+        self._boards = {}  # game_id -> GameScoreboard ou RedisGameScoreboard
+        self._redis = None
+
+    def init_app(self, app, client=None):
+        """ ✅ Classements partagés dans Redis si REDIS_URL est défini """
+        url = app.config.get("REDIS_URL")
+        if client is None and url:
+            client = redis.Redis.from_url(url)
+        self._redis = client
+
+    def get(self, game_id):
+        """ ✅ Classement d'une partie (rechargé depuis `Score` après un redémarrage) """
+        board = self._boards.get(game_id)
+        if board is None:
+            board = self._boards[game_id] = self._open(game_id)
+        return board
+
+    def discard(self, game_id):
+        self._boards.pop(game_id, None)
+        if self._redis is not None:
+            board = RedisGameScoreboard(self._redis, game_id)
+            self._redis.delete(board.scores, board.names, board.changed, RedisGameScoreboard.LOADED.format(game_id))
+
+    def _open(self, game_id):
+        if self._redis is None:
+            return self._load(game_id, GameScoreboard())
+        board = RedisGameScoreboard(self._redis, game_id)
+        if self._redis.set(RedisGameScoreboard.LOADED.format(game_id), 1, nx=True):  # ✅ Un seul worker recharge
+            self._load(game_id, board)
+        return board
+
+    @staticmethod
+    def _load(game_id, board):
+        rows = (
+            db.session.query(Score.user_id, User.username, Score.score)
+            .join(User, User.id == Score.user_id)
+            .filter(Score.game_id == game_id)
+            .all()
+        )
+        for user_id, username, score in rows:
+            board.add(user_id, username, score or 0)
+        board.pop_changes()
+        return board
+
+
+scoreboards = Scoreboards()
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+import eventlet
+from extensions import db
+from lobby_feed import lobby_feed
+from log import get_logger
+
+log = get_logger("sockets")
+
+
+@dataclass
+class SocketSession:
+    user_id: int
+    username: str
+    room_id: object = None
+
+
+# 📌 Registre des connexions Socket.IO : sid -> (user_id, username, room_id).
+# C'est la source de vérité de la présence en direct ; `User.room_id` (et les
+# compteurs des rooms) n'est recopié en base que par lots, via lobby_feed.
+class SessionRegistry:
+    def __init__(self):
+        self._sessions = {}  # sid -> SocketSession
+        self._dirty = {}     # user_id -> room_id à écrire en base
+        self._flusher = None
+
+    def init_app(self, app, interval=2):
+        """ ✅ Lance l'écriture périodique des rooms des joueurs en base """
+        if self._flusher is None and interval > 0:
+            self._flusher = eventlet.spawn(self._run, app, interval)
+
+    def bind(self, sid, user_id, username):
+        """ ✅ Associe une connexion authentifiée à un joueur """
+        session = SocketSession(user_id=user_id, username=username)
+        self._sessions[sid] = session
+        return session
+
+    def get(self, sid):
+        return self._sessions.get(sid)
+
+    def move(self, sid, room_id):
+        """ ✅ Change la room d'une connexion ; renvoie l'ancienne room """
+        session = self._sessions.get(sid)
+        if session is None:
+            return None
+        previous, session.room_id = session.room_id, room_id
+        self._dirty[session.user_id] = int(room_id) if room_id is not None else None
+        return previous
+
+    def unbind(self, sid):
+        """ ✅ Oublie une connexion (déconnexion) ; renvoie sa session """
+        return self._sessions.pop(sid, None)
+
+    def connected(self):
+        return len(self._sessions)
+
+    def active_rooms(self):
+        """ ✅ Nombre de rooms occupées par au moins une connexion de ce worker """
+        return len({session.room_id for session in self._sessions.values() if session.room_id is not None})
+
+    def flush(self):
+        """ ✅ Écrit en une seule transaction les rooms modifiées depuis le dernier vidage """
+        pending, self._dirty = self._dirty, {}
+        if not pending:
+            return 0
+
+        try:
+            lobby_feed.move_players(pending)  # ✅ Compteurs des rooms, cache et flux du lobby mis à jour
+        except Exception as e:
+            db.session.rollback()
+            log.warning("⚠️ Erreur lors de l'écriture de la présence, nouvel essai au prochain vidage : %s", e)
+            for user_id, room_id in pending.items():
+                self._dirty.setdefault(user_id, room_id)
+            return 0
+        return len(pending)
+
+    def _run(self, app, interval):
+        while True:
+            eventlet.sleep(interval)
+            with app.app_context():
+                self.flush()
+
+
+session_registry = SessionRegistry()
@@ -1,33 +1,66 @@
-from flask_socketio import SocketIO, emit, join_room, leave_room
+from flask_socketio import emit, join_room, leave_room
 from flask import request
-from extensions import db
-from models import Room, User
-import eventlet
-
-socketio = SocketIO()
-
-# Dictionnaire pour suivre les utilisateurs actifs dans les rooms
-active_rooms = {}
+from flask_jwt_extended import decode_token
+from extensions import db, socketio
+from models import Room
+from lobby_cache import lobby_cache
+from lobby_feed import lobby_feed, LOBBY_ROOM
+from presence import presence
+from session_registry import session_registry
+from round_scheduler import round_scheduler
+from identity_cache import identity_cache
+from metrics import metrics
+from log import get_logger
+
+log = get_logger("sockets")
 
 def init_socketio(app):
-    global socketio
-    socketio.init_app(app, cors_allowed_origins="*", path="socket.io")
+    # ✅ Avec REDIS_URL, les emit sont relayés entre workers et la présence est partagée
+    socketio.init_app(
+        app,
+        cors_allowed_origins="*",
+        path="socket.io",
+        message_queue=app.config.get("REDIS_URL"),
+    )
+    presence.init_app(app)
+    lobby_cache.init_app(app)
+    lobby_feed.init_app(app)
+    session_registry.init_app(app, interval=app.config["PRESENCE_FLUSH_INTERVAL"])
 
     @socketio.on("connect")
-    def handle_connect():
-        print(f"✅ Client connecté : {request.sid}")
+    @metrics.socket_event("connect")
+    def handle_connect(auth=None):
+        log.debug("✅ Client connecté", extra={"sid": request.sid, "sample": 0.1})
+
+        # ✅ Authentification unique à la connexion : le JWT est lu une fois, puis le sid suffit
+        token = (auth or {}).get("token") or request.args.get("token")
+        if not token:
+            return
+        try:
+            user_id = int(decode_token(token)["sub"])
+        except Exception as e:
+            log.warning("⚠️ Token Socket.IO invalide : %s", e, extra={"sid": request.sid})
+            return
+
+        user = identity_cache.get(user_id)
+        if user:
+            session_registry.bind(request.sid, user.id, user.username)
 
     @socketio.on("disconnect")
+    @metrics.socket_event("disconnect")
     def handle_disconnect():
-        print(f"❌ Client déconnecté : {request.sid}")
+        log.debug("❌ Client déconnecté", extra={"sid": request.sid, "sample": 0.1})
 
-        # Récupérer l'utilisateur par `session_id`
-        user = User.query.filter_by(session_id=request.sid).first()
-        if user:
-            print(f"🚪 Déconnexion de {user.username}, sortie de la room {user.room_id}")
-            handle_leave_room({"room_id": user.room_id, "username": user.username})
+        # ✅ Résolu depuis le registre, sans lecture en base
+        session = session_registry.get(request.sid)
+        if session and session.room_id is not None:
+            log.info("🚪 Déconnexion de %s, sortie de la room %s", session.username, session.room_id)
+            room_id = session_registry.move(request.sid, None)
+            leave_presence(room_id, session.username)
+        session_registry.unbind(request.sid)
 
     @socketio.on("create_room")
+    @metrics.socket_event("create_room")
     def handle_create_room(data):
         room_name = data.get("room_name")
         username = data.get("username")
@@ -39,87 +72,99 @@ def init_socketio(app):
         new_room = Room(name=room_name)
         db.session.add(new_room)
         db.session.commit()
+        lobby_cache.invalidate()
+        lobby_feed.room_added(new_room)
 
-        print(f"🆕 Room créée: {room_name} (ID: {new_room.id})")
+        log.info("🆕 Room créée : %s", room_name, extra={"room_id": new_room.id})
         emit("room_created", {"room_id": new_room.id, "room_name": new_room.name}, broadcast=True)
 
+    # 📡 Abonnement au flux du lobby : événements `lobby_update` (diffs regroupés par tick)
+    @socketio.on("join_lobby")
+    @metrics.socket_event("join_lobby")
+    def handle_join_lobby(data=None):
+        join_room(LOBBY_ROOM)
+
+    @socketio.on("leave_lobby")
+    @metrics.socket_event("leave_lobby")
+    def handle_leave_lobby(data=None):
+        leave_room(LOBBY_ROOM)
+
     @socketio.on("join_room")
+    @metrics.socket_event("join_room")
     def handle_join_room(data):
         room_id = data.get("room_id")
-        username = data.get("username")
+        session = session_registry.get(request.sid)
 
-        if not room_id or not username:
+        if not session:
+            emit("error", {"error": "Non authentifié"})
+            return
+        if not room_id:
             emit("error", {"error": "Données invalides"})
             return
-        
+
         room = Room.query.get(room_id)
         if not room:
             emit("error", {"error": "Room introuvable"})
             return
 
-        join_room(room_id)
-        user = User.query.filter_by(username=username).first()
-
-        if not user:
-            user = User(username=username, room_id=room_id, session_id=request.sid)
-            db.session.add(user)
-        else:
-            user.room_id = room_id
-            user.session_id = request.sid  # ✅ Mise à jour du session_id
-        db.session.commit()
+        previous = session_registry.move(request.sid, room_id)
+        if previous is not None and str(previous) != str(room_id):
+            leave_room(previous)
+            leave_presence(previous, session.username)
 
-        # Ajouter l'utilisateur à la liste des rooms actives
-        if room_id not in active_rooms:
-            active_rooms[room_id] = set()
-        active_rooms[room_id].add(username)
+        join_room(room_id)
+        presence.add(room_id, session.username)  # Ajouter l'utilisateur à la présence partagée
+        round_scheduler.cancel(("delete_room", str(room_id)))  # ✅ La room n'est plus vide
 
-        print(f"✅ {username} a rejoint la room {room_id}")
-        emit("join_confirmation", {"room_id": room_id, "username": username}, room=room_id)
+        log.info("✅ %s a rejoint la room %s", session.username, room_id)
+        emit("join_confirmation", {"room_id": room_id, "username": session.username}, room=room_id)
 
     @socketio.on("leave_room")
+    @metrics.socket_event("leave_room")
     def handle_leave_room(data):
-        room_id = data.get("room_id")
-        username = data.get("username")
-
-        if not room_id or not username:
+        session = session_registry.get(request.sid)
+        if not session or session.room_id is None:
             return
 
+        room_id = session.room_id
         leave_room(room_id)
-        user = User.query.filter_by(username=username).first()
-        
-        if user:
-            user.room_id = None  # ✅ Ne pas supprimer, juste le retirer de la room
-            user.session_id = None  # ✅ Suppression du session_id
-            db.session.commit()
+        session_registry.move(request.sid, None)  # ✅ Écrit en base au prochain vidage
+        leave_presence(room_id, session.username)
 
-        if room_id in active_rooms and username in active_rooms[room_id]:
-            active_rooms[room_id].remove(username)
-            
-            # ✅ Si plus personne dans la room, suppression après 5 minutes
-            if not active_rooms[room_id]:
-                del active_rooms[room_id]
-                eventlet.spawn_after(300, delete_empty_room, room_id)  # ⏳ Supprime après 5 min
+    def leave_presence(room_id, username):
+        # ✅ Si plus personne dans la room (tous workers confondus), suppression après 5 minutes
+        if presence.remove(room_id, username) == 0:
+            round_scheduler.schedule(("delete_room", str(room_id)), 300, delete_empty_room, room_id)  # ⏳ Supprime après 5 min
 
     def delete_empty_room(room_id):
-        if room_id not in active_rooms:  # Vérifier si la room est toujours vide
-            Room.query.filter_by(id=room_id).delete()
+        if not presence.is_empty(room_id):  # Vérifier si la room est toujours vide
+            return
+
+        # ⏳ Exécuté par le planificateur (contexte applicatif) : socketio.emit, relayé à tous les workers
+        if Room.query.filter_by(id=room_id).delete():
             db.session.commit()
-            print(f"🗑️ Room {room_id} supprimée après 5 minutes d'inactivité.")
-            emit("room_deleted", {"room_id": room_id}, broadcast=True)
+            lobby_cache.invalidate()
+            lobby_feed.room_removed(room_id)
+            log.info("🗑️ Room %s supprimée après 5 minutes d'inactivité", room_id)
+            socketio.emit("room_deleted", {"room_id": room_id})
+
+    def start_new_round(room_id):
+        if not presence.is_empty(room_id):  # Vérifier s'il y a toujours des joueurs
+            log.info("🔄 Nouvelle partie démarrée dans la room %s", room_id)
+            socketio.emit("new_round", {"room_id": room_id}, room=room_id)
 
     @socketio.on("start_game")
+    @metrics.socket_event("start_game")
     def handle_start_game(data):
         room_id = data.get("room_id")
-        if not room_id or room_id not in active_rooms:
+        if not room_id or presence.is_empty(room_id):
             emit("error", {"error": "Room invalide"})
             return
         
-        print(f"🎮 Démarrage du jeu dans la room {room_id}")
+        log.info("🎮 Démarrage du jeu dans la room %s", room_id)
         emit("game_started", {"room_id": room_id}, room=room_id)
 
-        eventlet.sleep(60)  # Attendre 60 secondes avant de relancer une partie
-        if room_id in active_rooms and active_rooms[room_id]:  # Vérifier s'il y a toujours des joueurs
-            print(f"🔄 Nouvelle partie démarrée dans la room {room_id}")
-            emit("new_round", {"room_id": room_id}, room=room_id)
+        # ⏳ Relance dans 60 secondes, sans bloquer le handler
+        round_scheduler.schedule(("new_round", str(room_id)), 60, start_new_round, room_id)
 
     return socketio
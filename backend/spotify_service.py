@@ -1,29 +1,123 @@
 import requests
 import base64
+import random
+import time
+from collections import deque
+import eventlet
+from eventlet.semaphore import Semaphore
 from config import Config
+from metrics import metrics
+from log import get_logger
+
+log = get_logger("music")
+
+# ✅ Session HTTP partagée : connexions keep-alive réutilisées entre les appels
+session = requests.Session()
+session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=Config.SPOTIFY_POOL_SIZE))
+session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=Config.SPOTIFY_POOL_SIZE))
+
+
+# 📌 Token client-credentials mis en cache, renouvelé peu avant son expiration
+class TokenCache:
+    def __init__(self, refresh_margin=60):
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._expires_at = 0
+        self._lock = Semaphore()
+
+    def get(self):
+        if self._token and time.monotonic() < self._expires_at - self.refresh_margin:
+            return self._token
+
+        with self._lock:  # ✅ Un seul renouvellement même si plusieurs requêtes arrivent en même temps
+            if not self._token or time.monotonic() >= self._expires_at - self.refresh_margin:
+                self._refresh()
+        return self._token
+
+    def _refresh(self):
+        headers = {
+            "Authorization": "Basic " + base64.b64encode(f"{Config.SPOTIFY_CLIENT_ID}:{Config.SPOTIFY_CLIENT_SECRET}".encode()).decode(),
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+        data = {"grant_type": "client_credentials"}
+        with metrics.external_call("spotify", "token"):
+            response = session.post(f"{Config.SPOTIFY_ACCOUNTS_URL}/api/token", headers=headers, data=data, timeout=Config.SPOTIFY_TIMEOUT)
+            response.raise_for_status()
+        payload = response.json()
+        self._token = payload["access_token"]
+        self._expires_at = time.monotonic() + int(payload.get("expires_in", 3600))
+
+
+# 📌 Réserve de morceaux par genre (uniquement ceux qui ont un extrait), rechargée en arrière-plan
+class TrackBuffer:
+    def __init__(self, size=20, fetch_limit=50):
+        self.size = size
+        self.fetch_limit = fetch_limit
+        self._tracks = {}       # genre -> deque de morceaux
+        self._refilling = set()  # genres en cours de rechargement
+
+    def take(self, genre):
+        tracks = self._tracks.setdefault(genre, deque())
+        if not tracks:
+            self._fill(genre)  # ⚠️ Réserve vide : chargement direct
+        track = tracks.popleft() if tracks else None
+
+        if len(tracks) < self.size // 2:
+            self.refill(genre)
+        return track
+
+    def peek(self, genre):
+        """ ✅ Prochain morceau qui sera servi pour ce genre (sans le retirer) """
+        tracks = self._tracks.get(genre)
+        return tracks[0] if tracks else None
+
+    def refill(self, genre):
+        if genre not in self._refilling:
+            self._refilling.add(genre)
+            eventlet.spawn_n(self._refill, genre)
+
+    def _refill(self, genre):
+        try:
+            self._fill(genre)
+        except Exception as e:
+            log.warning("⚠️ Erreur lors du préchargement Spotify (%s) : %s", genre, e)
+        finally:
+            self._refilling.discard(genre)
+
+    def _fill(self, genre):
+        tracks = self._tracks.setdefault(genre, deque())
+        fetched = [track for track in fetch_tracks(genre, self.fetch_limit) if track["preview_url"]]
+        random.shuffle(fetched)
+        known = {track["preview_url"] for track in tracks}
+        tracks.extend(track for track in fetched if track["preview_url"] not in known)
+
+
+token_cache = TokenCache()
+track_buffer = TrackBuffer(size=Config.SPOTIFY_TRACK_BUFFER)
+
 
 def get_spotify_token():
-    url = "https://accounts.spotify.com/api/token"
-    headers = {
-        "Authorization": "Basic " + base64.b64encode(f"{Config.SPOTIFY_CLIENT_ID}:{Config.SPOTIFY_CLIENT_SECRET}".encode()).decode(),
-        "Content-Type": "application/x-www-form-urlencoded",
-    }
-    data = {"grant_type": "client_credentials"}
-    response = requests.post(url, headers=headers, data=data)
-    return response.json().get("access_token")
+    return token_cache.get()
+
+
+def fetch_tracks(genre, limit):
+    url = f"{Config.SPOTIFY_API_URL}/v1/recommendations"
+    headers = {"Authorization": f"Bearer {get_spotify_token()}"}
+    with metrics.external_call("spotify", "recommendations"):
+        response = session.get(url, headers=headers, params={"seed_genres": genre, "limit": limit}, timeout=Config.SPOTIFY_TIMEOUT)
+        response.raise_for_status()
+
+    return [{
+        "title": track["name"],
+        "artist": track["artists"][0]["name"],
+        "album": track["album"]["name"],
+        "preview_url": track.get("preview_url"),  # Lien de l'extrait musical
+    } for track in response.json().get("tracks", [])]
+
 
 def get_random_track(genre="pop"):
-    token = get_spotify_token()
-    url = f"https://api.spotify.com/v1/recommendations?seed_genres={genre}&limit=1"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    track = response.json().get("tracks", [])[0]
-
-    if track:
-        return {
-            "title": track["name"],
-            "artist": track["artists"][0]["name"],
-            "album": track["album"]["name"],
-            "preview_url": track["preview_url"],  # Lien de l'extrait musical
-        }
-    return None
+    try:
+        return track_buffer.take(genre)
+    except Exception as e:
+        log.warning("⚠️ Erreur Spotify : %s", e)
+        return None
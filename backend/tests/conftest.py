@@ -0,0 +1,32 @@
+import eventlet
+eventlet.monkey_patch()  # ✅ Comme app.py : avant tout autre import (sockets, threads et time coopératifs)
+
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# ⚠️ Avant tout import de config : jamais la base du projet (database.db) ni un service réel
+_TMP_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["PREVIEW_CACHE_DIR"] = os.path.join(_TMP_DIR, "preview_cache")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+for name in ("REDIS_URL", "DATABASE_REPLICA_URL", "DB_PROFILE"):
+    os.environ.pop(name, None)
+
+
+@pytest.fixture(scope="session")
+def app():
+    """ ✅ Application complète sur une base SQLite temporaire, schéma créé par les migrations """
+    from flask_migrate import upgrade
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=os.path.join(BACKEND_DIR, "migrations"))
+    return app
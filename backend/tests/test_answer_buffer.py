@@ -0,0 +1,91 @@
+import uuid
+import pytest
+from answer_buffer import AnswerBuffer
+from extensions import db
+from game_routes import current_questions
+from models import Game, Room, Score, User
+from questions import Question
+
+
+@pytest.fixture
+def game(app):
+    with app.app_context():
+        room = Room(name=f"answers-{uuid.uuid4().hex[:8]}")
+        db.session.add(room)
+        db.session.flush()
+        game = Game(room_id=room.id, status="playing")
+        users = [User(username=f"ab-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@example.com", password="x")
+                 for _ in range(3)]
+        db.session.add_all([game, *users])
+        db.session.commit()
+        yield game, users
+
+
+@pytest.fixture
+def buffer(app):
+    buffer = AnswerBuffer()
+    buffer.init_app(app, interval=0)
+    return buffer
+
+
+def scores(game_id):
+    return dict(db.session.query(Score.user_id, Score.score).filter_by(game_id=game_id))
+
+
+def test_old_round_cannot_be_replayed_after_close(app, buffer, game):
+    game, (alice, _, _) = game
+    with app.app_context():
+        assert buffer.record(game.id, 1, alice.id, 10)
+        buffer.close_round(game.id)
+        assert not buffer.record(game.id, 1, alice.id, 10)
+        assert buffer.record(game.id, 2, alice.id, 10)
+        assert not buffer.record(game.id, 2, alice.id, 10)
+
+        buffer.close_round(game.id)
+        assert scores(game.id) == {alice.id: 20}
+
+
+def test_finish_forgets_answers(app, buffer, game):
+    game, (alice, _, _) = game
+    with app.app_context():
+        buffer.record(game.id, 1, alice.id, 0)
+        buffer.finish(game.id)
+    assert buffer.record(game.id, 1, alice.id, 0)
+
+
+@pytest.mark.parametrize("orm", [False, True])
+def test_bulk_upsert_adds_to_existing_scores(app, buffer, game, orm):
+    game, (alice, bob, carol) = game
+    with app.app_context():
+        db.session.add(Score(user_id=alice.id, game_id=game.id, score=30))
+        db.session.commit()
+
+        pending = {game.id: {alice.id: 10, bob.id: 20}}
+        if orm:
+            buffer._persist_orm(pending)
+        else:
+            buffer._persist(pending)
+        assert scores(game.id) == {alice.id: 40, bob.id: 20}
+
+        buffer.record(game.id, 1, carol.id, 10)
+        buffer.record(game.id, 1, bob.id, 10)
+        assert buffer.flush() == 2
+        assert scores(game.id) == {alice.id: 40, bob.id: 30, carol.id: 10}
+
+
+def test_submit_answer_rejects_the_previous_question_between_rounds(app, game, monkeypatch):
+    import game_routes
+    game, (alice, _, _) = game
+    monkeypatch.setattr(game_routes, "answer_buffer", AnswerBuffer())
+    question = Question(stem="Capital of Germany?", choices=("Paris", "Berlin", "Rome", "Madrid"), answer="B")
+    game.current_question = question.to_json(round_number=1)
+    game.correct_answer = "B"
+    db.session.commit()
+
+    client = app.test_client()
+    payload = {"room_id": game.room_id, "username": alice.username, "answer": "B"}
+    assert client.post("/api/game/submit_answer", json=payload).get_json()["correct"]
+
+    game_routes.answer_buffer.close_round(game.id)  # ✅ Fin du round, question suivante pas encore générée
+    assert client.post("/api/game/submit_answer", json=payload).status_code == 400
+    current_questions.pop(game.id, None)
@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "liveChat"))
+os.environ["CHAT_HISTORY_DIR"] = tempfile.mkdtemp()  # ⚠️ Avant l'import de main : jamais le dossier history du projet
+os.environ["CHAT_HISTORY_SIZE"] = "20"
+import main  # noqa: E402
+from history import ChatHistory, RoomLog  # noqa: E402
+
+
+def ids(messages):
+    return [message["id"] for message in messages]
+
+
+@pytest.fixture
+def room_log(tmp_path):
+    log = RoomLog(str(tmp_path / "ROOM.jsonl"), size=10, index_every=4)
+    for i in range(1, 31):
+        log.append("alice", f"message {i}")
+    yield log
+    log.close()
+
+
+def test_newest_page_comes_from_the_ring_buffer(room_log):
+    assert ids(room_log.recent) == list(range(21, 31))
+    assert ids(room_log.page(limit=5)) == list(range(26, 31))
+    assert ids(room_log.page(before=25, limit=3)) == [22, 23, 24]
+
+
+def test_older_pages_are_read_from_the_log(room_log):
+    assert ids(room_log.page(before=21, limit=10)) == list(range(11, 21))
+    assert ids(room_log.page(before=23, limit=5)) == list(range(18, 23))  # ✅ À cheval sur le disque et la mémoire
+    assert ids(room_log.page(before=6, limit=10)) == [1, 2, 3, 4, 5]
+    assert room_log.page(before=1) == []
+    assert room_log.page(before=11, limit=1)[0]["message"] == "message 10"
+
+
+def test_log_is_reloaded_without_a_partial_line(tmp_path, room_log):
+    room_log.close()
+    with open(room_log.path, "ab") as f:
+        f.write(b'{"id": 31, "name": "ali')  # écriture interrompue par un crash
+
+    reopened = RoomLog(room_log.path, size=10, index_every=4)
+    assert reopened.last_id == 30
+    assert ids(reopened.recent) == list(range(21, 31))
+    assert ids(reopened.page(before=9, limit=4)) == [5, 6, 7, 8]
+    assert reopened.append("bob", "back")["id"] == 31
+    reopened.close()
+
+
+def test_invalid_room_codes_are_rejected(tmp_path):
+    history = ChatHistory(str(tmp_path))
+    assert not history.exists("../etc")
+    with pytest.raises(ValueError):
+        history.get("../etc")
+
+
+@pytest.fixture
+def client():
+    room = "HIST"
+    main.rooms[room] = {"members": 1}
+    for i in range(1, 251):
+        main.history.get(room).append("alice", f"message {i}")
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session["room"] = room
+    yield client
+    main.rooms.pop(room, None)
+    main.history.release(room)
+    os.remove(main.history._path(room))
+
+
+def test_history_pages_with_the_before_cursor(client):
+    page = client.get("/history?limit=10").get_json()
+    assert ids(page["messages"]) == list(range(241, 251))
+    assert page["next_cursor"] == 241
+
+    page = client.get(f"/history?before={page['next_cursor']}&limit=100").get_json()
+    assert ids(page["messages"]) == list(range(141, 241))  # ✅ Au-delà des 20 messages en mémoire
+    assert page["next_cursor"] == 141
+
+    page = client.get("/history?before=4").get_json()
+    assert ids(page["messages"]) == [1, 2, 3]
+    assert page["next_cursor"] is None
+
+
+def test_history_page_size_is_clamped(client):
+    assert len(client.get("/history").get_json()["messages"]) == main.PAGE_SIZE
+    assert len(client.get("/history?limit=1000").get_json()["messages"]) == 200
+    assert ids(client.get("/history?limit=0").get_json()["messages"]) == [250]
+    assert ids(client.get("/history?limit=-5").get_json()["messages"]) == [250]
+
+
+def test_history_requires_an_open_room():
+    assert main.app.test_client().get("/history").status_code == 403
@@ -0,0 +1,107 @@
+import os
+import sys
+import eventlet
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "liveChat"))
+import outbox  # noqa: E402
+from outbox import RoomBatcher, TokenBucket  # noqa: E402
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted = []  # (event, messages, room)
+        self.tasks = 0
+
+    def emit(self, event, messages, to):
+        self.emitted.append((event, messages, to))
+
+    def start_background_task(self, target):
+        self.tasks += 1
+        return eventlet.spawn(target)
+
+    def sleep(self, seconds):
+        eventlet.sleep(seconds)
+
+
+@pytest.fixture
+def socketio():
+    return FakeSocketIO()
+
+
+def test_messages_of_a_tick_are_one_event_per_room(socketio):
+    batcher = RoomBatcher(socketio, tick=0.01)
+    for i in range(3):
+        batcher.push("ABCD", {"message": i})
+    batcher.push("WXYZ", {"message": "hi"})
+    assert socketio.emitted == []
+
+    eventlet.sleep(0.03)
+    assert sorted(socketio.emitted, key=lambda e: e[2]) == [
+        ("messages", [{"message": 0}, {"message": 1}, {"message": 2}], "ABCD"),
+        ("messages", [{"message": "hi"}], "WXYZ"),
+    ]
+
+
+def test_zero_tick_emits_immediately(socketio):
+    RoomBatcher(socketio, tick=0).push("ABCD", {"message": "now"})
+    assert socketio.emitted == [("messages", [{"message": "now"}], "ABCD")]
+    assert socketio.tasks == 0
+
+
+def test_loop_stops_when_idle_and_restarts(socketio):
+    batcher = RoomBatcher(socketio, tick=0.01)
+    batcher.push("ABCD", {"message": 1})
+    eventlet.sleep(0.05)
+    assert batcher._task is None
+
+    batcher.push("ABCD", {"message": 2})
+    eventlet.sleep(0.05)
+    assert socketio.tasks == 2
+    assert [messages for _, messages, _ in socketio.emitted] == [[{"message": 1}], [{"message": 2}]]
+
+
+def test_failed_flush_is_logged_and_retried(socketio, caplog, monkeypatch):
+    monkeypatch.setattr(outbox.log, "disabled", False)  # ⚠️ fileConfig des migrations désactive les loggers existants
+    calls = []
+
+    def emit(event, messages, to):
+        calls.append(messages)
+        if len(calls) == 1:
+            raise ConnectionError("socket closed")
+
+    socketio.emit = emit
+    batcher = RoomBatcher(socketio, tick=0.01)
+    batcher.push("ABCD", {"message": 1})
+    eventlet.sleep(0.02)
+    batcher.push("ABCD", {"message": 2})
+    eventlet.sleep(0.05)
+
+    assert calls == [[{"message": 1}], [{"message": 2}]]
+    assert "Chat batch flush failed: socket closed" in caplog.text
+    assert batcher._task is None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(outbox.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_token_bucket_allows_a_burst_then_the_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.allow() for _ in range(4)] == [True, True, True, False]
+
+    clock[0] += 0.5
+    assert bucket.allow()
+    assert not bucket.allow()
+
+
+def test_token_bucket_refills_up_to_the_burst(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        bucket.allow()
+
+    clock[0] += 60
+    assert [bucket.allow() for _ in range(4)] == [True, True, True, False]
@@ -0,0 +1,15 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+
+@pytest.mark.parametrize("path", ["/api/game/scheduler", "/api/game/dedup"])
+def test_stats_require_a_token(app, path):
+    assert app.test_client().get(path).status_code == 401
+
+
+@pytest.mark.parametrize("path", ["/api/game/scheduler", "/api/game/dedup"])
+def test_stats_with_a_token(app, path):
+    with app.app_context():
+        token = create_access_token(identity="1")
+    response = app.test_client().get(path, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
@@ -0,0 +1,17 @@
+import pytest
+from identity_cache import identity_cache
+
+
+@pytest.mark.parametrize("user_id", [None, "abc", "", [1], {"id": 1}])
+def test_invalid_ids_are_not_found(app, user_id):
+    with app.app_context():
+        assert identity_cache.get(user_id) is None
+
+
+def test_join_with_non_numeric_user_id_returns_404(app):
+    client = app.test_client()
+    room_id = client.post("/api/rooms", json={"name": "identity-test"}).get_json()["room_id"]
+
+    response = client.post("/api/rooms/join", json={"user_id": "abc", "room_id": room_id})
+
+    assert response.status_code == 404
@@ -0,0 +1,99 @@
+import uuid
+from datetime import datetime
+import eventlet
+import fakeredis
+import pytest
+from flask import current_app
+import leaderboard as leaderboard_module
+from extensions import db
+from leaderboard import Leaderboard, MemoryRankIndex, RedisRankIndex, boards_for, period_key
+from models import Game, LeaderboardEntry, Room, Score
+
+
+def test_periods_are_bucketed_by_iso_week_and_month():
+    now = datetime(2025, 12, 31)
+    assert period_key("all", now) == "all"
+    assert period_key("week", now) == "week:2026-W01"  # ✅ Semaine ISO, pas l'année civile
+    assert period_key("month", now) == "month:2025-12"
+    assert boards_for("Rock", "History") == ["all", "genre:Rock", "topic:History"]
+    assert boards_for() == ["all"]
+
+
+@pytest.fixture(params=["memory", "redis"])
+def index(request):
+    return MemoryRankIndex() if request.param == "memory" else RedisRankIndex(fakeredis.FakeRedis())
+
+
+def test_index_ranks_by_score(index):
+    key = ("all", "all")
+    index.load(key, [(1, 30), (2, 50), (3, 10)])
+    index.incr(key, 3, 45)
+
+    assert index.top(key, 2) == [(3, 55), (2, 50)]
+    assert index.rank(key, 1) == (3, 30)
+    assert index.rank(key, 99) == (None, None)
+
+
+@pytest.fixture
+def board(app, index, monkeypatch):
+    """ ✅ Classement isolé (genre unique) sur un index neuf """
+    leaderboard = Leaderboard()
+    leaderboard.index = index
+    with app.app_context():
+        yield leaderboard, f"genre:{uuid.uuid4().hex[:8]}"
+
+
+def add_entries(board, scores):
+    db.session.add_all([LeaderboardEntry(board=board, period="all", user_id=user_id, total_score=score, games_played=1)
+                        for user_id, score in scores.items()])
+    db.session.commit()
+
+
+def test_load_is_paged(board, monkeypatch):
+    leaderboard, name = board
+    add_entries(name, {user_id: user_id * 10 for user_id in range(1, 8)})
+    monkeypatch.setattr(leaderboard_module, "LOAD_PAGE_SIZE", 3)
+    pages = []
+    original = leaderboard_module.entries_page
+    monkeypatch.setattr(leaderboard_module, "entries_page", lambda key, after: pages.append(after) or original(key, after, 3))
+
+    assert leaderboard.top(name, "all", 3) == [(7, 70), (6, 60), (5, 50)]
+    assert pages == [0, 3, 6]
+    assert leaderboard.rank(name, "all", 1) == (7, 10)
+
+
+def test_game_recorded_during_a_load_is_not_lost(board, monkeypatch):
+    leaderboard, name = board
+    genre = name.split(":", 1)[1]
+    add_entries(name, {1: 10, 2: 20})
+
+    room = Room(name=f"lb-{genre}")
+    db.session.add(room)
+    db.session.flush()
+    game = Game(room_id=room.id, status="finished")
+    db.session.add(game)
+    db.session.flush()
+    db.session.add(Score(user_id=1, game_id=game.id, score=50))
+    db.session.commit()
+
+    slow_entries = Leaderboard._entries
+
+    def entries(key):
+        for row in slow_entries(key):
+            eventlet.sleep(0.01)  # ✅ Laisse la fin de partie s'exécuter au milieu du chargement
+            yield row
+
+    monkeypatch.setattr(leaderboard, "_entries", entries)
+    app = current_app._get_current_object()
+
+    def in_context(func, *args, **kwargs):
+        with app.app_context():
+            return func(*args, **kwargs)
+
+    loader = eventlet.spawn(in_context, leaderboard.top, name, "all", 10)
+    eventlet.sleep(0.005)
+    recorder = eventlet.spawn(in_context, leaderboard.record_game, game.id, genre=genre)
+    loader.wait()
+    recorder.wait()
+
+    assert leaderboard.top(name, "all", 10) == [(1, 60), (2, 20)]
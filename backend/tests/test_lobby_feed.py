@@ -0,0 +1,39 @@
+import eventlet
+import pytest
+import lobby_feed as lobby_feed_module
+from lobby_feed import LobbyFeed
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    lobby_feed_module.lobby_feed.flush()  # ✅ Diffs en attente du flux global (rooms créées par d'autres tests)
+    sent = []
+    monkeypatch.setattr(lobby_feed_module.socketio, "emit", lambda event, data, room=None: sent.append(data))
+    feed = LobbyFeed()
+    feed.tick = 0.01
+    feed.sent = sent
+    return feed
+
+
+def test_flush_loop_stops_when_idle_and_restarts_on_change(feed):
+    feed.game_started(1, 7)
+    assert feed._task is not None
+    eventlet.sleep(0.05)
+
+    assert feed.sent == [{"added": [], "removed": [], "changed": {1: {"status": "playing", "game_id": 7}}}]
+    assert feed._task is None
+
+    feed.game_ended(1)
+    assert feed._task is not None
+    eventlet.sleep(0.05)
+    assert feed.sent[-1]["changed"] == {1: {"status": "waiting", "game_id": None}}
+    assert feed._task is None
+
+
+def test_changes_within_a_tick_are_sent_once(feed):
+    feed.game_started(2, 8)
+    feed.room_removed(3)
+    feed.game_ended(2)
+    eventlet.sleep(0.05)
+
+    assert feed.sent == [{"added": [], "removed": [3], "changed": {2: {"status": "waiting", "game_id": None}}}]
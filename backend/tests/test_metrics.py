@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from extensions import db
+from metrics import metrics
+from round_scheduler import RoundScheduler
+
+
+def test_failed_statement_leaves_no_pending_start(app):
+    with app.app_context():
+        connection = db.session.connection()
+        with pytest.raises(OperationalError):
+            db.session.execute(text("SELECT * FROM missing_table"))
+        assert connection.info.get("metrics_start") == []
+        db.session.rollback()
+
+        db.session.execute(text("SELECT 1"))
+        assert db.session.connection().info.get("metrics_start") == []
+    assert metrics.sql_errors._values[("SELECT",)] >= 1
+
+
+def test_scheduler_counts_jobs_by_kind():
+    scheduler = RoundScheduler()
+    scheduler.schedule(("round", 1), 30, print)
+    scheduler.schedule(("round", 2), 30, print)
+    scheduler.schedule(("delete_room", "3"), 300, print)
+
+    assert scheduler.count("round") == 2
+    assert scheduler.pending() == 3
@@ -0,0 +1,89 @@
+import pytest
+import preview_cache as preview_cache_module
+from preview_cache import PreviewCache, preview_cache
+
+CLIP = bytes(range(256)) * 4
+URL = "https://p.scdn.co/mp3-preview/test-clip"
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """ ✅ CDN simulé : compte les téléchargements par URL """
+    calls = []
+
+    class Session:
+        def get(self, url, stream, timeout):
+            calls.append(url)
+            return FakeResponse(CLIP)
+
+    monkeypatch.setattr(preview_cache_module, "session", Session())
+    return calls
+
+
+def test_key_registered_by_another_worker_is_served(tmp_path, downloads):
+    first, second = PreviewCache(str(tmp_path), max_bytes=10 ** 6), PreviewCache(str(tmp_path), max_bytes=10 ** 6)
+
+    key = first.register(URL)
+    path = second.path(key)
+
+    with open(path, "rb") as f:
+        assert f.read() == CLIP
+    assert first.path(key) == path  # ✅ Fichier repris, pas retéléchargé
+    assert downloads == [URL]
+
+
+def test_unknown_key_is_not_found(tmp_path, downloads):
+    assert PreviewCache(str(tmp_path), max_bytes=10 ** 6).path(PreviewCache.key_for(URL)) is None
+    assert downloads == []
+
+
+def test_eviction_removes_clip_and_url(tmp_path, downloads):
+    cache = PreviewCache(str(tmp_path), max_bytes=len(CLIP))
+    old = cache.register(f"{URL}/old")
+    cache.path(old)
+    cache.path(cache.register(f"{URL}/new"))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(f"{cache.key_for(f'{URL}/new')}.{ext}" for ext in ("mp3", "url"))
+    assert cache.path(old) is None
+
+
+def test_preview_endpoint_headers(app, downloads):
+    key = preview_cache.register(URL)
+    client = app.test_client()
+
+    response = client.get(f"/api/preview/{key}")
+    assert response.status_code == 200
+    assert response.data == CLIP
+    assert response.mimetype == "audio/mpeg"
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["ETag"]
+
+    response = client.get(f"/api/preview/{key}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    response = client.get(f"/api/preview/{key}", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.data == CLIP[10:20]
+    assert response.headers["Content-Range"] == f"bytes 10-19/{len(CLIP)}"
+
+    assert client.get(f"/api/preview/{'0' * 40}").status_code == 404
+    assert downloads == [URL]
@@ -0,0 +1,9 @@
+import pytest
+from query_plans import explain, hot_queries, uses_index
+
+
+@pytest.mark.parametrize("label, table, index_name, statement", hot_queries(), ids=lambda value: value if isinstance(value, str) else None)
+def test_hot_query_uses_index(app, label, table, index_name, statement):
+    with app.app_context():
+        plan = explain(statement)
+    assert uses_index(plan, table, index_name), f"{label} : {' | '.join(plan)}"
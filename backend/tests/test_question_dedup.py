@@ -0,0 +1,121 @@
+import pytest
+from flask_jwt_extended import create_access_token
+import game_routes
+from question_dedup import Fingerprint, QuestionIndex
+from questions import Question
+
+
+def question(stem, answer="Paris", others=("Rome", "Berlin", "Madrid")):
+    return Question(stem=stem, choices=(answer, *others), answer="A")
+
+
+FRANCE = question("What is the capital of France?")
+SPAIN = question("What is the capital of Spain?", "Madrid", ("Rome", "Berlin", "Paris"))
+ITALY = question("What is the capital of Italy?", "Rome", ("Paris", "Berlin", "Madrid"))
+
+
+def draws(*questions):
+    """ ✅ Générateur simulé : renvoie les questions dans l'ordre et compte les appels """
+    pending = list(questions)
+
+    def draw():
+        draw.calls += 1
+        return pending.pop(0) if pending else None
+    draw.calls = 0
+    return draw
+
+
+def test_shuffled_choices_share_the_exact_hash():
+    shuffled = Question(stem="what is the capital of france", choices=("Berlin", "Madrid", "Paris", "Rome"), answer="C")
+    assert Fingerprint.of(shuffled).exact == Fingerprint.of(FRANCE).exact
+
+
+def test_rephrasing_is_near_and_other_topics_are_not():
+    rephrased = Fingerprint.of(question("Which city is the capital of France?"))
+    assert rephrased.exact != Fingerprint.of(FRANCE).exact
+    assert rephrased.similarity(Fingerprint.of(FRANCE)) >= 0.7
+    assert Fingerprint.of(SPAIN).similarity(Fingerprint.of(FRANCE)) < 0.7
+
+
+def test_exact_repeat_is_redrawn():
+    index = QuestionIndex()
+    index.pick(1, "geo", draws(FRANCE))
+    draw = draws(FRANCE, SPAIN)
+
+    assert index.pick(1, "geo", draw) == SPAIN
+    assert draw.calls == 2
+    assert index.stats()["exact"] == 1
+    assert index.stats()["redrawn"] == 1
+
+
+def test_near_duplicate_is_redrawn():
+    index = QuestionIndex()
+    index.pick(1, "geo", draws(FRANCE))
+
+    assert index.pick(1, "geo", draws(question("Which city is the capital of France?"), SPAIN)) == SPAIN
+    assert index.stats()["near"] == 1
+
+
+def test_repeat_is_replaced_from_the_theme_cache():
+    index = QuestionIndex()
+    index.pick(1, "geo", draws(FRANCE))
+    index.pick(2, "geo", draws(SPAIN))
+    draw = draws(FRANCE)
+
+    assert index.pick(1, "geo", draw) == SPAIN  # ✅ Déjà posée dans la partie 2, aucun nouvel appel
+    assert draw.calls == 1
+    assert index.calls_saved() == 1
+
+
+def test_repeat_is_served_after_the_last_attempt():
+    index = QuestionIndex(attempts=2)
+    index.pick(1, "geo", draws(FRANCE))
+    draw = draws(FRANCE, FRANCE, FRANCE)
+
+    assert index.pick(1, "geo", draw) == FRANCE
+    assert draw.calls == 3
+    assert index.stats()["served_repeat"] == 1
+
+
+def test_theme_cache_evicts_least_recent():
+    index = QuestionIndex(cache_size=2)
+    for game_id, q in enumerate((FRANCE, SPAIN, ITALY)):
+        index.pick(game_id, "geo", draws(q))
+    index.pick(0, "history", draws(question("Who was the first emperor of Rome?", "Augustus", ("Nero", "Caesar", "Trajan"))))
+
+    assert [q for _, q in index._themes["geo"].values()] == [SPAIN, ITALY]
+    assert index.stats()["cached_questions"] == 3
+    assert index.stats()["themes"] == 2
+
+
+def test_forget_drops_only_the_game():
+    index = QuestionIndex()
+    index.pick(1, "geo", draws(FRANCE))
+    index.forget(1)
+
+    assert index.pick(1, "geo", draws(FRANCE)) == FRANCE
+    assert index.stats()["exact"] == 0
+    assert index.stats()["cached_questions"] == 1
+
+
+def test_failed_draw_returns_none():
+    assert QuestionIndex().pick(1, "geo", draws()) is None
+
+
+def test_dedup_endpoint_reports_stats(app, monkeypatch):
+    index = QuestionIndex()
+    monkeypatch.setattr(game_routes, "question_index", index)
+    index.pick(1, "geo", draws(FRANCE))
+    index.pick(2, "geo", draws(SPAIN))
+    index.pick(1, "geo", draws(FRANCE))
+
+    with app.app_context():
+        token = create_access_token(identity="1")
+    stats = app.test_client().get("/api/game/dedup", headers={"Authorization": f"Bearer {token}"}).get_json()
+
+    assert stats["checked"] == 3
+    assert stats["exact"] == 1
+    assert stats["calls_saved"] == 1
+    assert stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-4)
+    assert stats["games"] == 2
+    assert stats["cached_questions"] == 2
@@ -0,0 +1,92 @@
+import eventlet
+from question_pool import QuestionPool
+
+KEY = ("Geography", "", "France")
+
+
+class StubGenerator:
+    """ 📌 Générateur local : une question numérotée par appel, bloquable via `gate` """
+
+    def __init__(self, prefix="q", fail=False):
+        self.prefix = prefix
+        self.fail = fail
+        self.calls = 0
+        self.gate = None
+
+    def __call__(self, topic, subtopic, country):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait()
+        if self.fail:
+            return None
+        return f"{self.prefix}{self.calls} {topic}/{subtopic}/{country}"
+
+
+def settle(pool):
+    pool._workers.waitall()
+
+
+def test_take_on_warm_key_serves_ready_question_without_fallback():
+    generator, fallback = StubGenerator(), StubGenerator(prefix="fallback")
+    pool = QuestionPool(generator, size=3, workers=2, fallback=fallback)
+    pool.warm(*KEY)
+    settle(pool)
+    assert pool.ready(*KEY) == 3
+
+    question = pool.take(*KEY)
+
+    assert question.startswith("q")
+    assert fallback.calls == 0
+
+
+def test_take_refills_back_to_size():
+    generator = StubGenerator()
+    pool = QuestionPool(generator, size=3, workers=2)
+    pool.warm(*KEY)
+    settle(pool)
+
+    for _ in range(2):
+        pool.take(*KEY)
+    assert pool.ready(*KEY) == 1
+    settle(pool)
+
+    assert pool.ready(*KEY) == 3
+    assert generator.calls == 5
+
+
+def test_take_on_cold_key_uses_fallback_then_warms_key():
+    generator, fallback = StubGenerator(), StubGenerator(prefix="fallback")
+    pool = QuestionPool(generator, size=2, workers=2, fallback=fallback)
+
+    question = pool.take(*KEY)
+
+    assert question.startswith("fallback")
+    assert fallback.calls == 1
+    settle(pool)
+    assert pool.ready(*KEY) == 2
+
+
+def test_failed_generations_are_not_queued():
+    pool = QuestionPool(StubGenerator(fail=True), size=2, workers=2, fallback=StubGenerator(prefix="fallback"))
+    pool.warm(*KEY)
+    settle(pool)
+
+    assert pool.ready(*KEY) == 0
+    assert pool.take(*KEY).startswith("fallback")
+
+
+def test_take_never_blocks_when_all_workers_are_busy():
+    generator, fallback = StubGenerator(), StubGenerator(prefix="fallback")
+    generator.gate = eventlet.event.Event()
+    pool = QuestionPool(generator, size=3, workers=1, fallback=fallback)
+    pool.warm(*KEY)
+    eventlet.sleep(0)  # le seul worker est bloqué dans le générateur
+
+    with eventlet.Timeout(1):
+        question = pool.take("History", "", "Italy")
+    assert question.startswith("fallback")
+
+    generator.gate.send()
+    settle(pool)
+    assert pool.ready(*KEY) == 3
+    assert pool.ready("History", "", "Italy") == 3
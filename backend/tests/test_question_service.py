@@ -0,0 +1,117 @@
+import time
+from types import SimpleNamespace
+import eventlet
+from question_service import CircuitBreaker, QuestionService
+from questions import Question
+
+QUESTION = Question(stem="Capital of France?", choices=("Paris", "Lyon", "Nice", "Lille"), answer="A")
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.threshold):
+        breaker.record_failure()
+    breaker.opened_at = time.monotonic() - breaker.reset_after  # reset delay elapsed: half-open
+
+
+def test_half_open_breaker_admits_a_single_trial():
+    breaker = CircuitBreaker(threshold=2, reset_after=30)
+    open_breaker(breaker)
+
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(threshold=2, reset_after=30)
+    open_breaker(breaker)
+
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_deadline_kills_the_call_and_releases_the_trial():
+    service = QuestionService(max_concurrency=1, deadline=0.05, max_retries=0,
+                              breaker=CircuitBreaker(threshold=2, reset_after=30))
+    service._call = lambda *key: eventlet.sleep(10) or QUESTION
+    open_breaker(service.breaker)
+
+    assert service.generate("Geography", "", "France") is None
+    eventlet.sleep(0)
+
+    assert service._workers.free() == 1
+    assert service.breaker.state == "open"  # the slow trial counted as a failure
+    assert not service.breaker._trial_in_flight
+
+
+TEXT = "Question: Capital of France?\nA) Paris\nB) Lyon\nC) Nice\nD) Lille\nCorrect answer: A"
+
+
+# Stub OpenAI client: `responses` are returned (or raised) in order, each call yields to the hub
+class StubClient:
+    def __init__(self, *responses, delay=0.01):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages):
+        self.calls += 1
+        eventlet.sleep(self.delay)
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=response))])
+
+
+def generate_concurrently(service, callers, **kwargs):
+    pool = eventlet.GreenPool()
+    threads = [pool.spawn(service.generate, "Geography", "", "France", **kwargs) for _ in range(callers)]
+    return [thread.wait() for thread in threads]
+
+
+def test_concurrent_callers_share_one_upstream_call():
+    client = StubClient(TEXT)
+    service = QuestionService(client=client, max_concurrency=8)
+
+    results = generate_concurrently(service, 10)
+
+    assert client.calls == 1
+    assert all(result == QUESTION for result in results)
+    assert service._inflight == {}
+
+
+def test_uncoalesced_callers_each_call_upstream():
+    client = StubClient(TEXT)
+    service = QuestionService(client=client, max_concurrency=8)
+
+    generate_concurrently(service, 4, coalesce=False)
+
+    assert client.calls == 4
+
+
+def test_transient_errors_are_retried():
+    client = StubClient(ConnectionError("reset"), "not a question", TEXT)
+    service = QuestionService(client=client, max_retries=2, backoff_base=0.001)
+
+    assert service.generate("Geography", "", "France") == QUESTION
+    assert client.calls == 3
+    assert service.breaker.state == "closed"
+
+
+def test_retries_are_bounded():
+    client = StubClient(ConnectionError("reset"))
+    service = QuestionService(client=client, max_retries=2, backoff_base=0.001,
+                              breaker=CircuitBreaker(threshold=10, reset_after=30))
+
+    assert service.generate("Geography", "", "France") is None
+    assert client.calls == 3
+    assert service.breaker.failures == 3
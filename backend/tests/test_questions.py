@@ -0,0 +1,58 @@
+import pytest
+from questions import ANSWER_RE, parse_question
+
+CHOICES = "A) Paris\nB) Rome\nC) Berlin\nD) Madrid\n"
+
+
+@pytest.mark.parametrize("line, letter", [
+    ("Correct answer: B", "B"),
+    ("Answer: (C) Berlin", "C"),
+    ("**Correct Answer:** D", "D"),
+    ("The correct answer is B.", "B"),
+    ("The correct answer is: (D)", "D"),
+    ("Answer - A", "A"),
+])
+def test_answer_lines(line, letter):
+    assert parse_question("What is the capital of Germany?\n" + CHOICES + line).answer == letter
+
+
+@pytest.mark.parametrize("line", [
+    "Answer: A quick question about Europe",
+    "Answer the following: B",
+    "Answer: Berlin (C)",
+    "Correct answer: Bonn",
+    "The answer is always debated",
+])
+def test_loose_lines_are_not_answer_keys(line):
+    assert ANSWER_RE.match(line) is None
+
+
+def test_missing_answer_is_rejected():
+    with pytest.raises(ValueError):
+        parse_question("What is the capital of Germany?\n" + CHOICES + "Answer: A quick guess")
+
+
+@pytest.mark.parametrize("submitted, correct", [
+    ("B", True),
+    ("b", True),
+    (" (B) ", True),
+    ("B.", True),
+    ("B)", True),
+    ("C", False),
+    ("Berlin", False),
+    ("Bordeaux", False),
+    ("B) Berlin", False),
+    ("", False),
+    (None, False),
+    (2, False),
+    (["B"], False),
+])
+def test_is_correct_accepts_only_a_letter(submitted, correct):
+    question = parse_question("What is the capital of Germany?\n" + CHOICES + "Answer: B")
+    assert question.is_correct(submitted) is correct
+
+
+@pytest.mark.parametrize("answer", [5, None, ["B"], "Berlin"])
+def test_submit_answer_rejects_anything_but_a_letter(app, answer):
+    response = app.test_client().post("/api/game/submit_answer", json={"room_id": 1, "username": "nobody", "answer": answer})
+    assert response.status_code == 400
@@ -0,0 +1,38 @@
+import pytest
+from flask import g
+from sqlalchemy import create_engine, select, update
+from extensions import db, primary_reads
+from models import Room
+
+
+@pytest.fixture
+def replica(app, monkeypatch):
+    engine = create_engine("sqlite://")
+    with app.app_context():
+        monkeypatch.setitem(db.engines, "replica", engine)
+    return engine
+
+
+def test_unmarked_views_read_from_primary(app, replica):
+    with app.test_request_context("/api/rooms"):
+        assert db.session.get_bind(clause=select(Room.id)) is db.engine
+
+
+def test_marked_views_read_from_replica_until_they_write(app, replica):
+    with app.test_request_context("/api/leaderboard"):
+        g.replica_reads = True
+        assert db.session.get_bind(clause=select(Room.id)) is replica
+
+        with primary_reads():
+            assert db.session.get_bind(clause=select(Room.id)) is db.engine
+        assert db.session.get_bind(clause=select(Room.id)) is replica
+
+        assert db.session.get_bind(clause=update(Room).values(status="waiting")) is db.engine
+        assert db.session.get_bind(clause=select(Room.id)) is db.engine
+
+
+def test_leaderboard_route_is_replica_tolerant(app):
+    view = app.view_functions["leaderboard.get_leaderboard"]
+    with app.test_request_context("/api/leaderboard"):
+        view()
+        assert g.replica_reads
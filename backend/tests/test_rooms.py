@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    client = app.test_client()
+    for i in range(25):
+        client.post("/api/rooms", json={"name": f"pagination-{i}"})
+    return client
+
+
+def test_rooms_without_pagination_returns_every_room(client):
+    data = client.get("/api/rooms").get_json()
+
+    names = {room["name"] for room in data["rooms"]}
+    assert {f"pagination-{i}" for i in range(25)} <= names
+    assert data["next_cursor"] is None
+
+
+def test_rooms_pages_follow_next_cursor(client):
+    seen, cursor = [], None
+    while True:
+        query = f"?limit=10&cursor={cursor}" if cursor else "?limit=10"
+        data = client.get("/api/rooms" + query).get_json()
+        assert len(data["rooms"]) <= 10
+        seen += [room["id"] for room in data["rooms"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == sorted(set(seen))
+    assert len(seen) == len(client.get("/api/rooms").get_json()["rooms"])
+
+
+@pytest.mark.parametrize("query", ["?limit=abc", "?limit=", "?cursor=abc", "?limit=5&cursor=x"])
+def test_invalid_pagination_returns_400(client, query):
+    assert client.get("/api/rooms" + query).status_code == 400
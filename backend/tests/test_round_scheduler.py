@@ -0,0 +1,56 @@
+import uuid
+import eventlet
+import pytest
+import game_routes
+from extensions import db
+from models import Game, Room
+from questions import Question
+from round_scheduler import RoundScheduler
+
+
+def test_busy_workers_never_block_the_loop():
+    scheduler = RoundScheduler(tick=0.01, workers=1)
+    scheduler.init_app(None)
+    done = []
+    scheduler.schedule("slow", 0, eventlet.sleep, 0.2)
+    for name, delay in (("b", 0.02), ("c", 0.05)):
+        scheduler.schedule(name, delay, done.append, name)
+
+    eventlet.sleep(0.1)
+    assert scheduler.stats()["ready"] == 2  # ✅ Échues et mises en attente à l'heure, sans bloquer la boucle
+    assert scheduler.last_lag < 0.05
+    assert done == []
+
+    eventlet.sleep(0.3)
+    assert done == ["b", "c"]
+    assert scheduler.executed == 3
+
+
+@pytest.fixture
+def game(app):
+    with app.app_context():
+        room = Room(name=f"scheduler-{uuid.uuid4().hex[:8]}")
+        db.session.add(room)
+        db.session.flush()
+        game = Game(room_id=room.id, status="playing")
+        db.session.add(game)
+        db.session.commit()
+        yield game
+
+
+def test_round_in_flight_does_nothing_once_the_game_ended(app, game, monkeypatch):
+    emitted, scheduled = [], []
+    monkeypatch.setattr(game_routes.socketio, "emit", lambda *args, **kwargs: emitted.append(args))
+    monkeypatch.setattr(game_routes.round_scheduler, "schedule", lambda *args: scheduled.append(args))
+
+    def pick_while_game_ends(game_id, theme, draw):
+        Game.query.filter_by(id=game_id).update({"status": "finished"})  # ✅ /api/game/end pendant la génération
+        db.session.commit()
+        return Question(stem="Capital of Germany?", choices=("Paris", "Berlin", "Rome", "Madrid"), answer="B")
+
+    monkeypatch.setattr(game_routes.question_index, "pick", pick_while_game_ends)
+    game_routes.start_round(game.id, game.room_id, "Geography", "", "Germany")
+    game_routes.start_round(game.id, game.room_id, "Geography", "", "Germany")
+
+    assert emitted == [] and scheduled == []
+    assert db.session.get(Game, game.id).current_question is None
@@ -0,0 +1,132 @@
+import uuid
+import eventlet
+import fakeredis
+import pytest
+from answer_buffer import AnswerBuffer, RedisAnswerStore
+from scoreboard import Scoreboards
+from extensions import db
+from models import Game, Room, Score, User
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def workers(app, redis_client):
+    """ ✅ Deux "workers" : leurs propres objets, un seul Redis """
+    pairs = []
+    for _ in range(2):
+        buffer, boards = AnswerBuffer(), Scoreboards()
+        buffer.init_app(app, interval=0, client=redis_client)
+        boards.init_app(app, client=redis_client)
+        pairs.append((buffer, boards))
+    return pairs
+
+
+@pytest.fixture
+def game(app):
+    with app.app_context():
+        room = Room(name=f"round-state-{uuid.uuid4().hex[:8]}")
+        db.session.add(room)
+        db.session.flush()
+        game = Game(room_id=room.id, status="playing")
+        users = [User(username=f"rs-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@example.com", password="x")
+                 for _ in range(2)]
+        db.session.add_all([game, *users])
+        db.session.commit()
+        yield game.id, [user.id for user in users]
+
+
+def test_answer_is_accepted_once_across_workers(app, workers, game):
+    (first, _), (second, _) = workers
+    game_id, (user_id, _) = game
+
+    assert first.record(game_id, 1, user_id, 10)
+    assert not second.record(game_id, 1, user_id, 10)
+
+    with app.app_context():
+        second.close_round(game_id)
+    assert not first.record(game_id, 1, user_id, 10)  # ✅ Question suivante pas encore installée
+    assert first.record(game_id, 2, user_id, 0)
+
+
+def test_points_are_flushed_once_by_any_worker(app, workers, game):
+    (first, _), (second, _) = workers
+    game_id, (alice, bob) = game
+
+    with app.app_context():
+        first.record(game_id, 1, alice, 10)
+        second.record(game_id, 1, bob, 10)
+        assert second.flush() == 2
+        assert first.flush() == 0
+
+        scores = dict(db.session.query(Score.user_id, Score.score).filter_by(game_id=game_id))
+    assert scores == {alice: 10, bob: 10}
+
+
+def test_scoreboard_is_shared_across_workers(app, workers, game):
+    (_, first), (_, second) = workers
+    game_id, (alice, bob) = game
+
+    with app.app_context():
+        first.get(game_id).add(alice, "alice", 10)
+        second.get(game_id).add(bob, "bob", 10)
+        first.get(game_id).add(bob, "bob", 10)
+
+        board = second.get(game_id)
+        assert board.leader() == {"user_id": bob, "username": "bob", "score": 20}
+        assert sorted(entry["user_id"] for entry in board.pop_changes()) == [alice, bob]
+        assert first.get(game_id).pop_changes() == []
+
+        first.discard(game_id)
+        assert second.get(game_id).leader() is None
+
+
+def test_scoreboard_reloads_from_scores_once(app, redis_client, game):
+    game_id, (alice, _) = game
+    with app.app_context():
+        db.session.add(Score(user_id=alice, game_id=game_id, score=30))
+        db.session.commit()
+
+        boards = [Scoreboards() for _ in range(2)]
+        for boards_ in boards:
+            boards_.init_app(app, client=redis_client)
+        assert boards[0].get(game_id).leader()["score"] == 30
+        assert boards[1].get(game_id).leader()["score"] == 30
+
+
+def test_pending_points_survive_a_failed_write(app, redis_client, game, monkeypatch):
+    game_id, (alice, _) = game
+    buffer = AnswerBuffer()
+    buffer.init_app(app, interval=0, client=redis_client)
+    buffer.record(game_id, 1, alice, 10)
+
+    def fail(pending):
+        raise RuntimeError("database unavailable")
+
+    with app.app_context():
+        monkeypatch.setattr(buffer, "_persist", fail)
+        assert buffer.flush() == 0
+    assert RedisAnswerStore(redis_client).take(game_id) == {game_id: {alice: 10}}
+
+
+def test_periodic_flush_survives_a_redis_error(app, redis_client):
+    calls = []
+
+    class FlakyStore(RedisAnswerStore):
+        def take(self, game_id=None):
+            calls.append(game_id)
+            if len(calls) == 1:
+                raise ConnectionError("redis unavailable")
+            return super().take(game_id)
+
+    buffer = AnswerBuffer()
+    buffer.store = FlakyStore(redis_client)
+    buffer.init_app(app, interval=0.01)
+    eventlet.sleep(0.05)
+
+    assert len(calls) > 1
+    assert not buffer._flusher.dead
+    buffer._flusher.kill()
@@ -0,0 +1,89 @@
+import json
+import eventlet
+import eventlet.wsgi
+import pytest
+import spotify_service
+from config import Config
+from spotify_service import TokenCache, TrackBuffer, get_random_track
+
+
+def track(name, preview_url):
+    return {"name": name, "artists": [{"name": "Artist"}], "album": {"name": "Album"}, "preview_url": preview_url}
+
+
+# 📌 Faux Spotify local : /api/token (accounts) et /v1/recommendations (API) sur le même port
+class MockSpotify:
+    def __init__(self):
+        self.requests = []   # (chemin, port client)
+        self.tracks = []
+        self.expires_in = 3600
+        self.tokens = 0
+
+    def __call__(self, environ, start_response):
+        self.requests.append((environ["PATH_INFO"], environ["REMOTE_PORT"]))
+        if environ["PATH_INFO"] == "/api/token":
+            self.tokens += 1
+            body = {"access_token": f"token-{self.tokens}", "expires_in": self.expires_in}
+        elif environ["PATH_INFO"] == "/v1/recommendations":
+            body = {"tracks": self.tracks}
+        else:
+            start_response("404 Not Found", [("Content-Type", "application/json")])
+            return [b"{}"]
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [json.dumps(body).encode()]
+
+    def paths(self):
+        return [path for path, _ in self.requests]
+
+
+@pytest.fixture
+def spotify(monkeypatch):
+    mock = MockSpotify()
+    sock = eventlet.listen(("127.0.0.1", 0))
+    server = eventlet.spawn(eventlet.wsgi.server, sock, mock, log_output=False)
+    url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    monkeypatch.setattr(Config, "SPOTIFY_ACCOUNTS_URL", url)
+    monkeypatch.setattr(Config, "SPOTIFY_API_URL", url)
+    monkeypatch.setattr(spotify_service, "token_cache", TokenCache())
+    yield mock
+    server.kill()
+    sock.close()
+
+
+def test_token_is_cached_then_refreshed_before_expiry(spotify, monkeypatch):
+    cache = TokenCache(refresh_margin=60)
+    assert cache.get() == "token-1"
+    assert cache.get() == "token-1"
+    assert spotify.tokens == 1
+
+    now = spotify_service.time.monotonic()
+    monkeypatch.setattr(spotify_service.time, "monotonic", lambda: now + 3600 - 59)  # ✅ 59 s avant l'expiration
+    assert cache.get() == "token-2"
+
+
+def test_calls_reuse_the_shared_session(spotify):
+    spotify.tracks = [track("a", "http://preview/a")]
+    for _ in range(3):
+        spotify_service.fetch_tracks("pop", 10)
+
+    assert spotify.paths() == ["/api/token"] + ["/v1/recommendations"] * 3
+    assert len({port for _, port in spotify.requests}) == 1  # ✅ Une seule connexion keep-alive
+
+
+def test_buffer_keeps_only_tracks_with_a_preview(spotify):
+    spotify.tracks = [track("a", "http://preview/a"), track("b", None), track("c", "http://preview/c")]
+    buffer = TrackBuffer(size=4)
+
+    served = {buffer.take("pop")["title"], buffer.take("pop")["title"]}
+    assert served == {"a", "c"}
+    eventlet.sleep(0.05)  # ✅ Rechargement en arrière-plan
+    assert all(entry["preview_url"] for entry in buffer._tracks["pop"])
+
+
+def test_empty_result_returns_no_track(spotify, monkeypatch):
+    monkeypatch.setattr(spotify_service, "track_buffer", TrackBuffer(size=4))
+    assert get_random_track("jazz") is None
+    eventlet.sleep(0.05)
+
+    spotify.tracks = [track("b", None)]
+    assert get_random_track("jazz") is None
@@ -6,4 +6,6 @@ export const socket = io(SOCKET_URL, {
   transports: ["websocket"], // ✅ Utiliser directement WebSockets
   withCredentials: true,
   path: "/socket.io/",
+  // ✅ Le JWT est envoyé à chaque (re)connexion : le serveur associe la connexion au joueur
+  auth: (cb) => cb({ token: localStorage.getItem("token") }),
 });
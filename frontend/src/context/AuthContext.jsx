@@ -1,5 +1,6 @@
 import React, { createContext, useState, useEffect } from "react";
 import axios from "axios";
+import { socket } from "../api/socket";
 
 export const AuthContext = createContext();
 
@@ -14,6 +15,11 @@ export const AuthProvider = ({ children }) => {
 
   console.log("🔍 AuthContext chargé :", { user, token, userId });
 
+  // 📡 Reconnecter le socket quand le token change (authentification à la connexion)
+  useEffect(() => {
+    socket.disconnect().connect();
+  }, [token]);
+
   // 📌 Charger le profil utilisateur si un token est présent
   useEffect(() => {
     if (token && !user) {
@@ -39,7 +39,12 @@ function Game() {
 
     socket.on("update_scores", (data) => {
       console.log("📊 Mise à jour des scores :", data);
-      setScores(data.scores);
+      // ✅ Le serveur n'envoie que les joueurs dont le score a changé
+      setScores((previous) => {
+        const byUser = new Map(previous.map((player) => [player.username, player]));
+        data.scores.forEach((player) => byUser.set(player.username, player));
+        return [...byUser.values()].sort((a, b) => b.score - a.score);
+      });
     });
 
     socket.on("game_over", (data) => {
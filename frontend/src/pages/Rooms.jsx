@@ -2,6 +2,7 @@ import React, { useState, useEffect, useContext } from 'react';
 import { useNavigate } from 'react-router-dom';
 import '../style/Rooms.css';
 import { getRooms, createRoom, joinRoom } from '../api/api';
+import { socket } from '../api/socket';
 import { AuthContext } from '../context/AuthContext';
 
 function Rooms() {
@@ -23,6 +24,35 @@ function Rooms() {
     }
   }, [user, token, navigate]);
 
+  // 📡 Flux du lobby : diffs `lobby_update` (valeurs absolues) appliqués à la liste, avant ou après le GET
+  useEffect(() => {
+    if (!user || !token) return undefined;
+
+    const subscribe = () => socket.emit('join_lobby'); // ✅ À chaque (re)connexion : la room "lobby" est perdue à la déconnexion
+    const applyUpdate = ({ added = [], removed = [], changed = {} }) => {
+      setRooms((previous) => {
+        const gone = new Set(removed.map(Number));
+        const byId = new Map(previous.filter((room) => !gone.has(room.id)).map((room) => [room.id, room]));
+        added.forEach((room) => byId.set(room.id, { ...byId.get(room.id), ...room }));
+        Object.entries(changed).forEach(([id, fields]) => {
+          const room = byId.get(Number(id));
+          if (room) byId.set(room.id, { ...room, ...fields });
+        });
+        return [...byId.values()].sort((a, b) => a.id - b.id);
+      });
+    };
+
+    socket.on('connect', subscribe);
+    socket.on('lobby_update', applyUpdate);
+    if (socket.connected) subscribe();
+
+    return () => {
+      socket.emit('leave_lobby');
+      socket.off('connect', subscribe);
+      socket.off('lobby_update', applyUpdate);
+    };
+  }, [user, token]);
+
   // 📌 Charger les rooms disponibles
   const fetchRooms = async () => {
     try {
@@ -43,7 +73,7 @@ function Rooms() {
       const response = await createRoom(newRoomName, 'Mix');
       const newRoom = response.data;
 
-      setRooms([...rooms, { id: newRoom.room_id, name: newRoomName, game_id: null }]);
+      setRooms([...rooms, { id: newRoom.room_id, name: newRoomName, player_count: 0, game_id: null }]);
       setNewRoomName('');
       setShowForm(false);
       navigate(`/room/${newRoom.room_id}`);
@@ -84,7 +114,7 @@ function Rooms() {
               className="room-button"
               onClick={() => handleJoinRoom(room.id, room.game_id)}
             >
-              {room.name} ({room.players?.length || 0} joueurs) {room.game_id ? '🎮 Partie en cours' : ''}
+              {room.name} ({room.player_count || 0} joueurs) {room.game_id ? '🎮 Partie en cours' : ''}
             </button>
           ))
         ) : (